@@ -0,0 +1,269 @@
+"""
+Headless performance benchmarks for the physics, layout and rendering hot paths.
+
+Every benchmark reports seconds per operation (lower is better). Results are compared against
+a JSON baseline recorded on the same machine; anything slower than baseline * (1 + threshold)
+is a regression and the run exits non-zero.
+
+Usage:
+    python -m benchmarks.run --save                 # record benchmarks/baseline.json
+    python -m benchmarks.run                        # compare against it (default threshold 25%)
+    python -m benchmarks.run --only render --threshold 0.1 --repeat 15
+
+Baselines are machine-specific, so they are not committed; record one before changing code.
+Not part of the pytest run or CI.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from utils.physics import PlinkoPhysics, board_peg_positions, simulate_drop
+from utils.geometry import BoardGeometry
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+FRAME_BUDGET = 1 / 60
+VIEWPORT_SIZES = [(360, 640), (720, 1280), (1080, 1920)]
+CHIP_COUNTS = [1, 50, 200]
+REPEAT = 7
+REWARDS = ["+5 POGs", "+10 POGs", "Vault Key", "Whiskey", "Loot Crate",
+           "+20 HP", "Mystery Box", "+1 INT Buff", "+3 Ammo", "Safe Haven Map"]
+
+def measure(fn, number=1, repeat=None):
+    # Best of `repeat` runs of `number` calls each, in seconds per call. The minimum is the
+    # least noisy estimate on a shared machine (slower runs only add scheduler interference)
+    fn()  # warm caches
+    times = []
+    for _ in range(repeat or REPEAT):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return min(times)
+
+def bench_physics():
+    w, h, chip_d = 718, 1278, 30
+    physics = PlinkoPhysics([], board_peg_positions(w, h), h, w, rng=random.Random(0))
+    steps = 20000
+
+    def bounce_steps():
+        # Same path every run, so only the code's speed varies
+        physics.rng = random.Random(0)
+        physics.reset()
+        x, y = w / 2, 0.0
+        for step in range(steps):
+            x, y, _, _ = physics.next_bounce(x, y, chip_d, step, 600)
+            if y > h:
+                y = 0.0
+
+    seeds = range(200)
+
+    def full_drops():
+        for seed in seeds:
+            physics.rng = random.Random(seed)
+            simulate_drop(physics, w / 2, chip_d)
+
+    from utils.batch_physics import BatchPlinkoPhysics
+    engine = BatchPlinkoPhysics(board_peg_positions(w, h), h, w)
+    n = 20000
+
+    dense = BoardGeometry(40, 30, 30)
+    dense_engine = BatchPlinkoPhysics(dense.layout(w, h).peg_positions, h, w, 30, geometry=dense)
+    dense_d = dense.chip_diameter(w)
+    swept = BoardGeometry(collision="swept")
+    swept_physics = PlinkoPhysics([], board_peg_positions(w, h), h, w, geometry=swept)
+    swept_engine = BatchPlinkoPhysics(board_peg_positions(w, h), h, w, geometry=swept)
+
+    def swept_drops():
+        for seed in seeds:
+            swept_physics.rng = random.Random(seed)
+            simulate_drop(swept_physics, w / 2, chip_d)
+
+    return {
+        "physics.next_bounce": measure(bounce_steps) / steps,
+        "physics.full_drop": measure(full_drops) / len(seeds),
+        "physics.batch_drop": measure(lambda: engine.simulate(n, w / 2, chip_d, seed=0), repeat=3) / n,
+        "physics.batch_drop.dense_40x30": measure(lambda: dense_engine.simulate(n, w / 2, dense_d, seed=0), repeat=3) / n,
+        "physics.full_drop.swept": measure(swept_drops) / len(seeds),
+        "physics.batch_drop.swept": measure(lambda: swept_engine.simulate(n, w / 2, chip_d, seed=0), repeat=3) / n,
+    }
+
+def bench_layout():
+    from utils.video_export import make_export_board
+    results = {}
+    for w, h in VIEWPORT_SIZES:
+        board = make_export_board(REWARDS, w, h)
+
+        def rebuild():
+            # Force the full relayout a resize would trigger
+            board.layout_size = None
+            board.init_board()
+
+        results[f"layout.init_board.{w}x{h}"] = measure(rebuild, number=5)
+        board.deleteLater()
+    # 1200 pegs and 30 slots, built from scratch (new items, no cached layout)
+    from plinko_board import PlinkoBoard
+    dense_rewards = [str(i) for i in range(30)]
+    results["layout.build.dense_40x30"] = measure(
+        lambda: PlinkoBoard(dense_rewards, geometry=BoardGeometry(40, 30, 30)).deleteLater(), repeat=3)
+    return results
+
+def bench_render():
+    from PySide6.QtGui import QImage, QPainter
+    from utils.video_export import DropRenderer, make_export_board
+    results = {}
+    for n in CHIP_COUNTS:
+        board = make_export_board(REWARDS, 720, 1280)
+        w = board.viewport().width()
+        chips = [board.launch_chip(f"P{i}", "#39ff14", release_x=(i * 37) % w, seed=i) for i in range(n)]
+        board.anim_timer.stop()
+        for _ in range(60):
+            board._chip_step_with_realistic_bounce()
+        renderer = DropRenderer(board)
+        renderer.render_static()
+        # Export path: cached static layer plus the chips
+        results[f"render.export_frame.{n}_chips"] = measure(lambda: renderer.render_frame(chips), number=5)
+        # Live path: the whole scene through the view, as a repaint would draw it
+        image = QImage(board.viewport().size(), QImage.Format_RGB888)
+
+        def view_frame():
+            painter = QPainter(image)
+            board.render(painter)
+            painter.end()
+
+        results[f"render.view_frame.{n}_chips"] = measure(view_frame, number=5)
+        # Same frame with the static board blitted from the cached layer
+        board.set_render_mode("cached")
+        results[f"render.view_frame_cached.{n}_chips"] = measure(view_frame, number=5)
+        board.anim_timer.stop()
+        board.deleteLater()
+    # 1200 pegs: item rendering grows with the peg count, the cached layer does not
+    dense_rewards = [str(i) for i in range(30)]
+    board = make_export_board(dense_rewards, 720, 1280, BoardGeometry(40, 30, 30))
+    w = board.viewport().width()
+    for i in range(50):
+        board.launch_chip(f"P{i}", "#39ff14", release_x=(i * 37) % w, seed=i)
+    board.anim_timer.stop()
+    image = QImage(board.viewport().size(), QImage.Format_RGB888)
+
+    def dense_frame():
+        painter = QPainter(image)
+        board.render(painter)
+        painter.end()
+
+    for mode in ("items", "cached"):
+        board.set_render_mode(mode)
+        results[f"render.view_frame_{mode}.dense_40x30.50_chips"] = measure(dense_frame, number=5)
+    board.deleteLater()
+    return results
+
+def bench_boards():
+    # One frame of physics + chip updates: the same 48 chips on 1 board or spread over 8 boards,
+    # and one busy board next to 7 idle ones. Cost should follow the chips, not the boards
+    from PySide6.QtWidgets import QApplication
+    from utils.board_group import BoardGroup
+    app = QApplication.instance()
+    results = {}
+    for n_boards, busy in ((1, 1), (8, 8), (8, 1)):
+        group = BoardGroup()
+        boards = [group.create_board(REWARDS) for _ in range(n_boards)]
+        per_board = 48 // busy if busy == n_boards else 6
+        for b, board in enumerate(boards[:busy]):
+            w = board.viewport().width()
+            for i in range(per_board):
+                board.launch_chip(f"P{i}", "#39ff14", release_x=(i * 37) % w, seed=b * 100 + i)
+        while group.physics_worker.pending:
+            app.processEvents()
+        group.frame_clock.timer.stop()
+
+        def frame():
+            for board in group.frame_clock.active:
+                board._physics_step()
+                board._render_chips(1.0)
+
+        results[f"boards.frame.{n_boards}_boards.{busy * per_board}_chips"] = measure(frame, number=2, repeat=5)
+        group.close()
+        for board in boards:
+            board.deleteLater()
+    return results
+
+BENCHMARKS = {"physics": bench_physics, "layout": bench_layout, "render": bench_render, "boards": bench_boards}
+
+def run(groups=None):
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if groups and name not in groups:
+            continue
+        if name != "physics":
+            from PySide6.QtWidgets import QApplication
+            QApplication.instance() or QApplication([])
+        results.update(bench())
+    return results
+
+def compare(results, baseline, threshold):
+    """
+    Returns [(name, baseline_seconds, seconds, ratio)] for every benchmark slower than
+    baseline * (1 + threshold). Benchmarks missing from the baseline are skipped.
+    """
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = seconds / base
+        if ratio > 1 + threshold:
+            regressions.append((name, base, seconds, ratio))
+    return regressions
+
+def load_baseline(path):
+    with open(path, "r") as f:
+        return json.load(f)["results"]
+
+def save_baseline(results, path):
+    meta = {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "recorded": time.strftime("%Y-%m-%d %H:%M:%S")}
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
+
+def format_row(name, seconds, base=None):
+    row = f"{name:<36} {seconds * 1e6:>12.2f} us {seconds / FRAME_BUDGET:>8.1%} of frame"
+    if base:
+        row += f"   {seconds / base:>6.2f}x baseline"
+    return row
+
+def main(argv=None):
+    global REPEAT
+    parser = argparse.ArgumentParser(description="Plinko performance benchmarks.")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="Record these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Runs per benchmark; raise it on noisy machines")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="Run just this group (repeatable)")
+    args = parser.parse_args(argv)
+
+    REPEAT = args.repeat
+    results = run(args.only)
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        baseline = load_baseline(args.baseline)
+    for name, seconds in results.items():
+        print(format_row(name, seconds, baseline.get(name)))
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save first")
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for name, base, seconds, ratio in regressions:
+        print(f"REGRESSION {name}: {base * 1e6:.2f} us -> {seconds * 1e6:.2f} us ({ratio:.2f}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
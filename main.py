@@ -1,11 +1,60 @@
 import sys
+import os
 import json
+
+# Every drop is appended here so disputed results can be looked up and re-run
+REPLAY_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "drops.replay")
+# Rewards template edited live by stream deck scripts (see --watch-template)
+REWARDS_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "rewards_template.json")
+# Every result is also kept in a queryable history for payout reconciliation
+RESULTS_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "results.db")
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] in ("simulate", "export", "replay", "results"):
+    # Headless subcommands exit here, before the Qt widgets and the board are imported
+    if sys.argv[1] == "simulate":
+        # Headless payout-odds analysis, no window
+        from utils.montecarlo import main as simulate_main
+        sys.exit(simulate_main(sys.argv[2:]))
+    if sys.argv[1] == "export":
+        # Offscreen render of one drop to video frames
+        from utils.video_export import main as export_main
+        sys.exit(export_main(sys.argv[2:]))
+    if sys.argv[1] == "replay":
+        # Search the drop log and re-run drops to check their slots
+        from utils.replay_log import main as replay_main
+        replay_args = sys.argv[2:]
+        if not replay_args or replay_args[0].startswith("-"):
+            replay_args = [REPLAY_LOG] + replay_args
+        sys.exit(replay_main(replay_args))
+    if sys.argv[1] == "results":
+        # Query the results history or export it to CSV/JSON
+        from utils.results_store import main as results_main
+        results_args = sys.argv[2:]
+        if not results_args or results_args[0].startswith("-"):
+            results_args = [RESULTS_DB] + results_args
+        sys.exit(results_main(results_args))
+
+# Started first so the startup report covers the Qt and app imports below
+from utils.startup import report as startup_report
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QLabel,
-    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QFileDialog, QMessageBox, QColorDialog, QSizePolicy, QSpacerItem
+    QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLineEdit, QFileDialog, QMessageBox, QColorDialog, QSizePolicy,
+    QSpacerItem, QSpinBox
 )
 from PySide6.QtCore import Qt, QSize
 from plinko_board import PlinkoBoard
+from utils.replay_log import ReplayLog
+from utils.drop_scheduler import DropScheduler
+from utils.board_group import BoardGroup
+from utils.geometry import load_geometry
+from utils.results_store import ResultsStore
+from utils.reward_template import TemplateWatcher, load_template
+startup_report.mark("imports")
+
+DEFAULT_REWARDS = [
+    "+5 POGs", "+10 POGs", "Vault Key", "Whiskey", "Loot Crate",
+    "+20 HP", "Mystery Box", "+1 INT Buff", "+3 Ammo", "Safe Haven Map"
+]
 
 class AspectRatioWidget(QWidget):
     def __init__(self, widget, aspect_ratio=9/16, parent=None):
@@ -28,20 +77,48 @@ class AspectRatioWidget(QWidget):
         super().resizeEvent(event)
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, boards=1):
         super().__init__()
         self.setWindowTitle("FoSGamers PlinkoBoard")
-        self.resize(720, 1280)
+        columns = min(boards, 4)
+        rows = (boards + columns - 1) // columns
+        self.resize(720 if boards == 1 else 360 * columns, 1280 if boards == 1 else 640 * rows + 200)
         self.setMinimumSize(360, 640)
 
-        self.reward_labels = [
-            "+5 POGs", "+10 POGs", "Vault Key", "Whiskey", "Loot Crate",
-            "+20 HP", "Mystery Box", "+1 INT Buff", "+3 Ammo", "Safe Haven Map"
-        ]
+        # One label per slot of config/board_geometry.json; boards with more than the classic ten slots
+        # repeat the default rewards until a template replaces them
+        geometry = load_geometry()
+        self.reward_labels = [DEFAULT_REWARDS[i % len(DEFAULT_REWARDS)] for i in range(geometry.slots)]
 
-        self.board = PlinkoBoard(self.reward_labels, parent=self)
-        self.aspect_board = AspectRatioWidget(self.board, aspect_ratio=9/16)
-        self.aspect_board.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        # Several boards share one frame clock, sound pools and physics worker (--boards N)
+        self.board_group = BoardGroup(geometry=geometry, parent=self) if boards > 1 else None
+        self.boards = []
+        self.schedulers = []
+        board_grid = QGridLayout()
+        for i in range(boards):
+            if self.board_group is None:
+                # Sounds load in the background once the first frame is on screen
+                board = PlinkoBoard(self.reward_labels, parent=self, geometry=geometry, load_sounds=False)
+                board.first_paint.connect(board.load_sounds_async)
+            else:
+                board = self.board_group.create_board(list(self.reward_labels), parent=self)
+                board.setMinimumSize(180, 320)
+            # Drops are queued and fed to the board a few at a time; big backlogs are resolved instantly
+            scheduler = DropScheduler(board, max_concurrent=8, turbo_threshold=50, parent=self)
+            scheduler.rejected.connect(lambda player, reason: self.display_result(reason))
+            # Dragged chips are queued like the Drop button, under the name in the player box
+            board.drop_requested.connect(lambda release_x, i=i: self.submit_drop(i, release_x))
+            # The board sits inside AspectRatioWidget, so its parent() isn't this window; listen directly
+            board.result_ready.connect(lambda chip, result, i=i: self.display_result(self.board_prefix(i) + result["result"]))
+            aspect_board = AspectRatioWidget(board, aspect_ratio=9/16)
+            aspect_board.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+            board_grid.addWidget(aspect_board, i // columns, i % columns)
+            if i == 0:
+                self.aspect_board = aspect_board
+            self.boards.append(board)
+            self.schedulers.append(scheduler)
+        self.board = self.boards[0]
+        self.scheduler = self.schedulers[0]
 
         self.result_label = QLabel("Drop a chip to play!")
         self.result_label.setAlignment(Qt.AlignCenter)
@@ -75,6 +152,12 @@ class MainWindow(QMainWindow):
 
         controls_layout = QVBoxLayout()
         controls_layout.addWidget(self.result_label)
+        self.board_selector = None
+        if boards > 1:
+            self.board_selector = QSpinBox()
+            self.board_selector.setRange(1, boards)
+            self.board_selector.setPrefix("Board ")
+            controls_layout.addWidget(self.board_selector)
         controls_layout.addWidget(self.player_input)
         controls_layout.addWidget(self.color_button)
         controls_layout.addLayout(button_layout)
@@ -82,7 +165,7 @@ class MainWindow(QMainWindow):
         controls_layout.setContentsMargins(0, 0, 0, 0)
 
         main_layout = QVBoxLayout()
-        main_layout.addWidget(self.aspect_board, stretch=2)
+        main_layout.addLayout(board_grid, stretch=2)
         main_layout.addSpacing(10)
         main_layout.addLayout(controls_layout, stretch=0)
         main_layout.addStretch(1)
@@ -92,11 +175,20 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(container)
 
     def handle_drop(self):
+        index = self.board_selector.value() - 1 if self.board_selector is not None else 0
+        # Released where the draggable chip sits, so it can be positioned before clicking
+        chip = self.boards[index].dragging_chip
+        self.submit_drop(index, chip.x() if chip is not None else None)
+
+    def submit_drop(self, index, release_x):
         name = self.player_input.text().strip()
         if not name:
             QMessageBox.warning(self, "Missing Name", "Please enter a player name.")
-            return
-        self.board.drop_chip(name, self.chip_color)
+            return None
+        return self.schedulers[index].submit(name, self.chip_color, release_x=release_x)
+
+    def board_prefix(self, index):
+        return f"Board {index + 1}: " if len(self.boards) > 1 else ""
 
     def pick_color(self):
         color = QColorDialog.getColor()
@@ -117,16 +209,101 @@ class MainWindow(QMainWindow):
         path, _ = QFileDialog.getOpenFileName(self, "Load Template", "", "JSON Files (*.json)")
         if path:
             try:
-                with open(path, "r") as f:
-                    self.reward_labels = json.load(f)
-                self.board.reward_labels = self.reward_labels
-                self.board.init_board()
+                self.apply_template(load_template(path))
                 QMessageBox.information(self, "Loaded", "Reward template loaded.")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to load template: {str(e)}")
 
+    def apply_template(self, template):
+        self.reward_labels = template.labels
+        for board in self.boards:
+            board.apply_template(template)
+
+    def watch_template(self, path):
+        # Hot reload: every save of `path` is applied to the board as soon as it parses
+        self.template_watcher = TemplateWatcher(path, slots=self.board.board_geometry.slots, parent=self)
+        self.template_watcher.loaded.connect(self.apply_template)
+        self.template_watcher.failed.connect(lambda error: self.display_result(f"Template not applied: {error}"))
+        self.template_watcher.reload()
+        return self.template_watcher
+
 if __name__ == "__main__":
+    server_args = None
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        # Normal window plus a local HTTP/WebSocket endpoint that bots can drop chips through
+        from utils.drop_server import DropServer, parse_server_args
+        server_args = parse_server_args(sys.argv[2:])
+        sys.argv = sys.argv[:1]
+    # --opengl renders through a QOpenGLWidget; --software-gl forces a software rasterizer for it
+    use_opengl = "--opengl" in sys.argv or "--software-gl" in sys.argv
+    if "--software-gl" in sys.argv:
+        from utils.viewport import use_software_opengl
+        use_software_opengl()
+    sys.argv = [arg for arg in sys.argv if arg not in ("--opengl", "--software-gl")]
+    # --startup-report FILE saves the startup timings as JSON (they are always printed to stderr)
+    startup_report_path = None
+    if "--startup-report" in sys.argv:
+        at = sys.argv.index("--startup-report")
+        startup_report_path = sys.argv[at + 1] if at + 1 < len(sys.argv) else None
+        sys.argv = sys.argv[:at] + sys.argv[at + 2:]
+    # --watch-template [FILE] applies every saved change to the rewards template at once
+    watch_path = None
+    if "--watch-template" in sys.argv:
+        at = sys.argv.index("--watch-template")
+        watch_path, end = REWARDS_TEMPLATE, at + 1
+        if end < len(sys.argv) and not sys.argv[end].startswith("-"):
+            watch_path, end = sys.argv[end], end + 1
+        sys.argv = sys.argv[:at] + sys.argv[end:]
+    # --boards N shows N independent boards in one window (tournaments); drops go to the selected one
+    boards = 1
+    if "--boards" in sys.argv:
+        at = sys.argv.index("--boards")
+        boards = max(1, int(sys.argv[at + 1]))
+        sys.argv = sys.argv[:at] + sys.argv[at + 2:]
     app = QApplication(sys.argv)
-    window = MainWindow()
+    startup_report.mark("qapplication")
+    window = MainWindow(boards=boards)
+    replay_log = ReplayLog(REPLAY_LOG)
+    results_store = ResultsStore(RESULTS_DB)
+    app.aboutToQuit.connect(results_store.close)
+    for board in window.boards:
+        # Pegs and slots are painted once into a cached layer; frames only redraw the chips
+        board.set_render_mode("cached")
+        if use_opengl and not board.set_opengl(True):
+            print("OpenGL is not available here; using the raster viewport")
+            use_opengl = False
+        board.replay_log = replay_log
+        board.results_store = results_store
+    if watch_path is not None:
+        window.watch_template(watch_path)
+
+    def on_first_paint():
+        startup_report.mark("first frame")
+        # Landing odds are worked out in the background; press H to show them on the top row.
+        # Started after the first frame so the simulation doesn't compete with startup.
+        # With several boards each one only starts when H is pressed on it.
+        if window.board_group is None:
+            window.board.enable_probability_map()
+        loader = window.board.load_sounds_async()
+        if loader is not None:
+            loader.finished.connect(on_sounds_loaded)
+
+    def on_sounds_loaded(ok):
+        startup_report.mark("sounds loaded" if ok else "sounds unavailable")
+        startup_report.print()
+        if startup_report_path:
+            startup_report.write(startup_report_path)
+
+    window.board.first_paint.connect(on_first_paint)
     window.show()
+    startup_report.mark("window shown")
+    if server_args is not None:
+        # Bot drops share the window's scheduler, so fairness, rate limits and turbo apply to them too
+        server = DropServer(window.board, server_args.host, server_args.port,
+                            max_queue=server_args.max_queue, max_in_flight=server_args.max_in_flight,
+                            scheduler=window.scheduler)
+        # Frame timings are served at /metrics while the server runs
+        window.board.enable_metrics(export_path=server_args.metrics_file)
+        print(f"Drop server listening on http://{server_args.host}:{server.start()}")
+        app.aboutToQuit.connect(server.stop)
     sys.exit(app.exec()) 
\ No newline at end of file
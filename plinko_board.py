@@ -1,33 +1,114 @@
-import random
+import time
+import numpy as np
 from PySide6.QtWidgets import (
     QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsRectItem, QGraphicsSimpleTextItem
 )
-from PySide6.QtCore import Qt, QTimer, QUrl, QRectF, QPointF
-from PySide6.QtGui import QColor, QBrush, QPen, QFont, QLinearGradient, QMouseEvent
-from PySide6.QtMultimedia import QSoundEffect
-from utils.physics import PlinkoPhysics
+from PySide6.QtCore import Qt, QTimer, QRectF, QPointF, Signal, SIGNAL
+from PySide6.QtGui import QColor, QBrush, QPen, QFont, QLinearGradient, QMouseEvent, QPainter, QPixmap
+from PySide6.QtWidgets import QStyleOptionGraphicsItem
+from utils.physics import PegIndex, landing_slot, new_seed
+from utils.geometry import BoardGeometry, load_geometry
+from utils.trajectory import board_geometry, default_cache
+from utils.batch_physics import BatchPlinkoPhysics
+from utils.chip_table import ChipTable
+from utils.metrics import FrameMetrics
+from utils.audio import SoundLoader, SoundPool
+from utils.replay_log import template_hash
+from utils.reward_template import DEFAULT_COLOR
+from utils.probability_map import ProbabilityMapLoader
+from utils.viewport import make_opengl_viewport
+
+RENDER_MODES = ("items", "cached")
 
 class PlinkoBoard(QGraphicsView):
-    def __init__(self, reward_labels, parent=None):
+    # (chip, {"player", "slot", "label", "result", "seed", "drop_id", "payout"}) once a chip's landing is resolved;
+    # chip is None for drops resolved without animation (resolve_instantly)
+    result_ready = Signal(object, dict)
+    # Emitted once, after the board has painted for the first time
+    first_paint = Signal()
+    # Release x of a dragged chip. When connected, the receiver queues the drop (MainWindow submits it
+    # to its DropScheduler) and the chip stays on top; unconnected boards drop the chip themselves
+    drop_requested = Signal(float)
+
+    def __init__(self, reward_labels, parent=None, geometry=None, load_sounds=True):
         super().__init__(parent)
         self.scene = QGraphicsScene(self)
         self.setScene(self.scene)
         # Set 16:9 vertical aspect ratio (e.g., 720x1280)
         self.setMinimumSize(360, 640)
         self.setFixedSize(720, 1280)
+        # Peg rows/columns and slot count (config/board_geometry.json unless one is passed in)
+        self.board_geometry = geometry or load_geometry()
+        if len(reward_labels) != self.board_geometry.slots:
+            raise ValueError(f"{len(reward_labels)} reward labels but the board has {self.board_geometry.slots} slots")
+        self.board_layout = None
+        # "items" redraws pegs/slots as scene items; "cached" blits them from one pixmap (set_render_mode)
+        self.render_mode = "items"
+        self._static_layer = None
+        self.opengl = False
         self.pegs = []
         self.peg_positions = []
+        self.peg_index = None
         self.slots = []
         self.reward_labels = reward_labels
-        self.bounce_sound = QSoundEffect()
-        self.bounce_sound.setSource(QUrl.fromLocalFile("assets/bounce.wav"))
-        self.land_sound = QSoundEffect()
-        self.land_sound.setSource(QUrl.fromLocalFile("assets/land.wav"))
-        self.init_board()
+        # Colours, weights and payouts when the labels come from a RewardTemplate (apply_template)
+        self.reward_template = None
+        # Precomputed mode: the whole drop is simulated up front and the timer only replays it
+        self.precompute_drops = True
+        self.trajectory_cache = default_cache
+        self.anim_trajectory = None
+        self.last_drop = None
+        # Preloaded round-robin voices; harder peg hits play louder and higher.
+        # With load_sounds=False they stay silent until load_sounds_async() has loaded them
+        self.bounce_sound = SoundPool("assets/bounce.wav", voices=4, pitches=(0.9, 1.0, 1.12),
+                                      max_per_frame=3, parent=self, load=load_sounds)
+        self.land_sound = SoundPool("assets/land.wav", voices=3, max_per_frame=2, parent=self, load=load_sounds)
+        self.sound_loader = None
+        self._painted = False
+        self.slot_texts = []
+        self.slot_colors = []
+        self.layout_size = None
         self.dragging_chip = None
+        self.anim_chip = None
+        self.landed_chips = []
+        # Under steady traffic the board is never idle long enough to be reset; the oldest landed
+        # chips beyond this many are removed as new ones land
+        self.max_landed_chips = 30
+        # Every chip in flight lives in one table and is advanced by a single frame timer
+        self.chips = ChipTable()
+        # Physics runs at a fixed 60 steps/sec; the timer only renders, so timing and outcomes
+        # don't depend on timer drift or display refresh rate
+        self.physics_dt = 1 / 60
+        self.max_frame_time = 0.25  # Cap catch-up after a stall (at most 15 steps per frame)
+        self.clock = time.perf_counter
+        self._accumulator = 0.0
+        self._last_frame = None
+        self.anim_timer = QTimer(self)
+        self.anim_timer.setTimerType(Qt.PreciseTimer)
+        self.anim_timer.timeout.connect(self._on_frame)
+        # Set by BoardGroup: a frame clock and trajectory worker shared with other boards
+        self.frame_clock = None
+        self.physics_worker = None
+        # Instrumentation is off unless enable_metrics() (or F3) turns it on
+        self.metrics = None
+        self.metrics_overlay = None
+        self.metrics_path = None
+        self._metrics_timer = None
+        # Optional ReplayLog; every resolved drop is appended so it can be re-run later
+        self.replay_log = None
+        # Optional ResultsStore; every result is queued for the persistent history
+        self.results_store = None
+        # Landing odds per release position, loaded in the background once enabled
+        self.probability_map = None
+        self.probability_loader = None
+        self.heatmap_items = []
+        self.heatmap_target = None
+        self.odds_text = None
+        self.chip_color = "#ff00de"
+        self.current_player = "Player"
+        self.init_board()
         self.drag_start_pos = None
         self.chip_ready = False
-        self.chip_color = "#ff00de"
         self.setMouseTracking(True)
 
     def resizeEvent(self, event):
@@ -36,83 +117,219 @@ class PlinkoBoard(QGraphicsView):
         h = int(w * 16 / 9)
         if h != self.height():
             self.setFixedSize(w, h)
-        self.init_board()
+        # Static items are only repositioned; chips in flight keep falling
+        self.update_layout()
+        self.reset_chip()
+        self.chip_ready = True
         super().resizeEvent(event)
 
+    # Pens, brushes and fonts are shared by every item (and every board) instead of rebuilt per item
+    _pen_cache = {}
+    _brush_cache = {}
+    _font_cache = {}
+
     def neon_pen(self, color, width=3):
-        pen = QPen(QColor(color))
-        pen.setWidth(width)
-        pen.setColor(QColor(color))
+        pen = self._pen_cache.get((color, width))
+        if pen is None:
+            pen = QPen(QColor(color))
+            pen.setWidth(width)
+            pen.setColor(QColor(color))
+            self._pen_cache[(color, width)] = pen
         return pen
 
     def neon_brush(self, color, glow=0.5):
-        c = QColor(color)
-        c.setAlphaF(glow)
-        return QBrush(c)
+        brush = self._brush_cache.get((color, glow))
+        if brush is None:
+            c = QColor(color)
+            c.setAlphaF(glow)
+            brush = QBrush(c)
+            self._brush_cache[(color, glow)] = brush
+        return brush
 
-    def init_board(self):
-        self.scene.clear()
-        self.pegs = []
-        self.peg_positions = []
-        self.slots = []
-        w = self.viewport().width()
-        h = self.viewport().height()
-        self.scene.setSceneRect(0, 0, w, h)
+    def neon_font(self, point_size):
+        font = self._font_cache.get(point_size)
+        if font is None:
+            font = QFont("Courier New", point_size)
+            font.setBold(True)
+            self._font_cache[point_size] = font
+        return font
 
-        # Retro neon gradient background
-        grad = QLinearGradient(0, 0, 0, h)
-        grad.setColorAt(0, QColor(10, 10, 30))
-        grad.setColorAt(1, QColor(30, 0, 40))
-        self.scene.setBackgroundBrush(QBrush(grad))
+    def init_board(self):
+        """
+        Makes sure the static board (pegs, slots, labels) exists and matches the viewport, then puts
+        a fresh draggable chip at the top. Existing items are reused; only missing ones are created.
+        """
+        start = self.clock()
+        if not self.pegs:
+            self._build_pegs()
+        if len(self.slots) != len(self.reward_labels):
+            self._build_slots()
+        else:
+            self.update_slot_labels()
+        self.update_layout()
+        # Place draggable chip at the top center
+        self.reset_chip()
+        self.chip_ready = True
+        if self.metrics is not None:
+            self.metrics.record_event("init_board", self.clock() - start)
 
-        spacing_x = w / 10
-        spacing_y = h / 12
-        peg_d = min(spacing_x, spacing_y) / 8  # 1/4 the previous (was /2, then /4, now /8)
+    def _build_pegs(self):
         neon_colors = ["#00fff7", "#ff00de", "#39ff14", "#ffe600"]
-        for row in range(8):
-            for col in range(10):
-                offset_x = spacing_x / 2 if row % 2 == 0 else 0
-                x = col * spacing_x + offset_x + spacing_x * 0.1
-                y = row * spacing_y + spacing_y * 0.8
-                peg = QGraphicsEllipseItem(x, y, peg_d, peg_d)
+        for peg in self.pegs:
+            self.scene.removeItem(peg)
+        self.pegs = []
+        for row in range(self.board_geometry.rows):
+            for col in range(self.board_geometry.cols):
+                peg = QGraphicsEllipseItem()
                 color = neon_colors[(row + col) % len(neon_colors)]
                 peg.setPen(self.neon_pen(color, width=4))
                 peg.setBrush(self.neon_brush(color, glow=0.7))
                 self.scene.addItem(peg)
                 self.pegs.append(peg)
-                self.peg_positions.append((x + peg_d/2, y + peg_d/2, peg_d/2))
-        slot_width = w / 10
-        slot_height = h / 13
+        self.layout_size = None
+
+    def _build_slots(self):
+        geometry = self.board_geometry
+        if len(self.reward_labels) != geometry.slots:
+            # A new reward count resizes the slot row; physics and odds follow the geometry
+            self.board_geometry = BoardGeometry(geometry.rows, geometry.cols, len(self.reward_labels), geometry.collision)
+        for slot, _ in self.slots:
+            self.scene.removeItem(slot)
+        for text in self.slot_texts:
+            self.scene.removeItem(text)
+        self.slots = []
+        self.slot_texts = []
+        self.slot_colors = []
         for i, label in enumerate(self.reward_labels):
-            slot = QGraphicsRectItem(i * slot_width + spacing_x * 0.1, h - slot_height * 1.2, slot_width - spacing_x * 0.2, slot_height)
+            slot = QGraphicsRectItem()
             slot.setPen(self.neon_pen("#00fff7", width=5))
             slot.setBrush(QBrush(Qt.transparent))
             self.scene.addItem(slot)
             # Neon label
             text = QGraphicsSimpleTextItem(label)
-            font = QFont("Courier New", int(slot_height/3))
-            font.setBold(True)
-            text.setFont(font)
-            text.setBrush(self.neon_brush("#ffe600", glow=1.0))
-            text.setPen(self.neon_pen("#ffe600", width=2))
-            text.setPos(i * slot_width + spacing_x * 0.15, h - slot_height * 1.1)
+            self._color_slot_text(text, self.slot_color(i))
             self.scene.addItem(text)
             self.slots.append((slot, label))
-        # Place draggable chip at the top center
-        self.chip_ready = True
-        self.chip_color = getattr(self, 'chip_color', "#ff00de")
+            self.slot_texts.append(text)
+            self.slot_colors.append(self.slot_color(i))
+        self.layout_size = None
+
+    def _color_slot_text(self, text, color):
+        text.setBrush(self.neon_brush(color, glow=1.0))
+        text.setPen(self.neon_pen(color, width=2))
+
+    def slot_reward(self, i):
+        # The applied RewardTemplate's entry for slot i, or None if the labels didn't come from one
+        template = self.reward_template
+        if template is not None and template.labels == self.reward_labels:
+            return template.slots[i]
+        return None
+
+    def slot_color(self, i):
+        reward = self.slot_reward(i)
+        return reward.color if reward is not None else DEFAULT_COLOR
+
+    def update_slot_labels(self):
+        # Only touch text items whose label or colour actually changed
+        changed = False
+        for i, label in enumerate(self.reward_labels):
+            slot, old = self.slots[i]
+            if label != old:
+                self.slot_texts[i].setText(label)
+                self.slots[i] = (slot, label)
+                changed = True
+            color = self.slot_color(i)
+            if color != self.slot_colors[i]:
+                self._color_slot_text(self.slot_texts[i], color)
+                self.slot_colors[i] = color
+                changed = True
+        if changed:
+            self._invalidate_static_layer()
+
+    def apply_template(self, template):
+        """
+        Switches to a RewardTemplate in place, e.g. from a TemplateWatcher: only slot texts whose
+        label or colour changed are touched, pegs are left alone and chips in flight keep falling.
+        A different slot count rebuilds the slots (not the pegs) and changes board_geometry.slots.
+        """
+        self.reward_template = template
+        self.reward_labels = template.labels
+        if len(self.slots) != len(self.reward_labels):
+            self._build_slots()
+            self.update_layout()
+        else:
+            self.update_slot_labels()
+        if self.heatmap_target is not None and self.heatmap_target >= len(self.slots):
+            self.set_heatmap_target(None)
+
+    def update_layout(self):
+        # Reposition/rescale the static items for the current viewport size (no-op if unchanged)
+        w = self.viewport().width()
+        h = self.viewport().height()
+        if (w, h) == self.layout_size:
+            return
+        self.layout_size = (w, h)
+        self.scene.setSceneRect(0, 0, w, h)
+
+        # Retro neon gradient background
+        grad = QLinearGradient(0, 0, 0, h)
+        grad.setColorAt(0, QColor(10, 10, 30))
+        grad.setColorAt(1, QColor(30, 0, 40))
+        self.scene.setBackgroundBrush(QBrush(grad))
+
+        # Peg lattice is shared with the headless physics so both agree on the layout
+        layout = self.board_geometry.layout(w, h)
+        self.board_layout = layout
+        self.peg_positions = layout.peg_positions
+        left = (layout.peg_x - layout.peg_r).tolist()
+        top = (layout.peg_y - layout.peg_r).tolist()
+        size = (layout.peg_r * 2).tolist()
+        for peg, x, y, d in zip(self.pegs, left, top, size):
+            peg.setRect(x, y, d, d)
+        # Collision index is built once per layout and shared by every drop
+        self.peg_index = PegIndex(self.peg_positions, layout.spacing_y)
+        self.batch_physics = BatchPlinkoPhysics(self.peg_positions, h, w, len(self.slots), self.peg_index,
+                                                self.board_geometry)
+        slot_width = layout.slot_width
+        slot_height = layout.slot_height
+        font = self.neon_font(int(slot_height/3))
+        for i, ((slot, _), text) in enumerate(zip(self.slots, self.slot_texts)):
+            slot.setRect(i * slot_width + slot_width * 0.1, h - slot_height * 1.2, slot_width - slot_width * 0.2, slot_height)
+            text.setFont(font)
+            text.setPos(i * slot_width + slot_width * 0.15, h - slot_height * 1.1)
+        self._invalidate_static_layer()
+        if self.probability_loader is not None:
+            # New size or slot count: the old odds no longer apply
+            self._set_probability_map(None)
+            self.probability_loader.request(w, h, self.chip_diameter(), len(self.slots), self.board_geometry)
+
+    def reset_chip(self):
+        # Replace the draggable chip and clear landed chips; chips still in flight are left alone
+        for chip in [self.dragging_chip] + self.landed_chips:
+            if chip is not None and chip.scene() is self.scene:
+                self.scene.removeItem(chip)
+        self.landed_chips = []
         self.create_draggable_chip()
 
-    def create_draggable_chip(self):
+    def chip_diameter(self):
+        return self.board_geometry.chip_diameter(self.viewport().width())
+
+    def make_chip(self, color):
+        # Chip item whose position is its top-left corner (the coordinate the physics uses)
         w = self.viewport().width()
-        chip_d = min(w / 20, 30)
-        chip = QGraphicsEllipseItem(w / 2 - chip_d / 2, 0, chip_d, chip_d)
+        chip_d = self.chip_diameter()
+        chip = QGraphicsEllipseItem(0, 0, chip_d, chip_d)
         chip.setPen(self.neon_pen("#ff00de", width=5))
-        chip.setBrush(self.neon_brush(self.chip_color, glow=0.8))
-        chip.setFlag(QGraphicsEllipseItem.ItemIsMovable, True)
-        chip.setFlag(QGraphicsEllipseItem.ItemIsSelectable, True)
+        chip.setBrush(self.neon_brush(color, glow=0.8))
         chip.setZValue(10)
+        chip.setPos(w / 2 - chip_d / 2, 0)
         self.scene.addItem(chip)
+        return chip
+
+    def create_draggable_chip(self):
+        chip = self.make_chip(self.chip_color)
+        chip.setFlag(QGraphicsEllipseItem.ItemIsMovable, True)
+        chip.setFlag(QGraphicsEllipseItem.ItemIsSelectable, True)
         self.dragging_chip = chip
         self.chip_start_y = 0
 
@@ -137,69 +354,473 @@ class PlinkoBoard(QGraphicsView):
             y = self.chip_start_y
             x = min(max(pos.x() - self.chip_drag_offset, 0), w - chip_d)
             self.dragging_chip.setPos(x, y)
+            self._update_odds_text(x)
         super().mouseMoveEvent(event)
 
     def mouseReleaseEvent(self, event: QMouseEvent):
         if getattr(self, 'chip_dragging', False) and self.dragging_chip:
             self.chip_dragging = False
-            # Start drop from current x
-            self.chip_ready = False
-            chip = self.dragging_chip
-            self.dragging_chip = None
-            self.start_chip_drop(chip)
+            if self.receivers(SIGNAL("drop_requested(double)")):
+                self.drop_requested.emit(self.dragging_chip.x())
+            else:
+                # Start drop from current x
+                self.chip_ready = False
+                chip = self.dragging_chip
+                self.dragging_chip = None
+                self.start_chip_drop(chip, player_name=self.current_player)
         super().mouseReleaseEvent(event)
 
-    def start_chip_drop(self, chip):
+    def start_chip_drop(self, chip, seed=None, player_name=None):
         h = self.viewport().height()
         w = self.viewport().width()
-        self.physics = PlinkoPhysics(self.pegs, self.peg_positions, h, w)
-        self.physics.reset()
-        self.anim_y = chip.y()
+        if seed is None:
+            seed = new_seed()
+        if player_name is None:
+            player_name = self.current_player
+        chip_d = chip.rect().width()
+        # Everything needed to re-run this drop, read back when it lands
+        chip.setData(0, (seed, chip.x(), chip.y(), chip_d))
         self.anim_chip = chip
-        self.anim_player = getattr(self, 'current_player', 'Player')
-        self.anim_step = 0
-        self.anim_max_steps = random.randint(180, 600)  # 3-10 seconds at 60 FPS
-        self.anim_timer = QTimer()
-        self.anim_timer.timeout.connect(self._chip_step_with_realistic_bounce)
-        self.anim_timer.start(1000 // 60)  # 60 FPS
+        self.anim_player = player_name
+        self.last_drop = (seed, chip.x())
+        if self.precompute_drops:
+            geometry = board_geometry(w, h, chip_d, len(self.slots), self.board_geometry)
+            if self.physics_worker is not None:
+                trajectory = self.trajectory_cache.lookup(seed, chip.x(), geometry, chip.y())
+                if trajectory is None:
+                    # Computed on the shared worker thread; the chip waits at the top until it's ready
+                    self.physics_worker.compute(self, chip, player_name, seed, geometry, self.peg_positions,
+                                                self.peg_index)
+                    return
+            else:
+                start = self.clock()
+                trajectory = self.trajectory_cache.get(
+                    seed, chip.x(), geometry, self.peg_positions, self.peg_index, chip.y()
+                )
+                if self.metrics is not None:
+                    self.metrics.record_event("precompute", self.clock() - start)
+            self.start_precomputed_drop(chip, player_name, trajectory)
+            return
+        # Live mode: stepped each frame, seeded so it follows the same path as a precomputed drop
+        self.anim_trajectory = None
+        physics = self.batch_physics.reset(1, chip.x(), seeds=[seed])
+        physics.y[:] = chip.y()
+        self.chips.add(chip, player_name, chip_d, seed, chip.x(), chip.y(), physics=physics)
+        self.wake_frame_timer()
+
+    def start_precomputed_drop(self, chip, player_name, trajectory):
+        seed, x, y, chip_d = chip.data(0)
+        self.chips.add(chip, player_name, chip_d, seed, x, y, trajectory=trajectory)
+        if chip is self.anim_chip:
+            self.anim_trajectory = trajectory
+        self.wake_frame_timer()
+
+    def wake_frame_timer(self):
+        # Boards in a BoardGroup are ticked by the group's shared frame clock instead of their own timer
+        if self.frame_clock is not None:
+            self.frame_clock.wake(self)
+        elif not self.anim_timer.isActive():
+            self._accumulator = 0.0
+            self._last_frame = self.clock()
+            self.anim_timer.start(self.frame_interval_ms())
+
+    def frame_interval_ms(self):
+        # Render at the display's refresh rate (e.g. 144 Hz); physics stays at physics_dt
+        screen = self.screen()
+        refresh = screen.refreshRate() if screen is not None else 0
+        return max(1, int(1000 / refresh)) if refresh > 0 else 1000 // 60
+
+    def launch_chip(self, player_name, chip_color, release_x=None, seed=None):
+        # Drop a new chip straight away, alongside any chips already falling
+        chip = self.make_chip(chip_color)
+        if release_x is not None:
+            w = self.viewport().width()
+            chip.setPos(min(max(release_x, 0), w - chip.rect().width()), self.chip_start_y)
+        self.start_chip_drop(chip, seed=seed, player_name=player_name)
+        return chip
+
+    def replay_last_drop(self):
+        # Instant replay: same seed and release x, so the path comes straight from the cache
+        if self.last_drop is None:
+            return None
+        seed, release_x = self.last_drop
+        return self.launch_chip(self.anim_player, self.chip_color, release_x, seed)
+
+    def _on_frame(self):
+        # Fixed-timestep accumulator: run as many physics steps as real time calls for, then
+        # draw each chip interpolated between its last two physics positions
+        now = self.clock()
+        metrics = self.metrics
+        if metrics is not None:
+            timer = self.anim_timer if self.frame_clock is None else self.frame_clock.timer
+            metrics.begin_frame(now - self._last_frame, timer.interval() / 1000)
+        self._accumulator += min(now - self._last_frame, self.max_frame_time)
+        self._last_frame = now
+        while self._accumulator >= self.physics_dt and len(self.chips):
+            self._physics_step()
+            self._accumulator -= self.physics_dt
+        if metrics is not None:
+            stepped = self.clock()
+            metrics.add("physics", stepped - now - metrics.current["sound"])
+        if len(self.chips):
+            self._render_chips(self._accumulator / self.physics_dt)
+        else:
+            self.anim_timer.stop()
+        if metrics is not None:
+            metrics.add("scene", self.clock() - stepped)
+            metrics.end_frame(len(self.chips))
+            if self.metrics_overlay is not None and metrics.count % 30 == 0:
+                self.metrics_overlay.setText(metrics.overlay_text())
 
     def _chip_step_with_realistic_bounce(self):
-        chip = self.anim_chip
-        w = self.viewport().width()
-        h = self.viewport().height()
-        chip_d = chip.rect().width()
-        self.anim_step += 1
-        chip_x, chip_y, hit_peg, vy = self.physics.next_bounce(
-            chip.x(), self.anim_y, chip_d, self.anim_step, self.anim_max_steps
-        )
-        chip.setX(chip_x)
-        chip.setY(chip_y)
-        self.anim_y = chip_y
-        if hit_peg:
-            self.bounce_sound.play()
-        # Land
-        if self.anim_y >= h - h / 13 * 1.2 or self.anim_step >= self.anim_max_steps:
-            QTimer.singleShot(120, lambda: self.resolve_chip(chip, self.anim_player))
+        # Exactly one physics step for every chip in flight, drawn at its new position
+        self._physics_step()
+        self._render_chips(1.0)
+        if not len(self.chips):
             self.anim_timer.stop()
 
+    def _physics_step(self):
+        table = self.chips
+        hit_rows = []
+        landed_rows = []
+        live = table.live_rows()
+        for chip_d in np.unique(table.chip_d[live]):
+            group = live[table.chip_d[live] == chip_d]
+            state = table.state.take(group)
+            hits, landed = self.batch_physics.step(state, chip_d)
+            table.state.put(group, state)
+            table.advance(group, state.x, state.y)
+            hit_rows.extend(group[hits])
+            landed_rows.extend(group[landed])
+        for row in table.replayed_rows():
+            trajectory = table.trajectories[row]
+            frame = table.frame[row]
+            chip_x, chip_y, hit = trajectory.point(frame)
+            table.advance(row, chip_x, chip_y)
+            if hit:
+                hit_rows.append(row)
+            table.frame[row] = frame + 1
+            if frame + 1 >= len(trajectory):
+                landed_rows.append(row)
+        if hit_rows:
+            if self.metrics is not None:
+                start = self.clock()
+                self._play_hits(hit_rows)
+                self.metrics.add("sound", self.clock() - start)
+            else:
+                self._play_hits(hit_rows)
+        # Land
+        for row in landed_rows:
+            chip = table.items[row]
+            player_name = table.players[row]
+            chip.setPos(table.cur_x[row], table.cur_y[row])
+            table.remove(row)
+            # The board is the timer's context, so a pending resolve dies with the board
+            QTimer.singleShot(120, self, lambda chip=chip, player_name=player_name: self.resolve_chip(chip, player_name))
+
+    def _play_hits(self, rows):
+        # Impact speed is the distance covered in the hitting step; the hardest hits get the
+        # frame's few voices and the rest are dropped by the pool's rate limit
+        if not self.bounce_sound.available():
+            return
+        table = self.chips
+        speeds = np.hypot(table.cur_x[rows] - table.prev_x[rows], table.cur_y[rows] - table.prev_y[rows])
+        if len(speeds) > 1:
+            speeds = -np.sort(-speeds)
+        for speed in speeds:
+            if not self.bounce_sound.play(speed):
+                break
+
+    def _render_chips(self, alpha):
+        table = self.chips
+        rows = table.rows()
+        xs, ys = table.interpolated(rows, alpha)
+        for row, x, y in zip(rows, xs, ys):
+            table.items[row].setPos(x, y)
+
+    def set_render_mode(self, mode):
+        """
+        "items": background, pegs, slots and labels are scene items, redrawn wherever a chip passes.
+        "cached": they are painted once into a pixmap that drawBackground blits, and hidden from the
+        scene, so a frame repaints only the chips' dirty regions at a cost set by the number of
+        chips, not pegs. The pixmap is rebuilt after a resize or label change.
+        """
+        if mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode {mode!r}; expected one of {', '.join(RENDER_MODES)}")
+        self.render_mode = mode
+        self._invalidate_static_layer()
+
+    def set_opengl(self, enabled):
+        """
+        Renders through a QOpenGLWidget viewport. Returns False (and keeps the raster viewport)
+        when no OpenGL context is available, e.g. headless without a software GL driver.
+        """
+        if enabled == self.opengl:
+            return True
+        if enabled:
+            viewport = make_opengl_viewport()
+            if viewport is None:
+                return False
+            self.setViewport(viewport)
+            # GL swaps whole frames, so partial updates would leave stale regions
+            self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        else:
+            self.setViewport(None)
+            self.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
+        self.opengl = enabled
+        self.setMouseTracking(True)
+        self._invalidate_static_layer()
+        return True
+
+    def static_items(self):
+        return self.pegs + [slot for slot, _ in self.slots] + self.slot_texts
+
+    def _invalidate_static_layer(self):
+        self._static_layer = None
+        cached = self.render_mode == "cached"
+        for item in self.static_items():
+            item.setVisible(not cached)
+        self.scene.update()
+
+    def static_layer(self):
+        # Background, pegs, slots and labels at the current layout, painted into one pixmap
+        if self._static_layer is None:
+            w, h = self.layout_size or (self.viewport().width(), self.viewport().height())
+            ratio = self.devicePixelRatioF()
+            pixmap = QPixmap(max(1, int(w * ratio)), max(1, int(h * ratio)))
+            pixmap.setDevicePixelRatio(ratio)
+            painter = QPainter(pixmap)
+            painter.setRenderHints(self.renderHints())
+            painter.fillRect(QRectF(0, 0, w, h), self.scene.backgroundBrush())
+            option = QStyleOptionGraphicsItem()
+            for item in self.static_items():
+                painter.save()
+                painter.translate(item.pos())
+                item.paint(painter, option, None)
+                painter.restore()
+            painter.end()
+            self._static_layer = pixmap
+        return self._static_layer
+
+    def drawBackground(self, painter, rect):
+        if self.render_mode != "cached":
+            return super().drawBackground(painter, rect)
+        # Blit only the exposed part; the pixmap is in scene coordinates at the device pixel ratio
+        pixmap = self.static_layer()
+        ratio = pixmap.devicePixelRatio()
+        layer_rect = QRectF(0, 0, pixmap.width() / ratio, pixmap.height() / ratio)
+        if not layer_rect.contains(rect):
+            # Anything outside the board (e.g. mid-resize) just gets the plain background
+            super().drawBackground(painter, rect)
+        target = rect.intersected(layer_rect)
+        if not target.isEmpty():
+            source = QRectF(target.x() * ratio, target.y() * ratio, target.width() * ratio, target.height() * ratio)
+            painter.drawPixmap(target, pixmap, source)
+
+    def paintEvent(self, event):
+        if self.metrics is None:
+            super().paintEvent(event)
+        else:
+            start = self.clock()
+            super().paintEvent(event)
+            self.metrics.add_paint(self.clock() - start)
+        if not self._painted:
+            self._painted = True
+            self.first_paint.emit()
+
+    def load_sounds_async(self):
+        # Loads the sound pools in the background (no-op if already loaded or loading)
+        if self.sound_loader is None and not self.bounce_sound.loaded:
+            self.sound_loader = SoundLoader([self.bounce_sound, self.land_sound], parent=self)
+            self.sound_loader.start()
+        return self.sound_loader
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_F3:
+            self.set_metrics_overlay(self.metrics_overlay is None)
+            return
+        if event.key() == Qt.Key_H:
+            self.set_probability_heatmap(self.odds_text is None)
+            return
+        super().keyPressEvent(event)
+
+    def enable_metrics(self, capacity=600, export_path=None, export_interval_ms=5000):
+        """
+        Starts recording frame timings. With export_path, the Prometheus text is rewritten there
+        every export_interval_ms (e.g. for node_exporter's textfile collector).
+        """
+        if self.metrics is None:
+            self.metrics = FrameMetrics(capacity)
+        self.metrics_path = export_path
+        if export_path and self._metrics_timer is None:
+            self._metrics_timer = QTimer(self)
+            self._metrics_timer.timeout.connect(self._export_metrics)
+            self._metrics_timer.start(export_interval_ms)
+        return self.metrics
+
+    def disable_metrics(self):
+        self.set_metrics_overlay(False)
+        if self._metrics_timer is not None:
+            self._metrics_timer.stop()
+            self._metrics_timer = None
+        self.metrics = None
+
+    def _export_metrics(self):
+        if self.metrics is not None and self.metrics_path:
+            self.metrics.write(self.metrics_path)
+
+    def set_metrics_overlay(self, visible):
+        # Toggled with F3; turning the overlay on also turns recording on
+        if visible and self.metrics_overlay is None:
+            self.enable_metrics()
+            overlay = QGraphicsSimpleTextItem(self.metrics.overlay_text())
+            overlay.setFont(self.neon_font(9))
+            overlay.setBrush(self.neon_brush("#39ff14", glow=1.0))
+            overlay.setPos(6, 6)
+            overlay.setZValue(100)
+            self.scene.addItem(overlay)
+            self.metrics_overlay = overlay
+        elif not visible and self.metrics_overlay is not None:
+            self.scene.removeItem(self.metrics_overlay)
+            self.metrics_overlay = None
+
+    def enable_probability_map(self, buckets=64, drops_per_bucket=2000, cache_dir=None):
+        """
+        Starts keeping self.probability_map in step with the board geometry. Maps are computed off
+        the GUI thread (or loaded from disk) and arrive a moment later through _set_probability_map.
+        """
+        if self.probability_loader is None:
+            kwargs = {"cache_dir": cache_dir} if cache_dir else {}
+            self.probability_loader = ProbabilityMapLoader(buckets, drops_per_bucket, parent=self, **kwargs)
+            self.probability_loader.ready.connect(self._set_probability_map)
+            w, h = self.viewport().width(), self.viewport().height()
+            self.probability_loader.request(w, h, self.chip_diameter(), len(self.slots), self.board_geometry)
+        return self.probability_loader
+
+    def _set_probability_map(self, pmap):
+        if pmap is not None and pmap.key != self.probability_loader.pending_key:
+            return
+        self.probability_map = pmap
+        if self.odds_text is not None:
+            self._build_heatmap()
+
+    def set_heatmap_target(self, slot):
+        self.heatmap_target = slot
+        if self.odds_text is not None:
+            self._build_heatmap()
+
+    def set_probability_heatmap(self, visible):
+        # Toggled with H: top-row strip shaded by the chance of landing in heatmap_target
+        if visible and self.odds_text is None:
+            self.enable_probability_map()
+            self.odds_text = QGraphicsSimpleTextItem("computing odds...")
+            self.odds_text.setFont(self.neon_font(9))
+            self.odds_text.setBrush(self.neon_brush("#ffe600", glow=1.0))
+            self.odds_text.setZValue(100)
+            self.scene.addItem(self.odds_text)
+            self._build_heatmap()
+        elif not visible and self.odds_text is not None:
+            self._clear_heatmap()
+            self.scene.removeItem(self.odds_text)
+            self.odds_text = None
+
+    def _clear_heatmap(self):
+        for item in self.heatmap_items:
+            self.scene.removeItem(item)
+        self.heatmap_items = []
+
+    def _build_heatmap(self):
+        # Rebuilt only when the map or target changes; frames just draw the existing rects
+        self._clear_heatmap()
+        pmap = self.probability_map
+        if pmap is None:
+            self.odds_text.setText("computing odds...")
+            return
+        if self.heatmap_target is None or self.heatmap_target >= pmap.n_slots:
+            # Default to the hardest slot to hit, the one people usually ask about
+            self.heatmap_target = int(np.argmin(pmap.probabilities[:, 1:].mean(axis=0)))
+        column = pmap.probabilities[:, self.heatmap_target + 1]
+        peak = column.max() or 1.0
+        chip_d = self.chip_diameter()
+        for b, chance in enumerate(column):
+            color = QColor("#ff00de")
+            color.setAlphaF(0.08 + 0.72 * chance / peak)
+            item = QGraphicsRectItem(b * pmap.bucket_width + chip_d / 2, self.chip_start_y, pmap.bucket_width, chip_d)
+            item.setPen(QPen(Qt.NoPen))
+            item.setBrush(QBrush(color))
+            item.setZValue(5)
+            self.scene.addItem(item)
+            self.heatmap_items.append(item)
+        x = self.dragging_chip.x() if self.dragging_chip is not None else pmap.max_x / 2
+        self._update_odds_text(x)
+
+    def _update_odds_text(self, release_x):
+        # O(1) bucket lookup, cheap enough for every mouse move
+        if self.odds_text is None or self.probability_map is None or self.heatmap_target is None:
+            return
+        label = self.reward_labels[self.heatmap_target]
+        chance = self.probability_map.slot_chance(release_x, self.heatmap_target)
+        _, best = self.probability_map.best_release(self.heatmap_target)
+        self.odds_text.setText(f"{label}: {chance:.1%} here, best {best:.1%}")
+        self.odds_text.setPos(6, self.chip_start_y + self.chip_diameter() + 4)
+
     def drop_chip(self, player_name, chip_color):
         # For programmatic drops (e.g., from main window)
         self.chip_color = chip_color
         self.current_player = player_name
         self.chip_ready = True
-        self.init_board()
+        self.reset_chip()
 
     def resolve_chip(self, chip, player_name):
-        chip_center_x = chip.x() + chip.rect().width() / 2
         w = self.viewport().width()
-        slot_width = w / 10
-        slot_index = int((chip_center_x - slot_width * 0.1) // slot_width)
-        if 0 <= slot_index < len(self.slots):
+        slot_index = landing_slot(chip.x(), chip.rect().width(), w, len(self.slots), self.board_geometry)
+        self.land_sound.play()
+        # Landed chips stay visible until the next drop resets the board (or newer ones push them out)
+        self.landed_chips.append(chip)
+        while len(self.landed_chips) > self.max_landed_chips:
+            old = self.landed_chips.pop(0)
+            if old.scene() is self.scene:
+                self.scene.removeItem(old)
+        return self._publish_result(chip, player_name, slot_index, chip.data(0))
+
+    def resolve_instantly(self, drops):
+        """
+        Resolves [(player_name, release_x, seed), ...] with headless batch physics instead of animating
+        them (release_x None = top center). The same seed lands in the same slot as a dropped chip, and
+        each result is logged and sent through result_ready (with chip None). Returns the result dicts.
+        """
+        if not drops:
+            return []
+        w = self.viewport().width()
+        chip_d = self.chip_diameter()
+        players, xs, seeds = zip(*drops)
+        xs = np.array([w / 2 - chip_d / 2 if x is None else min(max(x, 0), w - chip_d) for x in xs])
+        # Seeded mode consumes each chip's random.Random(seed) exactly like a live or precomputed drop
+        slots = self.batch_physics.simulate(len(drops), xs, chip_d, seeds=list(seeds))
+        return [self._publish_result(None, player, int(slot), (seed, float(x), self.chip_start_y, chip_d))
+                for player, x, seed, slot in zip(players, xs, seeds, slots)]
+
+    def _publish_result(self, chip, player_name, slot_index, drop):
+        label = None
+        if slot_index >= 0:
             label = self.slots[slot_index][1]
             result = f"{player_name} landed on: {label}"
         else:
             result = f"{player_name} missed the slots!"
-        self.land_sound.play()
+        drop_id = None
+        if self.replay_log is not None and drop is not None:
+            seed, release_x, release_y, chip_d = drop
+            w, h = self.viewport().width(), self.viewport().height()
+            drop_id = self.replay_log.append(seed, release_x, release_y, w, h, chip_d, len(self.slots), slot_index,
+                                             template_hash(self.reward_labels), self.board_geometry)
         parent = self.parent()
         if parent and hasattr(parent, 'display_result'):
-            parent.display_result(result) 
\ No newline at end of file
+            parent.display_result(result)
+        reward = self.slot_reward(slot_index) if slot_index >= 0 else None
+        info = {"player": player_name, "slot": slot_index, "label": label, "result": result,
+                "seed": drop[0] if drop else None, "drop_id": drop_id,
+                "payout": reward.payout if reward is not None else None}
+        if self.results_store is not None:
+            self.results_store.record(info, self.reward_labels)
+        self.result_ready.emit(chip, info)
+        return info
@@ -0,0 +1,128 @@
+import sys
+import os
+import gc
+import time
+import wave
+import weakref
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PySide6.QtWidgets import QApplication
+from plinko_board import PlinkoBoard
+from utils import audio
+from utils.audio import SoundLoader, SoundPool, pitch_variant
+
+app = QApplication.instance() or QApplication([])
+# Voice tests need real QSoundEffects; without QtMultimedia (e.g. no libpulse) the board is silent instead
+needs_multimedia = pytest.mark.skipif(audio.multimedia() is None, reason="QtMultimedia is not available")
+
+def write_wav(path, framerate=22050, frames=2205):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(framerate)
+        f.writeframes(b"\x00\x01" * frames)
+    return str(path)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_pitch_variants_scale_sample_rate(tmp_path):
+    source = write_wav(tmp_path / "bounce.wav")
+    higher = pitch_variant(source, 1.12, cache_dir=str(tmp_path / "cache"))
+    with wave.open(higher, "rb") as f:
+        assert f.getframerate() == int(22050 * 1.12)
+        assert f.getnframes() == 2205
+    assert pitch_variant(source, 1.0) == source
+    # Unreadable or missing files fall back to the original path
+    assert pitch_variant(str(tmp_path / "missing.wav"), 1.12, cache_dir=str(tmp_path)) == str(tmp_path / "missing.wav")
+
+@needs_multimedia
+def test_round_robin_voices_and_frame_rate_limit(tmp_path):
+    clock = FakeClock()
+    pool = SoundPool(write_wav(tmp_path / "bounce.wav"), voices=2, max_per_frame=3, clock=clock,
+                     cache_dir=str(tmp_path))
+    assert len(pool.voices()) == 2
+    assert [pool.play(), pool.play(), pool.play(), pool.play()] == [True, True, True, False]
+    # Voices were used in turn: 3 plays over 2 voices leave the cursor on the second one
+    assert pool.cursors == [1]
+    assert not pool.available()
+    clock.now += 1 / 60
+    assert pool.available() and pool.play()
+    assert (pool.plays, pool.dropped) == (4, 1)
+
+@needs_multimedia
+def test_impact_speed_picks_pitch_and_volume(tmp_path):
+    clock = FakeClock()
+    pool = SoundPool(write_wav(tmp_path / "bounce.wav"), voices=1, pitches=(0.9, 1.0, 1.12),
+                     max_per_frame=10, full_speed=40.0, clock=clock, cache_dir=str(tmp_path))
+    low, mid, high = (bank[0] for bank in pool.banks)
+    pool.play(2.0)
+    pool.play(20.0)
+    pool.play(400.0)
+    assert low.volume() == pytest.approx(0.35 + 0.65 * 2 / 40)
+    assert mid.volume() == pytest.approx(0.35 + 0.65 * 0.5)
+    assert high.volume() == pytest.approx(1.0)
+    assert high.source().toLocalFile().endswith("bounce_x1.120.wav")
+
+@needs_multimedia
+def test_many_simultaneous_hits_stay_within_budget():
+    board = PlinkoBoard([str(i) for i in range(10)])
+    clock = FakeClock()
+    board.bounce_sound.clock = clock
+    w = board.viewport().width()
+    for i in range(100):
+        board.launch_chip(f"P{i}", "#39ff14", release_x=(i * 7) % w, seed=i)
+    for _ in range(120):
+        board._physics_step()
+        clock.now += 1 / 60
+    pool = board.bounce_sound
+    assert pool.plays <= 120 * pool.max_per_frame
+    assert pool.dropped > 0
+    board.anim_timer.stop()
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+def test_lazy_pool_is_silent_until_loaded_in_background(tmp_path):
+    pool = SoundPool(write_wav(tmp_path / "bounce.wav"), voices=2, pitches=(1.0, 1.12),
+                     cache_dir=str(tmp_path), load=False)
+    assert not pool.loaded and not pool.play()
+    results = []
+    loader = SoundLoader([pool])
+    loader.finished.connect(results.append)
+    loader.start()
+    assert wait_for(lambda: results)
+    assert results == [audio.multimedia() is not None]
+    assert pool.loaded and len(pool.banks) == (2 if results[0] else 0)
+
+def test_missing_multimedia_leaves_board_silent(monkeypatch):
+    monkeypatch.setattr(audio, "_multimedia", (None, "libpulse.so.0: cannot open shared object file"))
+    board = PlinkoBoard([str(i) for i in range(10)])
+    assert board.bounce_sound.banks == [] and not board.bounce_sound.play()
+    assert "libpulse" in audio.multimedia_error()
+    board.launch_chip("P", "#39ff14", seed=1)
+    for _ in range(30):
+        board._physics_step()
+    board.anim_timer.stop()
+
+def test_board_is_freed_without_cyclic_gc():
+    # Regression: the pools held the board strongly, so boards lived until a GC pass,
+    # which could then destroy them in the middle of a paint
+    gc.collect()
+    gc.disable()
+    try:
+        board = PlinkoBoard([str(i) for i in range(10)], load_sounds=False)
+        loader = board.load_sounds_async()
+        assert wait_for(lambda: board.bounce_sound.loaded)
+        board_ref, loader_ref = weakref.ref(board), weakref.ref(loader)
+        del board, loader
+        assert board_ref() is None and loader_ref() is None
+    finally:
+        gc.enable()
@@ -0,0 +1,26 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.run import compare, load_baseline, measure, save_baseline
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = {"physics.next_bounce": 1.0, "render.view_frame.1_chips": 2.0, "layout.init_board.360x640": 1.0}
+    results = {"physics.next_bounce": 1.2, "render.view_frame.1_chips": 2.6, "layout.init_board.360x640": 0.5,
+               "physics.new_benchmark": 9.0}
+    regressions = compare(results, baseline, threshold=0.25)
+    # 1.2x is within 25%, 1.3x is not; faster and unknown benchmarks never fail
+    assert [(name, ratio) for name, _, _, ratio in regressions] == [("render.view_frame.1_chips", 1.3)]
+    assert compare(results, baseline, threshold=0.1)[0][0] == "physics.next_bounce"
+
+def test_baseline_round_trip(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    results = {"physics.full_drop": 0.0005, "render.export_frame.1_chips": 0.0003}
+    save_baseline(results, path)
+    assert load_baseline(path) == results
+    assert compare(results, load_baseline(path), threshold=0.0) == []
+
+def test_measure_returns_seconds_per_call():
+    calls = []
+    seconds = measure(lambda: calls.append(1), number=4, repeat=3)
+    assert len(calls) == 1 + 4 * 3
+    assert 0 <= seconds < 0.01
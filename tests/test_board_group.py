@@ -0,0 +1,64 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PySide6.QtWidgets import QApplication
+from utils.board_group import BoardGroup
+from utils.trajectory import board_geometry, compute_trajectory
+
+app = QApplication.instance() or QApplication([])
+REWARDS = [str(i) for i in range(10)]
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.002)
+    return condition()
+
+def test_boards_share_clock_sounds_geometry_and_worker():
+    group = BoardGroup()
+    boards = [group.create_board(REWARDS) for _ in range(4)]
+    assert len({id(board.bounce_sound) for board in boards}) == 1
+    assert all(board.board_geometry is group.geometry for board in boards)
+    assert all(board.load_sounds_async() is group.sound_loader for board in boards)
+    results = []
+    for board in boards:
+        board.result_ready.connect(lambda chip, result: results.append(result))
+    # Only boards with chips join the frame clock; their own timers never run
+    boards[1].launch_chip("Ann", "#39ff14", release_x=100, seed=5)
+    boards[3].launch_chip("Bob", "#39ff14", release_x=300, seed=6)
+    assert wait_for(lambda: group.physics_worker.pending == 0)
+    assert group.frame_clock.active == [boards[1], boards[3]]
+    assert group.frame_clock.timer.isActive()
+    assert not any(board.anim_timer.isActive() for board in boards)
+    assert group.stats()["chips_in_flight"] == 2
+    for _ in range(700):
+        group.frame_clock._tick()
+        for board in group.frame_clock.active:
+            board._accumulator = board.physics_dt
+    assert group.frame_clock.active == [] and not group.frame_clock.timer.isActive()
+    assert wait_for(lambda: len(results) == 2)
+    w, h = boards[1].viewport().width(), boards[1].viewport().height()
+    geometry = board_geometry(w, h, boards[1].chip_diameter(), len(REWARDS), group.geometry)
+    expected = {"Ann": compute_trajectory(5, 100, geometry).slot, "Bob": compute_trajectory(6, 300, geometry).slot}
+    assert {result["player"]: result["slot"] for result in results} == expected
+    group.close()
+
+def test_worker_precomputes_off_the_gui_thread_and_skips_removed_chips():
+    group = BoardGroup()
+    board = group.create_board(REWARDS)
+    chips = [board.launch_chip(f"P{i}", "#39ff14", release_x=i * 20, seed=100 + i) for i in range(20)]
+    # launch_chip returned before any trajectory was computed
+    assert group.physics_worker.pending > 0
+    board.scene.removeItem(chips[0])
+    assert wait_for(lambda: group.physics_worker.pending == 0)
+    assert len(board.chips) == 19
+    # Cached now, so the same drop starts at once
+    again = board.launch_chip("P1", "#39ff14", release_x=20, seed=101)
+    assert group.physics_worker.pending == 0 and len(board.chips) == 20
+    assert board.chips.items[board.chips.rows()[-1]] is again
+    group.remove_board(board)
+    assert board.frame_clock is None and board.anim_timer.isActive()
+    board.anim_timer.stop()
+    group.close()
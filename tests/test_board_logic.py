@@ -137,4 +137,127 @@ def test_physics_bounce_and_fall_time():
     # Chip should bounce up at least once
     assert up_bounce_detected
     # Fall time (steps) should be within a realistic range of the randomized target_steps
-    assert physics.target_steps * 0.4 <= max_steps <= physics.target_steps * 1.2 
\ No newline at end of file
+    assert physics.target_steps * 0.4 <= max_steps <= physics.target_steps * 1.2
+
+
+def test_precomputed_drop_replays_from_cache():
+    rewards = [str(i) for i in range(10)]
+    board = PlinkoBoard(rewards)
+    called = {}
+    class FakeParent(QWidget):
+        def display_result(self, result):
+            called['result'] = result
+    fake_parent = FakeParent()
+    board.setParent(fake_parent)
+    board.init_board()  # Ensure chip is created
+    chip = board.dragging_chip
+    chip.setPos(120, 0)
+    board.start_chip_drop(chip, seed=1234)
+    trajectory = board.anim_trajectory
+    assert trajectory is not None and len(trajectory) > 0
+    while board.anim_timer.isActive():
+        board._chip_step_with_realistic_bounce()
+    assert (chip.x(), chip.y()) == trajectory.point(len(trajectory) - 1)[:2]
+    board.resolve_chip(chip, 'Tester')
+    expected = rewards[trajectory.slot] if trajectory.slot >= 0 else None
+    assert called['result'] == (f"Tester landed on: {expected}" if expected else "Tester missed the slots!")
+    # Instant replay reuses the cached trajectory instead of simulating again
+    misses = board.trajectory_cache.misses
+    board.replay_last_drop()
+    assert board.anim_trajectory is trajectory
+    assert board.trajectory_cache.misses == misses
+    board.anim_timer.stop()
+
+def test_drop_reuses_static_board_items():
+    rewards = [str(i) for i in range(10)]
+    board = PlinkoBoard(rewards)
+    pegs = list(board.pegs)
+    slots = [slot for slot, _ in board.slots]
+    item_count = len(board.scene.items())
+    for _ in range(5):
+        board.drop_chip('Tester', '#39ff14')
+    assert board.pegs == pegs
+    assert [slot for slot, _ in board.slots] == slots
+    # Only the chip is replaced, so the scene does not grow
+    assert len(board.scene.items()) == item_count
+    assert board.dragging_chip.brush().color().name() == '#39ff14'
+
+def test_layout_change_repositions_existing_items():
+    rewards = [str(i) for i in range(10)]
+    board = PlinkoBoard(rewards)
+    peg = board.pegs[0]
+    board.show()
+    old_rect = peg.rect()
+    board.setFixedSize(540, 960)
+    app.processEvents()
+    board.update_layout()
+    assert board.pegs[0] is peg
+    assert peg.rect() != old_rect
+    assert board.peg_positions[0][0] == peg.rect().center().x()
+    board.close()
+
+def test_label_change_updates_text_only():
+    rewards = [str(i) for i in range(10)]
+    board = PlinkoBoard(rewards)
+    pegs = list(board.pegs)
+    texts = list(board.slot_texts)
+    board.reward_labels = rewards[:3] + ['Vault Key'] + rewards[4:]
+    board.init_board()
+    assert board.pegs == pegs and board.slot_texts == texts
+    assert board.slot_texts[3].text() == 'Vault Key'
+    assert board.slots[3][1] == 'Vault Key'
+
+def test_many_chips_in_flight_share_one_timer():
+    rewards = [str(i) for i in range(10)]
+    board = PlinkoBoard(rewards)
+    results = []
+    class FakeParent(QWidget):
+        def display_result(self, result):
+            results.append(result)
+    fake_parent = FakeParent()
+    board.setParent(fake_parent)
+    w = board.viewport().width()
+    chips = []
+    for i in range(60):
+        # Half the chips replay precomputed paths, half are stepped live from the same seeds
+        board.precompute_drops = i % 2 == 0
+        chips.append(board.launch_chip(f"P{i}", '#39ff14', release_x=(i // 2) * w / 30, seed=i // 2))
+    assert len(board.chips) == 60
+    assert len(board.chips.live_rows()) == len(board.chips.replayed_rows()) == 30
+    assert board.anim_timer.isActive()
+    for _ in range(700):
+        if not board.anim_timer.isActive():
+            break
+        board._chip_step_with_realistic_bounce()
+    assert len(board.chips) == 0
+    # Live stepping and precomputed replay agree chip for chip
+    for replayed, live in zip(chips[::2], chips[1::2]):
+        assert (replayed.x(), replayed.y()) == (live.x(), live.y())
+    for i, chip in enumerate(chips):
+        board.resolve_chip(chip, f"P{i}")
+    assert len(results) == 60
+
+def test_fixed_timestep_outcome_independent_of_frame_rate():
+    rewards = [str(i) for i in range(10)]
+    final_positions = []
+    for frame_time in (1 / 144, 1 / 30, 0.023):
+        board = PlinkoBoard(rewards)
+        now = [0.0]
+        board.clock = lambda: now[0]
+        chip = board.launch_chip('Tester', '#ff00de', release_x=200, seed=77)
+        trajectory = board.anim_trajectory
+        frames = 0
+        while board.anim_timer.isActive() and frames < 10000:
+            now[0] += frame_time
+            board._on_frame()
+            frames += 1
+            if board.anim_timer.isActive():
+                # Rendered position always lies between the last two physics positions
+                row = board.chips.rows()[0]
+                lo = min(board.chips.prev_y[row], board.chips.cur_y[row])
+                hi = max(board.chips.prev_y[row], board.chips.cur_y[row])
+                assert lo - 1e-9 <= chip.y() <= hi + 1e-9
+        # Wall-clock duration follows physics time, not the number of frames
+        assert abs(frames * frame_time - len(trajectory) / 60) < frame_time + 1 / 60
+        final_positions.append((chip.x(), chip.y()))
+    assert final_positions[0] == final_positions[1] == final_positions[2]
@@ -0,0 +1,122 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PySide6.QtWidgets import QApplication
+from plinko_board import PlinkoBoard
+from utils.drop_scheduler import DropScheduler
+from utils.trajectory import board_geometry, compute_trajectory
+
+app = QApplication.instance() or QApplication([])
+REWARDS = [str(i) for i in range(10)]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def run_until(board, done, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while not done() and time.monotonic() < deadline:
+        app.processEvents()
+        if len(board.chips):
+            board._chip_step_with_realistic_bounce()
+        else:
+            time.sleep(0.005)
+    return done()
+
+def test_round_robin_over_players_within_concurrency_limit():
+    board = PlinkoBoard(REWARDS)
+    scheduler = DropScheduler(board, max_concurrent=3)
+    for i in range(6):
+        scheduler.submit("Ann", seed=i)
+    scheduler.submit("Bob", seed=10)
+    scheduler.submit("Bob", seed=11)
+    scheduler.pump()
+    table = board.chips
+    # Ann queued first, but Bob's drops are interleaved instead of waiting behind all six of hers
+    assert [table.players[r] for r in table.rows()] == ["Ann", "Bob", "Ann"]
+    assert scheduler.stats()["queued"] == 5 and scheduler.queued_for("Bob") == 1
+    results = []
+    scheduler.resolved.connect(lambda request_id, result: results.append(result["player"]))
+    peak = 0
+    def done():
+        nonlocal peak
+        peak = max(peak, len(board.chips))
+        return len(results) == 8
+    assert run_until(board, done)
+    assert peak <= 3
+    assert results.count("Bob") == 2
+    stats = scheduler.stats()
+    assert (stats["queued"], stats["in_flight"], stats["animated"], stats["turbo"]) == (0, 0, 8, 0)
+    assert stats["wait_max"] >= stats["wait_p95"] >= stats["wait_p50"] >= 0
+    scheduler.stop()
+    board.anim_timer.stop()
+
+def test_rate_limit_and_full_queue_reject_drops():
+    board = PlinkoBoard(REWARDS)
+    clock = FakeClock()
+    scheduler = DropScheduler(board, max_queue=4, rate=1.0, burst=2, clock=clock)
+    rejected = []
+    scheduler.rejected.connect(lambda player, reason: rejected.append(player))
+    assert scheduler.submit("Ann") == 1 and scheduler.submit("Ann") == 2
+    assert scheduler.submit("Ann") is None
+    clock.now += 1.0
+    assert scheduler.submit("Ann") == 3
+    assert scheduler.submit("Bob") == 4
+    # Queue full, whoever asks
+    assert scheduler.submit("Cat") is None
+    assert rejected == ["Ann", "Cat"]
+    stats = scheduler.stats()
+    assert (stats["rate_limited"], stats["full"], stats["queued"]) == (1, 1, 4)
+    scheduler.stop()
+
+def test_turbo_resolves_backlog_with_the_same_outcomes():
+    board = PlinkoBoard(REWARDS)
+    scheduler = DropScheduler(board, max_concurrent=2, turbo_threshold=10)
+    results = {}
+    scheduler.resolved.connect(lambda request_id, result: results.__setitem__(request_id, result))
+    w, h = board.viewport().width(), board.viewport().height()
+    chip_d = board.chip_diameter()
+    drops = {scheduler.submit(f"P{i % 4}", release_x=(i * 37) % w, seed=1000 + i): i for i in range(40)}
+    app.processEvents()
+    stats = scheduler.stats()
+    assert (stats["turbo"], stats["turbo_batches"], stats["queued"], len(results)) == (40, 1, 0, 40)
+    assert not len(board.chips)
+    geometry = board_geometry(w, h, chip_d, len(REWARDS), board.board_geometry)
+    for request_id, i in drops.items():
+        release_x = min((i * 37) % w, w - chip_d)
+        assert results[request_id]["seed"] == 1000 + i
+        assert results[request_id]["slot"] == compute_trajectory(1000 + i, release_x, geometry).slot
+    # Below the threshold drops are animated again
+    scheduler.submit("Ann", seed=7)
+    app.processEvents()
+    assert len(board.chips) == 1
+    scheduler.stop()
+    board.anim_timer.stop()
+
+def test_steady_stream_keeps_the_scene_bounded():
+    # Drops keep arriving, so the scheduler never goes idle and never resets the board
+    board = PlinkoBoard(REWARDS)
+    board.max_landed_chips = 5
+    scheduler = DropScheduler(board, max_concurrent=3)
+    base = len(board.scene.items())
+    resolved = []
+    def on_resolved(request_id, result):
+        resolved.append(request_id)
+        if len(resolved) + 3 <= 40:
+            scheduler.submit(f"P{len(resolved) % 4}")
+    scheduler.resolved.connect(on_resolved)
+    for i in range(3):
+        scheduler.submit(f"P{i}")
+    peak = 0
+    def done():
+        nonlocal peak
+        peak = max(peak, len(board.scene.items()))
+        return len(resolved) == 40
+    assert run_until(board, done)
+    assert len(board.landed_chips) == 5
+    assert peak <= base + 3 + 5 + 1
+    scheduler.stop()
+    board.anim_timer.stop()
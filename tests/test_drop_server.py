@@ -0,0 +1,187 @@
+import sys
+import os
+import json
+import gc
+import time
+import weakref
+import base64
+import socket
+import http.client
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PySide6.QtWidgets import QApplication
+from plinko_board import PlinkoBoard
+from utils.drop_scheduler import DropScheduler
+from utils.drop_server import DropServer, parse_drop_request
+
+app = QApplication.instance() or QApplication([])
+REWARDS = [str(i) for i in range(10)]
+
+@pytest.fixture
+def server():
+    board = PlinkoBoard(REWARDS)
+    server = DropServer(board, port=0, max_queue=8, max_in_flight=4)
+    server.start()
+    yield server
+    server.stop()
+
+def post(conn, payload):
+    conn.request("POST", "/drop", body=json.dumps(payload), headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+def pump(board, done, timeout=10.0):
+    # Deliver queued signals and step physics directly instead of waiting on the frame timer
+    deadline = time.monotonic() + timeout
+    while not done() and time.monotonic() < deadline:
+        app.processEvents()
+        if len(board.chips):
+            board._chip_step_with_realistic_bounce()
+        else:
+            time.sleep(0.005)
+    return done()
+
+def open_websocket(port):
+    sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+    key = base64.b64encode(os.urandom(16)).decode()
+    sock.sendall((f"GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                  f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+    response = b""
+    while b"\r\n\r\n" not in response:
+        response += sock.recv(1024)
+    assert response.startswith(b"HTTP/1.1 101")
+    return sock
+
+def read_text_frame(sock):
+    header = sock.recv(2, socket.MSG_WAITALL)
+    n = header[1] & 0x7F
+    if n == 126:
+        n = int.from_bytes(sock.recv(2, socket.MSG_WAITALL), "big")
+    return json.loads(sock.recv(n, socket.MSG_WAITALL))
+
+def test_parse_drop_request_validates_fields():
+    assert parse_drop_request({"player": " Ann ", "release_x": 12}) == ("Ann", "#ff00de", 12)
+    for bad in ({}, {"player": ""}, {"player": "Ann", "release_x": "left"}, {"player": "Ann", "color": 3}, [],
+                {"player": "Ann", "release_x": float("nan")}, {"player": "Ann", "release_x": float("inf")}):
+        with pytest.raises(ValueError):
+            parse_drop_request(bad)
+
+def test_drops_are_batched_launched_and_pushed_to_subscribers(server):
+    ws = open_websocket(server.port)
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    ids = []
+    for i in range(3):
+        status, body = post(conn, {"player": f"P{i}", "color": "#39ff14", "release_x": 100 + 150 * i})
+        assert status == 202
+        ids.append(body["id"])
+    assert pump(server.board, lambda: server.stats["results"] >= 3)
+    results = [read_text_frame(ws) for _ in range(3)]
+    assert sorted(r["id"] for r in results) == ids
+    assert {r["player"] for r in results} == {"P0", "P1", "P2"}
+    assert all("result" in r and "slot" in r for r in results)
+    # One keep-alive connection served all requests, and bursts were coalesced
+    assert server.stats["launched"] == 3
+    assert server.stats["batches"] <= 3
+    conn.request("GET", "/stats")
+    stats = json.loads(conn.getresponse().read())
+    assert stats["in_flight"] == 0 and stats["subscribers"] == 1
+    ws.close()
+
+def test_drops_go_through_the_scheduler_when_given_one():
+    board = PlinkoBoard(REWARDS)
+    scheduler = DropScheduler(board, max_concurrent=2, rate=0.01, burst=2)
+    server = DropServer(board, port=0, scheduler=scheduler)
+    server.start()
+    try:
+        ws = open_websocket(server.port)
+        conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        ids = [post(conn, {"player": "Bot", "release_x": 100 + 100 * i})[1]["id"] for i in range(3)]
+        assert pump(board, lambda: server.stats["results"] >= 3)
+        frames = sorted((read_text_frame(ws) for _ in range(3)), key=lambda r: r["id"])
+        assert [r["id"] for r in frames] == ids
+        # The per-player rate limit turned the third drop away; its slot was freed, not leaked
+        assert all("slot" in r for r in frames[:2])
+        assert frames[2]["error"] == "Bot is dropping too fast, slow down."
+        assert scheduler.counters["submitted"] == 2 and scheduler.counters["rate_limited"] == 1
+        assert server.snapshot()["in_flight"] == 0
+        ws.close()
+    finally:
+        server.stop()
+        scheduler.stop()
+
+def test_failed_launch_frees_its_slot_and_spares_the_batch(server, monkeypatch):
+    launch_chip = server.board.launch_chip
+    def launch(player, *args, **kwargs):
+        if player == "Broken":
+            raise ValueError("boom")
+        return launch_chip(player, *args, **kwargs)
+    monkeypatch.setattr(server.board, "launch_chip", launch)
+    ws = open_websocket(server.port)
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    for player in ("P0", "Broken", "P1"):
+        assert post(conn, {"player": player})[0] == 202
+    assert pump(server.board, lambda: server.stats["results"] >= 3)
+    frames = {r["player"]: r for r in (read_text_frame(ws) for _ in range(3))}
+    assert frames["Broken"]["error"] == "drop could not be launched: boom"
+    assert "slot" in frames["P0"] and "slot" in frames["P1"]
+    assert server.stats["launched"] == 2 and server.stats["failed"] == 1
+    assert server.snapshot()["in_flight"] == 0
+    ws.close()
+
+def test_full_queue_answers_429_without_blocking(server):
+    # Qt events are never pumped, so nothing lands and the in-flight slots stay taken
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    statuses = [post(conn, {"player": "Bot"})[0] for _ in range(30)]
+    assert statuses.count(202) <= server.max_queue + server.max_in_flight
+    assert statuses[-1] == 429
+    assert server.stats["rejected"] == statuses.count(429)
+
+def test_bad_requests_are_rejected(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    assert post(conn, {"color": "red"})[0] == 400
+    # json.loads accepts NaN; it would crash the physics on the GUI thread
+    status, body = post(conn, {"player": "Ann", "release_x": float("nan")})
+    assert status == 400 and "finite" in body["error"]
+    conn.request("POST", "/drop", body=b"not json")
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 400
+    conn.request("GET", "/nope")
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 404
+    # A body length that can't be parsed gets a 400, not a dropped connection
+    for length in ("abc", "-5"):
+        sock = socket.create_connection(("127.0.0.1", server.port), timeout=5)
+        sock.sendall(f"POST /drop HTTP/1.1\r\nHost: localhost\r\nContent-Length: {length}\r\n\r\n".encode())
+        response = b""
+        while chunk := sock.recv(1024):
+            response += chunk
+        sock.close()
+        assert response.startswith(b"HTTP/1.1 400") and b"Content-Length must be" in response
+
+def test_metrics_endpoint_serves_board_timings(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    conn.request("GET", "/metrics")
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 404
+    server.board.enable_metrics()
+    conn.request("GET", "/metrics")
+    response = conn.getresponse()
+    assert response.status == 200
+    assert response.getheader("Content-Type").startswith("text/plain")
+    assert "plinko_frames_total 0" in response.read().decode()
+
+def test_stopped_server_is_freed_without_cyclic_gc():
+    # Leftover cycles kept server and board alive until a GC pass, which could run mid-paint
+    server = DropServer(PlinkoBoard(REWARDS), port=0)
+    server.start()
+    server.stop()
+    ref = weakref.ref(server)
+    gc.disable()
+    try:
+        del server
+        assert ref() is None
+    finally:
+        gc.enable()
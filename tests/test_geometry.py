@@ -0,0 +1,96 @@
+import sys
+import os
+import json
+import random
+import numpy as np
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PySide6.QtWidgets import QApplication
+from plinko_board import PlinkoBoard
+from utils.batch_physics import BatchPlinkoPhysics
+from utils.geometry import DEFAULT_GEOMETRY, BoardGeometry, load_geometry
+from utils.physics import PlinkoPhysics, landing_y, simulate_drop
+from utils.reward_template import parse_template
+
+app = QApplication.instance() or QApplication([])
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config")
+
+def legacy_peg_positions(w, h):
+    # The lattice as it was hard-coded before boards were configurable
+    spacing_x = w / 10
+    spacing_y = h / 12
+    peg_d = min(spacing_x, spacing_y) / 8
+    positions = []
+    for row in range(8):
+        for col in range(10):
+            offset_x = spacing_x / 2 if row % 2 == 0 else 0
+            x = col * spacing_x + offset_x + spacing_x * 0.1
+            y = row * spacing_y + spacing_y * 0.8
+            positions.append((x + peg_d/2, y + peg_d/2, peg_d/2))
+    return positions
+
+def test_default_geometry_reproduces_classic_board():
+    assert load_geometry(os.path.join(CONFIG_DIR, "board_geometry.json")) == DEFAULT_GEOMETRY
+    for w, h in ((718, 1278), (358, 638), (1078, 1918)):
+        layout = DEFAULT_GEOMETRY.layout(w, h)
+        assert layout.peg_positions == legacy_peg_positions(w, h)
+        assert layout.landing_y == landing_y(h) == h - h / 13 * 1.2
+        assert layout.chip_d == min(w / 20, 30)
+        assert layout.slot_width == w / 10
+    assert (DEFAULT_GEOMETRY.kick_scale, DEFAULT_GEOMETRY.bounce_scale) == (1.0, 1.0)
+
+def test_geometry_config_is_validated(tmp_path):
+    assert load_geometry(str(tmp_path / "missing.json")) is DEFAULT_GEOMETRY
+    dense = load_geometry(os.path.join(CONFIG_DIR, "board_geometry_dense.json"))
+    assert dense.key() == (40, 30, 30) and hash(dense) == hash(BoardGeometry(40, 30, 30))
+    for bad in ({"rows": 0}, {"cols": 2.5}, {"slots": "10"}, {"rows": 300}, {"pegs": 4}, [8, 10]):
+        path = tmp_path / "bad.json"
+        path.write_text(json.dumps(bad))
+        with pytest.raises(ValueError):
+            load_geometry(str(path))
+    path.write_text("{not json")
+    with pytest.raises(ValueError):
+        load_geometry(str(path))
+
+def test_dense_board_builds_and_drops_stay_on_board():
+    geometry = BoardGeometry(40, 30, 30)
+    board = PlinkoBoard([str(i) for i in range(30)], geometry=geometry)
+    w, h = board.viewport().width(), board.viewport().height()
+    layout = board.board_layout
+    assert len(board.pegs) == len(board.peg_positions) == 1200
+    assert board.pegs[-1].rect().center().x() == pytest.approx(layout.peg_x[-1])
+    assert max(board.peg_index.rows) == 39
+    assert board.slots[29][0].rect().right() < w
+    chip_d = board.chip_diameter()
+    assert chip_d == pytest.approx(w / 60)
+    # Live batch stepping and the scalar engine agree on the dense lattice too
+    engine = BatchPlinkoPhysics(board.peg_positions, h, w, 30, geometry=geometry)
+    seeds = list(range(40))
+    release = [random.Random(s).uniform(0, w - chip_d) for s in seeds]
+    batch = engine.simulate(len(seeds), np.array(release), chip_d, seeds=seeds)
+    for seed, x, slot in zip(seeds, release, batch):
+        physics = PlinkoPhysics([], board.peg_positions, h, w, seed=seed, geometry=geometry)
+        assert simulate_drop(physics, x, chip_d, 30)[0] == slot
+    assert batch.min() >= 0 and len(set(batch.tolist())) > 10
+    chip = board.launch_chip("P", "#39ff14", release_x=w / 3, seed=5)
+    assert 0 <= board.anim_trajectory.slot < 30
+    board.anim_timer.stop()
+    assert chip.scene() is board.scene
+
+def test_reward_labels_must_match_slot_count(monkeypatch):
+    geometry = BoardGeometry(40, 30, 30)
+    with pytest.raises(ValueError, match="10 reward labels but the board has 30 slots"):
+        PlinkoBoard([str(i) for i in range(10)], geometry=geometry)
+    # A template with a different count resizes the slot row, and the physics lands chips in it
+    board = PlinkoBoard([str(i) for i in range(30)], geometry=geometry)
+    board.apply_template(parse_template([str(i) for i in range(12)]))
+    assert board.board_geometry == BoardGeometry(40, 30, 12)
+    assert len(board.slots) == board.batch_physics.n_slots == 12
+    assert board.board_layout.slot_width == pytest.approx(board.viewport().width() / 12)
+    # The main window fills a wider board by repeating the default rewards
+    import main
+    monkeypatch.setattr(main, "load_geometry", lambda: geometry)
+    window = main.MainWindow()
+    assert len(window.board.slots) == 30
+    assert window.reward_labels[10:20] == main.DEFAULT_REWARDS
+    window.close()
@@ -1,7 +1,10 @@
 import pytest
 from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt
+from PySide6.QtTest import QTest
 from main import MainWindow
 import sys
+import time
 
 @pytest.fixture(scope="module")
 def app():
@@ -13,4 +16,32 @@ def test_mainwindow_launch(app):
     window = MainWindow()
     window.show()
     assert window.isVisible()
-    window.close() 
\ No newline at end of file
+    window.close() 
+def test_dragged_chip_is_queued_under_the_player_name(app):
+    window = MainWindow()
+    window.show()
+    board = window.board
+    board.resize(720, 1280)
+    app.processEvents()
+    window.player_input.setText("Ann")
+    results = []
+    window.scheduler.resolved.connect(lambda request_id, result: results.append(result))
+    chip = board.dragging_chip
+    center = board.mapFromScene(chip.sceneBoundingRect().center())
+    QTest.mousePress(board.viewport(), Qt.LeftButton, Qt.NoModifier, center)
+    QTest.mouseRelease(board.viewport(), Qt.LeftButton, Qt.NoModifier, center)
+    # The drop went through the scheduler; the draggable chip stays on top for the next one
+    assert window.scheduler.counters["submitted"] == 1
+    assert board.dragging_chip is chip
+    app.processEvents()
+    assert len(board.chips) == 1
+    for _ in range(700):
+        if not len(board.chips):
+            break
+        board._chip_step_with_realistic_bounce()
+    deadline = time.monotonic() + 2
+    while not results and time.monotonic() < deadline:
+        app.processEvents()
+    assert results[0]["player"] == "Ann"
+    board.anim_timer.stop()
+    window.close()
@@ -0,0 +1,76 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PySide6.QtWidgets import QApplication
+from plinko_board import PlinkoBoard
+from utils.metrics import FrameMetrics
+
+app = QApplication.instance() or QApplication([])
+
+def record(metrics, frame, physics=0.0, chips=1):
+    metrics.begin_frame(frame, 1 / 60)
+    metrics.add("physics", physics)
+    metrics.end_frame(chips)
+
+def test_ring_buffer_keeps_last_frames_only():
+    metrics = FrameMetrics(capacity=4)
+    for i in range(10):
+        record(metrics, frame=i / 1000, chips=i)
+    assert metrics.count == 10
+    assert sorted(metrics.window()[:, 0] * 1000) == pytest.approx([6, 7, 8, 9])
+    assert metrics.latest("chips") == 9
+    p50, p99 = metrics.percentiles("frame")
+    assert p50 == pytest.approx(0.0075)
+    assert p99 == pytest.approx(0.00897)
+
+def test_jitter_paint_and_events():
+    metrics = FrameMetrics()
+    metrics.add_paint(0.5)  # no frame yet: ignored
+    record(metrics, frame=0.020)
+    metrics.add_paint(0.003)
+    metrics.add_paint(0.001)
+    metrics.record_event("init_board", 0.002)
+    metrics.record_event("init_board", 0.004)
+    summary = metrics.summary()
+    assert summary["jitter"]["max"] == pytest.approx(0.020 - 1 / 60)
+    assert summary["paint"]["max"] == pytest.approx(0.004)
+    assert summary["events"]["init_board"] == {"count": 2, "total": pytest.approx(0.006), "max": 0.004, "last": 0.004}
+
+def test_prometheus_text_and_file_export(tmp_path):
+    metrics = FrameMetrics()
+    record(metrics, frame=0.016, physics=0.001, chips=3)
+    metrics.record_event("precompute", 0.01)
+    text = metrics.prometheus_text()
+    assert "plinko_frames_total 1" in text
+    assert 'plinko_frame_seconds{quantile="0.99"} 0.016000' in text
+    assert "plinko_chips_in_flight 3" in text
+    assert "plinko_precompute_seconds_count 1" in text
+    path = tmp_path / "plinko.prom"
+    metrics.write(str(path))
+    assert path.read_text() == text
+    assert not os.path.exists(f"{path}.tmp")
+
+def test_board_records_frames_only_when_enabled():
+    board = PlinkoBoard([str(i) for i in range(10)])
+    times = iter(i / 60 for i in range(10000))
+    board.clock = lambda: next(times)
+    board.launch_chip("A", "#39ff14", seed=1)
+    board._on_frame()
+    assert board.metrics is None
+    board.set_metrics_overlay(True)
+    metrics = board.metrics
+    assert metrics is not None and board.metrics_overlay.scene() is board.scene
+    for _ in range(30):
+        board._on_frame()
+    assert metrics.count == 30
+    assert metrics.latest("chips") == 1
+    assert metrics.percentiles("physics")[1] > 0
+    assert "frame" in board.metrics_overlay.text()
+    board.init_board()
+    assert metrics.events["init_board"][0] == 1
+    board.launch_chip("B", "#39ff14", seed=2)
+    assert "precompute" in metrics.events
+    board.disable_metrics()
+    assert board.metrics is None and board.metrics_overlay is None
+    board._on_frame()
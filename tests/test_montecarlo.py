@@ -0,0 +1,36 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.montecarlo import run_simulation, build_report, wilson_interval, load_reward_labels, main
+
+LABELS = ["A", "B", "Vault Key", "D", "E", "F", "G", "H", "I", "Safe Haven Map"]
+
+def test_histogram_independent_of_worker_count():
+    single, _ = run_simulation(4000, 1, LABELS, seed=3, task_size=1000)
+    pooled, _ = run_simulation(4000, 2, LABELS, seed=3, task_size=1000)
+    assert (single == pooled).all()
+    assert single.sum() == 4000
+
+def test_report_keyed_by_reward_labels():
+    counts, _ = run_simulation(2000, 1, LABELS, seed=1, task_size=500)
+    report = build_report(counts, LABELS)
+    assert [s["label"] for s in report["slots"]] == LABELS
+    vault = report["rewards"]["Vault Key"]
+    assert vault["ci_low"] <= vault["probability"] <= vault["ci_high"]
+    assert sum(s["count"] for s in report["slots"]) + report["missed"] == 2000
+
+def test_wilson_interval_bounds():
+    low, high = wilson_interval(50, 100)
+    assert 0.39 < low < 0.5 < high < 0.61
+    assert wilson_interval(0, 0) == (0.0, 0.0)
+
+def test_cli_writes_json_and_csv(tmp_path):
+    out = tmp_path / "report.json"
+    csv_path = tmp_path / "odds.csv"
+    main(["--drops", "500", "--workers", "1", "--output", str(out), "--csv", str(csv_path)])
+    report = json.loads(out.read_text())
+    assert len(report["slots"]) == len(load_reward_labels())
+    assert report["throughput"][0]["drops_per_sec"] > 0
+    assert csv_path.exists()
+    assert (tmp_path / "odds_throughput.csv").exists()
@@ -0,0 +1,108 @@
+import sys
+import os
+import random
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.geometry import COLLISION_MODES, BoardGeometry
+from utils.physics import PlinkoPhysics, PegIndex, contact_time
+
+def make_peg_positions(w=718, h=1278, rows=8, cols=10):
+    # Same lattice PlinkoBoard.init_board builds
+    spacing_x = w / 10
+    spacing_y = h / 12
+    peg_d = min(spacing_x, spacing_y) / 8
+    positions = []
+    for row in range(rows):
+        for col in range(cols):
+            offset_x = spacing_x / 2 if row % 2 == 0 else 0
+            x = col * spacing_x + offset_x + spacing_x * 0.1
+            y = row * spacing_y + spacing_y * 0.8
+            positions.append((x + peg_d/2, y + peg_d/2, peg_d/2))
+    return positions
+
+def brute_force_first_hit(peg_positions, row_height, cx, cy, chip_r, skip_row):
+    for idx, (px, py, pr) in enumerate(peg_positions):
+        dist = ((cx - px)**2 + (cy - py)**2)**0.5
+        if dist < pr + chip_r and int(py // row_height) != skip_row:
+            return idx
+    return -1
+
+def test_peg_index_matches_full_scan():
+    w, h = 718, 1278
+    positions = make_peg_positions(w, h)
+    index = PegIndex(positions, h / 12)
+    rng = random.Random(1)
+    for _ in range(5000):
+        cx = rng.uniform(-20, w + 20)
+        cy = rng.uniform(-20, h + 20)
+        skip_row = rng.choice([-1, 0, 3, 7])
+        expected = brute_force_first_hit(positions, h / 12, cx, cy, 15, skip_row)
+        assert index.first_hit(cx, cy, 15, skip_row) == expected
+
+def test_peg_index_finds_peg_under_chip():
+    positions = make_peg_positions()
+    index = PegIndex(positions, 1278 / 12)
+    px, py, _ = positions[17]
+    assert index.first_hit(px, py, 15) == 17
+    assert index.first_hit(px, py, 15, skip_row=index.rows[17]) == -1
+
+def test_shared_index_gives_same_drop():
+    w, h = 718, 1278
+    positions = make_peg_positions(w, h)
+    index = PegIndex(positions, h / 12)
+    paths = []
+    for peg_index in (None, index):
+        physics = PlinkoPhysics([], positions, h, w, peg_index=peg_index, seed=42)
+        x, y = w / 2, 0
+        path = []
+        for step in range(1, 400):
+            x, y, hit, vy = physics.next_bounce(x, y, 30, step, 400)
+            path.append((x, y, hit))
+        paths.append(path)
+    assert paths[0] == paths[1]
+    assert any(hit for _, _, hit in paths[0])
+
+def test_seeded_instances_ignore_global_random():
+    positions = make_peg_positions()
+    paths = []
+    for global_seed in (1, 2):
+        random.seed(global_seed)
+        physics = PlinkoPhysics([], positions, 1278, 718, seed=7)
+        paths.append([physics.next_bounce(300, 0, 30, step, 400) for step in range(1, 200)])
+    assert paths[0] == paths[1]
+    assert physics.seed == 7
+    assert PlinkoPhysics([], positions, 1278, 718).seed is not None
+
+def brute_force_first_contact(peg_positions, sx, sy, ex, ey, chip_r):
+    best = (-1, None)
+    for idx, (px, py, pr) in enumerate(peg_positions):
+        t = contact_time(sx, sy, ex - sx, ey - sy, px, py, pr + chip_r)
+        if t is not None and (best[0] < 0 or t < best[1]):
+            best = (idx, t)
+    return best
+
+def test_swept_lookup_matches_full_scan():
+    w, h = 718, 1278
+    positions = make_peg_positions(w, h)
+    index = PegIndex(positions, h / 12)
+    rng = random.Random(2)
+    for _ in range(3000):
+        sx, sy = rng.uniform(-20, w + 20), rng.uniform(-20, h + 20)
+        ex, ey = sx + rng.uniform(-40, 40), sy + rng.choice([rng.uniform(-60, 60), rng.uniform(-300, 300)])
+        assert index.first_contact(sx, sy, ex, ey, 15) == brute_force_first_contact(positions, sx, sy, ex, ey, 15)
+
+def test_swept_collision_catches_chips_faster_than_a_peg():
+    # One small peg; the chip crosses it in a single step, so only the swept test sees it
+    positions = [(300.0, 400.0, 3.0)]
+    paths = {}
+    for collision in COLLISION_MODES:
+        physics = PlinkoPhysics([], positions, 1278, 718, seed=3, geometry=BoardGeometry(collision=collision))
+        physics.vy = 60
+        x, y, hit, vy = physics.next_bounce(300 - 15, 350 - 15, 30, 1, 400)
+        paths[collision] = (y, hit, vy)
+    assert paths["discrete"] == (350 - 15 + 60 + physics.gravity, False, 60 + physics.gravity)
+    y, hit, vy = paths["swept"]
+    # Stopped at the contact point on top of the peg, then bounced back up
+    assert hit and vy < 0 and y + 15 < 400 - 3
+    # Moving away from a peg it already touches is not a hit; moving into it is
+    assert contact_time(300, 390, 0, -10, 300, 400, 18) is None
+    assert contact_time(300, 390, 0, 10, 300, 400, 18) == 0.0
@@ -0,0 +1,71 @@
+import sys
+import os
+import time
+import numpy as np
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PySide6.QtWidgets import QApplication
+from plinko_board import PlinkoBoard
+from utils import probability_map
+from utils.geometry import BoardGeometry
+from utils.probability_map import compute_probability_map, geometry_key, load_or_compute
+
+app = QApplication.instance() or QApplication([])
+
+def wait_for(done, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while not done() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    return done()
+
+def test_map_rows_are_distributions_and_lookup_is_clamped():
+    pmap = compute_probability_map(358, 638, 17.9, 10, buckets=8, drops_per_bucket=300)
+    assert pmap.probabilities.shape == (8, 11)
+    assert pmap.probabilities.sum(axis=1) == pytest.approx(np.ones(8))
+    assert pmap.bucket(-5) == 0 and pmap.bucket(pmap.max_x + 5) == 7
+    assert pmap.bucket(pmap.bucket_center(3)) == 3
+    assert pmap.lookup(0) is not None and pmap.slot_chance(0, 0) == pmap.probabilities[0, 1]
+    # Releasing over the far left favours the left slots over the far right ones
+    assert pmap.slot_chance(0, 0) > pmap.slot_chance(0, 9)
+    x, chance = pmap.best_release(9)
+    assert pmap.bucket(x) == int(np.argmax(pmap.probabilities[:, 10])) and chance > 0
+
+def test_maps_are_persisted_by_geometry_hash(tmp_path, monkeypatch):
+    first = load_or_compute(358, 638, 17.9, 10, buckets=4, drops_per_bucket=100, cache_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == [f"odds_{first.key}.npz"]
+    def fail(*args):
+        raise AssertionError("should have loaded from disk")
+    monkeypatch.setattr(probability_map, "compute_probability_map", fail)
+    second = load_or_compute(358, 638, 17.9, 10, buckets=4, drops_per_bucket=100, cache_dir=str(tmp_path))
+    assert np.array_equal(first.probabilities, second.probabilities)
+    assert geometry_key(358, 638, 17.9, 10, 4, 100) != geometry_key(358, 638, 17.9, 9, 4, 100)
+    assert geometry_key(358, 638, 17.9, 10, 4, 100) != geometry_key(718, 1278, 30, 10, 4, 100)
+    swept = BoardGeometry(collision="swept")
+    assert geometry_key(358, 638, 17.9, 10, 4, 100) != geometry_key(358, 638, 17.9, 10, 4, 100, swept)
+
+def test_board_recomputes_map_when_geometry_changes(tmp_path):
+    board = PlinkoBoard([str(i) for i in range(10)])
+    board.enable_probability_map(buckets=6, drops_per_bucket=50, cache_dir=str(tmp_path))
+    assert wait_for(lambda: board.probability_map is not None)
+    board.set_probability_heatmap(True)
+    assert len(board.heatmap_items) == 6
+    assert "%" in board.odds_text.text()
+    first = board.probability_map.key
+    # Fewer rewards: the stale map is dropped straight away and a new one arrives
+    board.reward_labels = [str(i) for i in range(8)]
+    board.init_board()
+    assert board.probability_map is None and board.heatmap_items == []
+    assert wait_for(lambda: board.probability_map is not None)
+    assert board.probability_map.key != first and board.probability_map.n_slots == 8
+    assert len(board.heatmap_items) == 6
+    board.show()
+    board.setFixedSize(540, 960)
+    app.processEvents()
+    board.update_layout()
+    w = board.viewport().width()
+    assert wait_for(lambda: board.probability_map is not None and board.probability_map.max_x == w - board.chip_diameter())
+    board.set_probability_heatmap(False)
+    assert board.heatmap_items == [] and board.odds_text is None
+    board.probability_loader.shutdown()
+    board.close()
@@ -0,0 +1,74 @@
+import sys
+import os
+import numpy as np
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QImage, QPainter
+from plinko_board import PlinkoBoard
+from utils.geometry import BoardGeometry
+from utils.viewport import opengl_available
+
+app = QApplication.instance() or QApplication([])
+REWARDS = [str(i) for i in range(10)]
+
+def render(board):
+    image = QImage(board.viewport().size(), QImage.Format_RGB888)
+    painter = QPainter(image)
+    board.render(painter)
+    painter.end()
+    ptr = image.constBits()
+    return np.frombuffer(ptr, dtype=np.uint8, count=image.sizeInBytes()).reshape(image.height(), -1).copy()
+
+def test_cached_layer_looks_like_item_rendering():
+    board = PlinkoBoard(REWARDS)
+    board.launch_chip("P", "#39ff14", release_x=200, seed=3)
+    board.anim_timer.stop()
+    items = render(board)
+    board.set_render_mode("cached")
+    assert not any(item.isVisible() for item in board.static_items())
+    cached = render(board)
+    # Same picture, up to antialiasing of a few edge pixels
+    assert np.mean(np.abs(items.astype(int) - cached.astype(int)) > 8) < 0.002
+    with pytest.raises(ValueError):
+        board.set_render_mode("fancy")
+    board.set_render_mode("items")
+    assert all(item.isVisible() for item in board.static_items())
+
+def test_static_layer_is_rebuilt_only_when_board_changes():
+    board = PlinkoBoard(REWARDS)
+    board.set_render_mode("cached")
+    layer = board.static_layer()
+    board.launch_chip("P", "#39ff14", release_x=200, seed=3)
+    for _ in range(30):
+        board._physics_step()
+    board.anim_timer.stop()
+    assert board.static_layer() is layer
+    board.reward_labels = REWARDS[:2] + ["Vault Key"] + REWARDS[3:]
+    board.init_board()
+    assert board.static_layer() is not layer
+    # Slots rebuilt for a new reward count are hidden too
+    board.reward_labels = REWARDS[:8]
+    board.init_board()
+    assert len(board.slot_texts) == 8 and not any(text.isVisible() for text in board.slot_texts)
+
+def test_dense_board_frame_cost_does_not_follow_peg_count():
+    board = PlinkoBoard([str(i) for i in range(30)], geometry=BoardGeometry(40, 30, 30))
+    board.set_render_mode("cached")
+    board.static_layer()
+    # With the layer cached, drawing a frame touches no peg items at all
+    painted = []
+    for peg in board.pegs[:5]:
+        peg.paint = lambda *args, peg=peg: painted.append(peg)
+    render(board)
+    assert painted == []
+
+def test_opengl_falls_back_to_raster_when_unavailable():
+    board = PlinkoBoard(REWARDS)
+    viewport = board.viewport()
+    enabled = board.set_opengl(True)
+    assert enabled == opengl_available() == board.opengl
+    if not enabled:
+        assert board.viewport() is viewport
+    board.set_opengl(False)
+    assert not board.opengl
@@ -0,0 +1,86 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PySide6.QtWidgets import QApplication
+from plinko_board import PlinkoBoard
+from utils.replay_log import RECORD, RECORD_DTYPE, ReplayLog, main, open_records, replay_slot, template_hash
+
+app = QApplication.instance() or QApplication([])
+REWARDS = [str(i) for i in range(10)]
+
+def test_record_layout_matches_dtype():
+    assert RECORD.size == RECORD_DTYPE.itemsize == 64
+    assert template_hash(REWARDS) == template_hash(list(REWARDS))
+    assert template_hash(REWARDS) != template_hash(REWARDS[::-1])
+
+def test_append_find_and_get(tmp_path):
+    path = str(tmp_path / "logs" / "drops.replay")
+    log = ReplayLog(path)
+    template = template_hash(REWARDS)
+    for i in range(100):
+        assert log.append(1000 + i, 50.0 + i, 120.0, 720, 1280, 30.0, 10, i % 10, template, timestamp=i) == i
+    assert len(log) == 100
+    assert log.find(slot=3)["drop_id"].tolist() == list(range(3, 100, 10))
+    assert log.find(seed=1042)["drop_id"].tolist() == [42]
+    assert len(log.find(since=10, until=20)) == 10
+    assert len(log.find(template=template + 1)) == 0
+    record = log.get(42)
+    assert (record["seed"], record["release_x"], record["slot"]) == (1042, 92.0, 2)
+    assert log.get(100) is None
+    log.close()
+    # Reopening keeps numbering going
+    log = ReplayLog(path)
+    assert log.append(1, 0.0, 0.0, 720, 1280, 30.0, 10, -1, template) == 100
+    log.close()
+
+def test_torn_trailing_record_is_ignored(tmp_path):
+    path = str(tmp_path / "drops.replay")
+    log = ReplayLog(path)
+    log.append(1, 10.0, 0.0, 720, 1280, 30.0, 10, 4, 0)
+    log.close()
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 20)
+    assert len(open_records(path)) == 1
+    with open(path, "wb") as f:
+        f.write(b"not a replay log at all")
+    with pytest.raises(ValueError):
+        open_records(path)
+
+def test_append_after_torn_record_stays_aligned(tmp_path):
+    path = str(tmp_path / "drops.replay")
+    log = ReplayLog(path)
+    log.append(1, 10.0, 0.0, 720, 1280, 30.0, 10, 4, 0)
+    log.close()
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 30)
+    log = ReplayLog(path)
+    assert log.append(2, 20.0, 0.0, 720, 1280, 30.0, 10, 5, 0) == 1
+    assert log.append(3, 30.0, 0.0, 720, 1280, 30.0, 10, 6, 0) == 2
+    log.close()
+    records = open_records(path)
+    assert records["drop_id"].tolist() == [0, 1, 2]
+    assert records["seed"].tolist() == [1, 2, 3]
+    assert records["slot"].tolist() == [4, 5, 6]
+
+def test_board_logs_drops_that_replay_to_the_same_slot(tmp_path, capsys):
+    path = str(tmp_path / "drops.replay")
+    board = PlinkoBoard(REWARDS)
+    board.replay_log = ReplayLog(path)
+    results = []
+    board.result_ready.connect(lambda chip, info: results.append(info))
+    w = board.viewport().width()
+    chips = [board.launch_chip(f"P{i}", "#39ff14", release_x=40 + i * (w - 80) / 6) for i in range(6)]
+    for _ in range(700):
+        if not board.anim_timer.isActive():
+            break
+        board._chip_step_with_realistic_bounce()
+    for i, chip in enumerate(chips):
+        board.resolve_chip(chip, f"P{i}")
+    records = board.replay_log.records()
+    assert records["seed"].tolist() == [info["seed"] for info in results]
+    assert records["slot"].tolist() == [info["slot"] for info in results]
+    assert [replay_slot(record) for record in records] == records["slot"].tolist()
+    assert main([path, "--seed", str(results[2]["seed"]), "--verify"]) == 0
+    out = capsys.readouterr().out
+    assert f"seed={results[2]['seed']}" in out and "verified" in out
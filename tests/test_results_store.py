@@ -0,0 +1,74 @@
+import sys
+import os
+import io
+import csv
+import json
+import time
+import datetime
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PySide6.QtWidgets import QApplication
+from plinko_board import PlinkoBoard
+from utils.results_store import ResultsStore, main, template_key
+
+app = QApplication.instance() or QApplication([])
+REWARDS = [str(i) for i in range(10)]
+DAY = datetime.datetime(2026, 10, 1, 12).timestamp()
+
+def result(player, slot):
+    return {"player": player, "slot": slot, "label": REWARDS[slot] if slot >= 0 else None, "seed": slot + 100}
+
+def test_batched_writes_queries_and_tallies(tmp_path):
+    store = ResultsStore(str(tmp_path / "logs" / "results.db"))
+    for i in range(300):
+        store.record(result(["Ann", "Bob", "Cat"][i % 3], i % 10 if i % 50 else -1), REWARDS,
+                     timestamp=DAY + (i // 100) * 86400 + i)
+    store.flush()
+    assert store.count() == 300
+    # Case-insensitive player lookup, limited to the second day
+    ann = store.player_results("ann", since=DAY + 86400 - 3600, until=DAY + 2 * 86400 - 3600)
+    assert len(ann) == 33 and {row["player"] for row in ann} == {"Ann"}
+    assert store.results(limit=2, player="Bob")[-1]["timestamp"] == DAY + 2 * 86400 + 298
+    tallies = store.tallies()
+    assert sum(tallies.values()) == 300 and tallies[None] == 6
+    assert tallies == {label: store.count(label=label) for label in tallies if label is not None} | {None: 6}
+    assert sum(store.tallies("2026-10-02", "2026-10-02").values()) == 100
+    assert store.template_labels(template_key(REWARDS)) == REWARDS
+    # Indexed queries stay fast
+    start = time.perf_counter()
+    for _ in range(100):
+        store.player_results("Cat", since=DAY)
+    assert (time.perf_counter() - start) / 100 < 0.01
+    store.close()
+
+def test_export_csv_json_and_cli(tmp_path, capsys):
+    path = str(tmp_path / "results.db")
+    store = ResultsStore(path)
+    for i in range(5):
+        store.record(result("Ann" if i < 3 else "Bob", i), REWARDS, timestamp=DAY + i)
+    store.flush()
+    stream = io.StringIO()
+    assert store.export_csv(stream, player="Ann") == 3
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert [row["label"] for row in rows] == ["0", "1", "2"]
+    stream = io.StringIO()
+    assert store.export_json(stream, since=DAY + 3) == 2
+    assert [row["player"] for row in json.loads(stream.getvalue())] == ["Bob", "Bob"]
+    stream = io.StringIO()
+    assert store.export_json(stream, player="Nobody") == 0 and json.loads(stream.getvalue()) == []
+    store.close()
+    out = tmp_path / "payouts.json"
+    assert main([path, "--player", "bob", "--export", str(out)]) == 0
+    assert len(json.loads(out.read_text())) == 2
+    assert main([path, "--tallies"]) == 0
+    assert "Ann" not in capsys.readouterr().out
+
+def test_board_results_are_recorded(tmp_path):
+    board = PlinkoBoard(REWARDS)
+    board.results_store = ResultsStore(str(tmp_path / "results.db"))
+    results = board.resolve_instantly([("Ann", 100.0, 1), ("Bob", None, 2)])
+    board.results_store.flush()
+    rows = board.results_store.results()
+    assert [(row["player"], row["slot"], row["seed"]) for row in rows] == [(r["player"], r["slot"], r["seed"])
+                                                                           for r in results]
+    assert rows[0]["template"] == template_key(REWARDS)
+    board.results_store.close()
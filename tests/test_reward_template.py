@@ -0,0 +1,85 @@
+import sys
+import os
+import json
+import time
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PySide6.QtWidgets import QApplication
+from plinko_board import PlinkoBoard
+from utils.reward_template import TemplateWatcher, load_template, parse_template
+
+app = QApplication.instance() or QApplication([])
+REWARDS = [str(i) for i in range(10)]
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+def test_parse_plain_and_rich_templates(tmp_path):
+    assert parse_template(REWARDS).labels == REWARDS
+    template = parse_template({"slots": [{"label": "Vault Key", "color": "gold", "weight": 5, "payout": "1 key"},
+                                         "+5 POGs"]}, slots=2)
+    key, pogs = template.slots
+    assert (key.label, key.color, key.weight, key.payout) == ("Vault Key", "gold", 5.0, "1 key")
+    assert (pogs.color, pogs.weight, pogs.payout) == ("#ffe600", 1.0, None)
+    assert parse_template(template.to_json()) == template
+    for bad, message in [([], "non-empty"), ([{"label": ""}], "label"), ([{"label": "A", "color": "#zz"}], "colour"),
+                         ([{"label": "A", "weight": -1}], "weight"), ([{"label": "A", "odds": 2}], "odds"),
+                         ({"slots": REWARDS, "name": "x"}, "name")]:
+        with pytest.raises(ValueError, match=message):
+            parse_template(bad)
+    with pytest.raises(ValueError, match="board has 10"):
+        parse_template(REWARDS[:9], slots=10)
+    path = tmp_path / "broken.json"
+    path.write_text('["A", ')
+    with pytest.raises(ValueError, match="not valid JSON"):
+        load_template(str(path))
+
+def test_apply_template_touches_only_changed_slots():
+    board = PlinkoBoard(list(REWARDS))
+    board.init_board()
+    pegs = list(board.pegs)
+    texts = list(board.slot_texts)
+    before = [(text.text(), text.brush().color().name()) for text in texts]
+    chip = board.launch_chip("Ann", "#39ff14", seed=3)
+    entries = list(REWARDS)
+    entries[2] = {"label": "Vault Key", "payout": "1 key"}
+    entries[7] = {"label": "7", "color": "#39ff14"}
+    board.apply_template(parse_template(entries))
+    assert board.pegs == pegs and board.slot_texts == texts
+    after = [(text.text(), text.brush().color().name()) for text in texts]
+    assert [i for i in range(10) if after[i] != before[i]] == [2, 7]
+    assert after[2][0] == "Vault Key" and after[7][1] == "#39ff14"
+    # The chip already falling is untouched
+    assert len(board.chips) == 1 and board.chips.items[board.chips.rows()[0]] is chip
+    slot = board.resolve_instantly([("Ann", None, 1)])[0]["slot"]
+    board.apply_template(parse_template([{"label": str(i), "payout": f"pay {i}"} for i in range(10)]))
+    assert board.resolve_instantly([("Ann", None, 1)])[0]["payout"] == f"pay {slot}"
+    # Labels set the old way drop the template's extras
+    board.reward_labels = [f"R{i}" for i in range(10)]
+    assert board.slot_reward(0) is None
+    board.anim_timer.stop()
+
+def test_watcher_reloads_on_save_and_reports_bad_files(tmp_path):
+    path = tmp_path / "rewards.json"
+    path.write_text(json.dumps(REWARDS))
+    watcher = TemplateWatcher(str(path), slots=10, debounce_ms=10)
+    loaded, failed = [], []
+    watcher.loaded.connect(loaded.append)
+    watcher.failed.connect(failed.append)
+    watcher.reload()
+    assert wait_for(lambda: loaded)
+    assert loaded[0].labels == REWARDS
+    path.write_text(json.dumps(REWARDS[:9]))
+    assert wait_for(lambda: failed)
+    assert "board has 10" in failed[0]
+    # Saved by writing a new file and renaming it over the old one, as editors do
+    tmp = tmp_path / "rewards.json.tmp"
+    tmp.write_text(json.dumps(["A"] + REWARDS[1:]))
+    os.replace(tmp, path)
+    assert wait_for(lambda: len(loaded) == 2)
+    assert loaded[1].labels[0] == "A"
+    watcher.stop()
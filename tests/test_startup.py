@@ -0,0 +1,27 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.startup import StartupReport
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+    def __call__(self):
+        return self.now
+
+def test_marks_are_relative_and_recorded_once(tmp_path):
+    clock = FakeClock()
+    report = StartupReport(clock=clock)
+    start = report.mark("imports")
+    clock.now += 0.25
+    assert report.mark("first frame") == start + 0.25
+    clock.now += 1.0
+    # A second paint doesn't move the first-frame mark
+    assert report.mark("first frame") == start + 0.25
+    assert start >= 0
+    text = report.text()
+    assert text.index("imports") < text.index("first frame") and "(+0.250)" in text
+    report.write(str(tmp_path / "startup.json"))
+    with open(tmp_path / "startup.json") as f:
+        assert json.load(f)["marks"] == {"imports": start, "first frame": start + 0.25}
@@ -0,0 +1,30 @@
+import sys
+import os
+import random
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.physics import PlinkoPhysics, board_peg_positions, simulate_drop
+from utils.trajectory import TrajectoryCache, board_geometry, compute_trajectory
+
+GEOMETRY = board_geometry(718, 1278, 30, 10)
+
+def test_trajectory_matches_live_physics():
+    trajectory = compute_trajectory(99, 200.0, GEOMETRY)
+    physics = PlinkoPhysics([], board_peg_positions(718, 1278), 1278, 718, rng=random.Random(99))
+    path = []
+    slot, x, y = simulate_drop(physics, 200.0, 30, 10, path=path)
+    assert len(trajectory) == len(path)
+    assert trajectory.point(len(path) - 1) == path[-1]
+    assert trajectory.slot == slot
+
+def test_cache_hits_and_lru_eviction():
+    cache = TrajectoryCache(maxsize=2)
+    first = cache.get(1, 100.0, GEOMETRY)
+    assert cache.get(1, 100.0, GEOMETRY) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.get(2, 100.0, GEOMETRY)
+    cache.get(3, 100.0, GEOMETRY)
+    assert len(cache) == 2
+    # Seed 1 was least recently used and got evicted, so it is recomputed (identically)
+    again = cache.get(1, 100.0, GEOMETRY)
+    assert again is not first
+    assert (again.xs == first.xs).all() and again.slot == first.slot
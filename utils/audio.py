@@ -0,0 +1,187 @@
+"""
+Pooled sound playback for peg hits and landings.
+
+A single QSoundEffect restarts (cutting itself off) when play() is called while it is still
+playing, so fast bounces used to swallow each other. A SoundPool preloads a few voices per
+sound and plays them round-robin, so overlapping hits ring out together.
+
+QSoundEffect has no pitch control. Pitch variants are therefore plain WAV copies with a scaled
+sample rate (played back faster = higher pitch), written once to a cache directory at startup.
+
+QtMultimedia is imported on first use, not with this module: it is slow to load, and on machines
+without audio libraries it can't load at all, in which case every pool stays silent.
+"""
+import os
+import tempfile
+import threading
+import time
+import wave
+import weakref
+from PySide6.QtCore import QObject, QUrl, Signal
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "plinko_audio")
+_multimedia = None
+
+def multimedia():
+    """The QSoundEffect class, or None when QtMultimedia can't be loaded. Imported once, on first call."""
+    global _multimedia
+    if _multimedia is None:
+        try:
+            from PySide6.QtMultimedia import QSoundEffect
+            _multimedia = (QSoundEffect, None)
+        except ImportError as e:
+            _multimedia = (None, str(e))
+    return _multimedia[0]
+
+def multimedia_error():
+    # Why QtMultimedia failed to load, or None (also None before the first load attempt)
+    return None if _multimedia is None else _multimedia[1]
+
+def pitch_variant(path, factor, cache_dir=CACHE_DIR):
+    """
+    Returns the path of a copy of `path` that plays `factor` times faster (and higher), or
+    `path` itself when factor is 1 or the file can't be read as WAV.
+    """
+    if factor == 1.0:
+        return path
+    root, ext = os.path.splitext(os.path.basename(path))
+    target = os.path.join(cache_dir, f"{root}_x{factor:.3f}{ext}")
+    try:
+        source_mtime = os.path.getmtime(path)
+        if os.path.exists(target) and os.path.getmtime(target) >= source_mtime:
+            return target
+        with wave.open(path, "rb") as src:
+            params = src.getparams()
+            frames = src.readframes(params.nframes)
+        os.makedirs(cache_dir, exist_ok=True)
+        with wave.open(target, "wb") as dst:
+            dst.setparams(params)
+            dst.setframerate(int(params.framerate * factor))
+            dst.writeframes(frames)
+        return target
+    except (OSError, EOFError, wave.Error):
+        return path
+
+class SoundPool:
+    """
+    Round-robin QSoundEffect voices for one sound.
+    - voices: players per pitch; every QSoundEffect is created and loaded by load()
+    - load=False defers that: prepare() (any thread) writes the pitch variants and load(paths)
+      (GUI thread) creates the voices. Until then, and without QtMultimedia, play() is silent
+    - pitches: playback-rate variants, picked by impact speed (harder hit = higher)
+    - max_per_frame: plays allowed per frame window; extra overlapping hits are dropped
+    - full_speed: impact speed (px/step) that maps to full volume and the highest pitch
+    """
+    def __init__(self, path, voices=4, pitches=(1.0,), max_per_frame=3, volume=1.0, full_speed=40.0,
+                 frame_time=1 / 60, clock=time.perf_counter, cache_dir=CACHE_DIR, parent=None, load=True):
+        self.path = path
+        self.n_voices = voices
+        self.pitches = pitches
+        self.max_per_frame = max_per_frame
+        self.volume = volume
+        self.full_speed = full_speed
+        self.frame_time = frame_time
+        self.clock = clock
+        self.cache_dir = cache_dir
+        # Weak, so a board holding its pools doesn't form a cycle that only cyclic GC can free
+        self._parent = weakref.ref(parent) if parent is not None else lambda: None
+        self.banks = []
+        self.cursors = []
+        self.loaded = False
+        self._window_start = -1.0
+        self._played = 0
+        self.plays = 0
+        self.dropped = 0
+        if load:
+            self.load()
+
+    def prepare(self):
+        # File work only (safe off the GUI thread): one playable path per pitch
+        return [pitch_variant(self.path, factor, self.cache_dir) for factor in self.pitches]
+
+    def load(self, paths=None):
+        # Creates the voices; must run on the GUI thread. Returns False if there is no audio support
+        if self.loaded:
+            return bool(self.banks)
+        effect_class = multimedia()
+        self.loaded = True
+        if effect_class is None:
+            return False
+        for path in paths or self.prepare():
+            url = QUrl.fromLocalFile(path)
+            bank = []
+            for _ in range(self.n_voices):
+                effect = effect_class(self._parent())
+                effect.setSource(url)
+                bank.append(effect)
+            self.banks.append(bank)
+        self.cursors = [0] * len(self.banks)
+        return True
+
+    def play(self, speed=None):
+        """
+        Plays the next voice, louder and higher for faster impacts (speed=None: full strength).
+        Returns False when this frame's budget is spent and the hit was dropped, or nothing is loaded.
+        """
+        if not self.banks:
+            return False
+        now = self.clock()
+        if now - self._window_start >= self.frame_time:
+            self._window_start = now
+            self._played = 0
+        if self._played >= self.max_per_frame:
+            self.dropped += 1
+            return False
+        self._played += 1
+        self.plays += 1
+        level = 1.0 if speed is None else min(abs(speed) / self.full_speed, 1.0)
+        b = int(level * (len(self.banks) - 1) + 0.5)
+        bank = self.banks[b]
+        # Oldest voice first; if every voice is busy, the oldest one is the one restarted
+        voice = bank[self.cursors[b]]
+        self.cursors[b] = (self.cursors[b] + 1) % len(bank)
+        voice.setVolume(self.volume * (0.35 + 0.65 * level))
+        voice.play()
+        return True
+
+    def available(self):
+        # True if a play() right now would not be rate limited
+        if not self.banks:
+            return False
+        return self._played < self.max_per_frame or self.clock() - self._window_start >= self.frame_time
+
+    def voices(self):
+        return [effect for bank in self.banks for effect in bank]
+
+    def stop(self):
+        for effect in self.voices():
+            effect.stop()
+
+class SoundLoader(QObject):
+    """
+    Loads SoundPools without blocking the GUI. QtMultimedia is imported and pitch variants are
+    written on a worker thread; the voices (QObjects) are then created back on the GUI thread.
+    `finished` carries True once the pools are playable, False if audio is unavailable.
+    """
+    finished = Signal(bool)
+    _prepared = Signal(object)
+
+    def __init__(self, pools, parent=None):
+        super().__init__(parent)
+        self.pools = list(pools)
+        self._prepared.connect(self._load)
+
+    def start(self):
+        threading.Thread(target=self._prepare, name="sound-loader", daemon=True).start()
+
+    def _prepare(self):
+        if multimedia() is None:
+            self._prepared.emit(None)
+        else:
+            self._prepared.emit([pool.prepare() for pool in self.pools])
+
+    def _load(self, paths):
+        ok = paths is not None
+        for i, pool in enumerate(self.pools):
+            ok = pool.load(paths[i] if paths else None) and ok
+        self.finished.emit(ok)
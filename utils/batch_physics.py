@@ -0,0 +1,389 @@
+import random
+import numpy as np
+from utils.physics import MAX_HITS_PER_STEP, PegIndex
+from utils.geometry import DEFAULT_GEOMETRY
+
+class ChipState:
+    """
+    Array-backed physics state for many chips (one element per chip).
+    Mirrors the per-chip attributes of PlinkoPhysics plus position and step counters.
+    `rngs` holds one random.Random per chip in seeded mode, or None in fast mode.
+    """
+    FIELDS = (
+        ("x", np.float64), ("y", np.float64), ("vy", np.float64), ("gravity", np.float64),
+        ("bounce_energy", np.float64), ("spin", np.float64), ("angle_bias", np.float64),
+        ("last_hit_row", np.int64), ("step", np.int64), ("max_steps", np.int64), ("damp_after", np.int64),
+        ("ids", np.int64),
+    )
+
+    def __init__(self, n):
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.zeros(n, dtype=dtype))
+        self.rngs = None
+
+    def __len__(self):
+        return len(self.x)
+
+    def take(self, keep):
+        # New state holding only the chips selected by `keep` (boolean mask or index array)
+        rows = np.flatnonzero(keep) if np.asarray(keep).dtype == bool else np.asarray(keep)
+        out = ChipState.__new__(ChipState)
+        for name, _ in self.FIELDS:
+            setattr(out, name, getattr(self, name)[rows])
+        out.rngs = None if self.rngs is None else [self.rngs[i] for i in rows]
+        return out
+
+    def put(self, rows, other):
+        # Write the chips of `other` back into `rows` (inverse of take)
+        for name, _ in self.FIELDS:
+            getattr(self, name)[rows] = getattr(other, name)
+        if other.rngs is not None:
+            if self.rngs is None:
+                self.rngs = [None] * len(self)
+            for i, rng in zip(rows, other.rngs):
+                self.rngs[i] = rng
+
+    def grow(self, capacity):
+        # Extend every array to `capacity` chips, keeping existing rows
+        extra = capacity - len(self)
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra, dtype=dtype)]))
+        if self.rngs is not None:
+            self.rngs.extend([None] * extra)
+
+class BatchPlinkoPhysics:
+    """
+    Qt-free engine that steps many chips at once with NumPy:
+    - Uses the same rules, constants and landing test as PlinkoPhysics / PlinkoBoard.resolve_chip.
+    - Fast mode draws randomness from one numpy Generator for the whole batch.
+    - Seeded mode gives each chip its own random.Random(seed) consumed in the same order as
+      PlinkoPhysics(rng=random.Random(seed)) + simulate_drop, so results match chip for chip.
+    - geometry.collision picks overlap tests ("discrete") or swept-circle collision ("swept"),
+      as in PlinkoPhysics.next_bounce / next_bounce_swept.
+    """
+    def __init__(self, peg_positions, board_height, board_width=None, n_slots=10, peg_index=None,
+                 geometry=DEFAULT_GEOMETRY):
+        self.board_height = board_height
+        self.board_width = board_width or 720
+        self.n_slots = min(n_slots, geometry.slots)
+        self.geometry = geometry
+        self.landing_y = geometry.landing_y(board_height)
+        self.peg_index = peg_index or PegIndex(peg_positions, geometry.row_spacing(board_height))
+        pegs = np.array(self.peg_index.peg_positions, dtype=np.float64).reshape(-1, 3)
+        # Sentinel peg at the end so padded (-1) candidates never overlap anything
+        self.peg_x = np.append(pegs[:, 0], np.inf)
+        self.peg_y = np.append(pegs[:, 1], np.inf)
+        self.peg_r = np.append(pegs[:, 2], 0.0)
+        self.peg_row = np.append(np.array(self.peg_index.rows, dtype=np.int64), -2)
+        self._tables = {}
+        self._sums = {}
+
+    def _cell_table(self, chip_r):
+        """
+        Dense version of PegIndex.cells for NumPy lookups: (i0, j0, nx, ny, table, occupied).
+        The grid has a one-cell empty border, so clipped out-of-board coordinates find no pegs.
+        """
+        table = self._tables.get(chip_r)
+        if table is None:
+            cells = self.peg_index.cells(chip_r)
+            i0 = min((i for i, _ in cells), default=0) - 1
+            j0 = min((j for _, j in cells), default=0) - 1
+            nx = max((i for i, _ in cells), default=0) - i0 + 2
+            ny = max((j for _, j in cells), default=0) - j0 + 2
+            k = max((len(v) for v in cells.values()), default=1)
+            dense = np.full((nx * ny, k), len(self.peg_x) - 1, dtype=np.int64)
+            for (i, j), idxs in cells.items():
+                dense[(i - i0) * ny + (j - j0), :len(idxs)] = idxs
+            table = (i0, j0, nx, ny, dense, dense[:, 0] < len(self.peg_x) - 1)
+            self._tables[chip_r] = table
+        return table
+
+    def _occupied_sums(self, chip_r):
+        # Summed-area table of _cell_table(chip_r)'s occupied cells, shape (nx + 1, ny + 1)
+        sums = self._sums.get(chip_r)
+        if sums is None:
+            _, _, nx, ny, _, occupied = self._cell_table(chip_r)
+            sums = np.zeros((nx + 1, ny + 1), dtype=np.int64)
+            sums[1:, 1:] = occupied.reshape(nx, ny).cumsum(axis=0).cumsum(axis=1)
+            self._sums[chip_r] = sums
+        return sums
+
+    def reset(self, n, release_x, seed=None, seeds=None):
+        """
+        Creates state for n chips released at release_x (scalar or array) from y = 0.
+        Pass `seeds` (one int per chip) for seeded mode, otherwise `seed` seeds the fast-mode Generator.
+        """
+        state = ChipState(n)
+        state.x[:] = release_x
+        state.last_hit_row[:] = -1
+        state.ids[:] = np.arange(n)
+        if seeds is not None:
+            state.rngs = [random.Random(s) for s in seeds]
+            for i, rng in enumerate(state.rngs):
+                # Same draw order as PlinkoPhysics.reset followed by simulate_drop's max_steps
+                target_steps = rng.randint(180, 600)
+                state.gravity[i] = min(max((2 * self.board_height) / (target_steps ** 2), 0.15), 1.5)
+                state.bounce_energy[i] = rng.uniform(0.5, 1.2)
+                state.spin[i] = rng.uniform(-2, 2)
+                state.angle_bias[i] = rng.uniform(-3, 3)
+                state.max_steps[i] = rng.randint(180, 600)
+            self.generator = None
+        else:
+            self.generator = np.random.default_rng(seed)
+            g = self.generator
+            target_steps = g.integers(180, 601, n)
+            state.gravity[:] = np.clip((2 * self.board_height) / (target_steps.astype(np.float64) ** 2), 0.15, 1.5)
+            state.bounce_energy[:] = g.uniform(0.5, 1.2, n)
+            state.spin[:] = g.uniform(-2, 2, n)
+            state.angle_bias[:] = g.uniform(-3, 3, n)
+            state.max_steps[:] = g.integers(180, 601, n)
+        # step > max_steps * 0.7 <=> step > floor(max_steps * 0.7) for integer steps
+        state.damp_after[:] = np.floor(state.max_steps * 0.7)
+        return state
+
+    def _clamp(self, x, chip_d):
+        # In place: clamp within board bounds, then nudge toward center if near an edge
+        np.minimum(x, self.board_width - chip_d, out=x)
+        np.maximum(x, 0, out=x)
+        low = x < chip_d
+        high = x > self.board_width - 2 * chip_d
+        if low.any():
+            x[low] += chip_d * 0.5
+        if high.any():
+            x[high & ~low] -= chip_d * 0.5
+        return x
+
+    def _bounce_draws(self, state, hit_idx):
+        # (direction, spin factor, sideways kick, up-bounce) for each chip in hit_idx
+        m = len(hit_idx)
+        kick_scale = self.geometry.kick_scale
+        bounce_scale = self.geometry.bounce_scale
+        if state.rngs is None:
+            g = self.generator
+            return (g.integers(0, 2, m) * 2 - 1, g.uniform(-0.5, 0.5, m),
+                    g.uniform(18, 32, m) * kick_scale, g.uniform(18, 40, m) * bounce_scale)
+        draws = np.empty((4, m))
+        for n, i in enumerate(hit_idx):
+            rng = state.rngs[i]
+            draws[0, n] = rng.choice([-1, 1])
+            draws[1, n] = rng.uniform(-0.5, 0.5)
+            draws[2, n] = rng.uniform(18, 32) * kick_scale
+            draws[3, n] = rng.uniform(18, 40) * bounce_scale
+        return draws
+
+    def step(self, state, chip_d):
+        """
+        Advances every chip in `state` by one PlinkoPhysics.next_bounce step.
+        Returns (hit, landed) boolean arrays.
+        """
+        state.step += 1
+        if self.geometry.collision == "swept":
+            hit = self._move_swept(state, chip_d)
+        else:
+            hit = self._move_discrete(state, chip_d)
+        self._clamp(state.x, chip_d)
+        # Slow down as chip nears the bottom (simulate air resistance)
+        # (factor is exactly 0.98 or 1.0, which is cheaper than a masked multiply)
+        damping = (state.step > state.damp_after).astype(np.float64)
+        damping *= -0.02
+        damping += 1.0
+        state.vy *= damping
+        landed = state.y >= self.landing_y
+        landed |= state.step >= state.max_steps
+        return hit, landed
+
+    def _move_discrete(self, state, chip_d):
+        # Overlap test at each chip's position, bounce, then gravity; returns the hit mask
+        chip_r = chip_d / 2
+        cx = state.x + chip_r
+        cy = state.y + chip_r
+        i0, j0, nx, ny, table, occupied = self._cell_table(chip_r)
+        cs = self.peg_index.cell_size
+        # Grid cell of each chip center; cell lists are conservative, so rounding at cell edges is harmless
+        ci = np.floor(cx * (1 / cs))
+        cj = np.floor(cy * (1 / cs))
+        np.minimum(ci, i0 + nx - 1, out=ci)
+        np.maximum(ci, i0, out=ci)
+        np.minimum(cj, j0 + ny - 1, out=cj)
+        np.maximum(cj, j0, out=cj)
+        ci -= i0
+        ci *= ny
+        ci += cj - j0
+        cell = ci.astype(np.int64)
+        near = np.flatnonzero(occupied[cell])
+        hit = np.zeros(len(state), dtype=bool)
+        if len(near):
+            cand = table[cell[near]]
+            dx = cx[near, None] - self.peg_x[cand]
+            dy = cy[near, None] - self.peg_y[cand]
+            reach = self.peg_r[cand] + chip_r
+            rows = self.peg_row[cand]
+            overlap = (rows != state.last_hit_row[near, None]) & (np.sqrt(dx ** 2 + dy ** 2) < reach)
+            any_hit = overlap.any(axis=1)
+            hit_idx = near[any_hit]
+            if len(hit_idx):
+                # Candidates are in layout order, so the first overlap is the peg a full scan would pick
+                first = overlap[any_hit].argmax(axis=1)
+                hit_rows = rows[any_hit, first]
+                direction, spin_factor, kick, up = self._bounce_draws(state, hit_idx)
+                bias = state.angle_bias[hit_idx] + state.spin[hit_idx] * spin_factor
+                state.x[hit_idx] = self._clamp(state.x[hit_idx] + (direction * kick + bias), chip_d)
+                state.vy[hit_idx] = -up * state.bounce_energy[hit_idx]
+                state.last_hit_row[hit_idx] = hit_rows
+                hit[hit_idx] = True
+        # Gravity always pulls down
+        state.vy += state.gravity
+        state.y += state.vy
+        return hit
+
+    def _move_swept(self, state, chip_d):
+        """
+        Vectorized PlinkoPhysics.next_bounce_swept: gravity, then each chip's motion is swept
+        against the pegs. Only chips that bounced take part in the next round, for at most
+        MAX_HITS_PER_STEP rounds. Returns the hit mask.
+        """
+        chip_r = chip_d / 2
+        state.vy += state.gravity
+        sx = state.x + chip_r
+        sy = state.y + chip_r
+        ex = sx.copy()
+        ey = sy + state.vy
+        rest = np.ones(len(state))
+        skip = np.full(len(state), -1, dtype=np.int64)
+        hit = np.zeros(len(state), dtype=bool)
+        # First round: every chip; later rounds only the chips that just bounced
+        rows, idx, t = self._first_contact(sx, sy, ex, ey, chip_r, skip)
+        for bounce in range(MAX_HITS_PER_STEP):
+            if not len(rows):
+                break
+            direction, spin_factor, kick, up = self._bounce_draws(state, rows)
+            bias = state.angle_bias[rows] + state.spin[rows] * spin_factor
+            cx = sx[rows] + (ex[rows] - sx[rows]) * t
+            cy = sy[rows] + (ey[rows] - sy[rows]) * t
+            up = -up * state.bounce_energy[rows]
+            # Bounce away from the peg: up off its top half, down off its underside
+            vy = np.where(cy <= self.peg_y[idx], up, -up)
+            state.vy[rows] = vy
+            rest[rows] *= 1 - t
+            sx[rows] = cx
+            sy[rows] = cy
+            ex[rows] = self._clamp(cx - chip_r + (direction * kick + bias), chip_d) + chip_r
+            ey[rows] = cy + vy * rest[rows]
+            skip[rows] = idx
+            hit[rows] = True
+            if bounce + 1 < MAX_HITS_PER_STEP:
+                found, idx, t = self._first_contact(sx[rows], sy[rows], ex[rows], ey[rows], chip_r, skip[rows])
+                rows = rows[found]
+        state.y += state.vy
+        state.x[hit] = ex[hit] - chip_r
+        state.y[hit] = ey[hit] - chip_r
+        return hit
+
+    def _first_contact(self, sx, sy, ex, ey, chip_r, skip):
+        """
+        Vectorized PegIndex.first_contact for chip centers moving (sx, sy) -> (ex, ey).
+        Returns (rows, peg index, fraction of the move) for just the chips that reach a peg.
+        """
+        none = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+        if not len(sx):
+            return none
+        cs = self.peg_index.cell_size
+        inv = 1 / cs
+        # Most segments are nowhere near a peg. Any contact point lies in the segment's bounding box
+        # and its cell lists the peg, so a summed-area lookup over the box rules those out first
+        i0, j0, nx, ny, _, _ = self._cell_table(chip_r)
+        sums = self._occupied_sums(chip_r)
+        box = [np.floor(np.minimum(sx, ex) * inv), np.floor(np.maximum(sx, ex) * inv) + 1,
+               np.floor(np.minimum(sy, ey) * inv), np.floor(np.maximum(sy, ey) * inv) + 1]
+        for a, low, size in zip(box, (i0, i0, j0, j0), (nx, nx + 1, ny, ny + 1)):
+            a -= low
+            np.maximum(a, 0, out=a)
+            np.minimum(a, size - 1, out=a)
+        lo_i, hi_i, lo_j, hi_j = (a.astype(np.int64) for a in box)
+        lo_i *= ny + 1
+        hi_i *= ny + 1
+        count = sums.take(hi_i + hi_j)
+        count -= sums.take(lo_i + hi_j)
+        count -= sums.take(hi_i + lo_j)
+        count += sums.take(lo_i + lo_j)
+        boxed = np.flatnonzero(count)
+        if not len(boxed):
+            return none
+        # Sample what's left at most one cell apart against cells padded by half a cell, as
+        # PegIndex.swept_candidates does. Samples are laid out flat, owner by owner, so a few fast
+        # chips don't make every chip pay for their sample count
+        i0, j0, nx, ny, table, occupied = self._cell_table(chip_r + cs / 2)
+        sx, sy, ex, ey, skip = sx[boxed], sy[boxed], ex[boxed], ey[boxed], skip[boxed]
+        dx = ex - sx
+        dy = ey - sy
+        samples = np.maximum(np.ceil(np.hypot(dx, dy) * inv), 1).astype(np.int64)
+        owner = np.repeat(np.arange(len(boxed)), samples + 1)
+        frac = np.arange(len(owner)) - np.repeat(np.cumsum(samples + 1) - (samples + 1), samples + 1)
+        frac = frac / samples[owner]
+        ci = np.clip(np.floor((sx[owner] + dx[owner] * frac) * inv), i0, i0 + nx - 1).astype(np.int64)
+        cj = np.clip(np.floor((sy[owner] + dy[owner] * frac) * inv), j0, j0 + ny - 1).astype(np.int64)
+        cell = (ci - i0) * ny + (cj - j0)
+        keep = np.flatnonzero(occupied[cell])
+        if not len(keep):
+            return none
+        cand = table[cell[keep]].ravel()
+        owner = np.repeat(owner[keep], table.shape[1])
+        # Padding entries point at the sentinel peg
+        keep = np.flatnonzero((cand != len(self.peg_x) - 1) & (cand != skip[owner]))
+        cand, owner = cand[keep], owner[keep]
+        sx, sy, dx, dy = sx[owner], sy[owner], dx[owner], dy[owner]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Same arithmetic, in the same order, as physics.contact_time
+            fx = sx - self.peg_x[cand]
+            fy = sy - self.peg_y[cand]
+            b = fx * dx + fy * dy
+            reach = self.peg_r[cand] + chip_r
+            c = fx * fx + fy * fy - reach * reach
+            disc = b * b - (dx * dx + dy * dy) * c
+            t = np.where(c <= 0, 0.0, c / (np.sqrt(np.maximum(disc, 0)) - b))
+            ok = (b < 0) & ((c <= 0) | ((disc >= 0) & (t <= 1)))
+        keep = np.flatnonzero(ok)
+        if not len(keep):
+            return none
+        t, cand, owner = t[keep], cand[keep], owner[keep]
+        # Owners are in order, so each one's candidates are a contiguous run
+        starts = np.flatnonzero(np.diff(owner, prepend=-1))
+        first = np.minimum.reduceat(t, starts)
+        # Ties (and the same peg seen from several cells) go to the earliest peg in layout order
+        tied = np.where(t == np.repeat(first, np.diff(starts, append=len(t))), cand, len(self.peg_x))
+        return boxed[owner[starts]], np.minimum.reduceat(tied, starts), first
+
+    def landing_slots(self, chip_x, chip_d):
+        # Vectorized PlinkoBoard.resolve_chip rule; -1 where the chip missed the slots
+        slot_width = self.geometry.slot_width(self.board_width)
+        slots = np.floor((chip_x + chip_d / 2 - slot_width * 0.1) / slot_width).astype(np.int64)
+        return np.where((slots >= 0) & (slots < self.n_slots), slots, -1)
+
+    def simulate(self, n, release_x, chip_d, seed=None, seeds=None, chunk_size=65536):
+        """
+        Drops n chips to completion and returns their landing slots (int array, -1 = missed).
+        Chips are processed in cache-sized chunks and landed chips are dropped from the working set.
+        """
+        release_x = np.broadcast_to(np.asarray(release_x, dtype=np.float64), (n,))
+        slots = np.empty(n, dtype=np.int64)
+        if seeds is None:
+            self.generator = np.random.default_rng(seed)
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            if seeds is None:
+                state = self.reset(stop - start, release_x[start:stop], seed=self.generator)
+            else:
+                state = self.reset(stop - start, release_x[start:stop], seeds=seeds[start:stop])
+            state.ids += start
+            done = np.zeros(len(state), dtype=bool)
+            while len(state):
+                _, landed = self.step(state, chip_d)
+                new = landed & ~done
+                if new.any():
+                    slots[state.ids[new]] = self.landing_slots(state.x[new], chip_d)
+                    done |= new
+                    # Landed chips keep stepping harmlessly until enough pile up to be worth compacting
+                    if done.sum() * 4 >= len(done):
+                        state = state.take(~done)
+                        done = np.zeros(len(state), dtype=bool)
+        return slots
@@ -0,0 +1,157 @@
+"""
+Several independent PlinkoBoards in one process, e.g. one per tournament table.
+
+Boards added to a BoardGroup share:
+- one frame clock: a single precise timer ticks only the boards that have chips in flight,
+  so idle boards cost nothing per frame
+- one physics worker thread that precomputes drop trajectories, so a burst of drops across
+  boards never stalls a frame on the GUI thread
+- one pair of sound pools (and their voices), loaded once, in the background
+- one BoardGeometry, and with it the cached peg layouts; pens, brushes, fonts and the
+  trajectory cache are already shared by every board in the process
+
+Per-frame cost therefore grows with the chips in flight, not with the number of boards.
+"""
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+from plinko_board import PlinkoBoard
+from utils.audio import SoundLoader, SoundPool
+from utils.geometry import load_geometry
+from utils.trajectory import compute_trajectory
+
+class FrameClock(QObject):
+    """One timer for many boards; boards join with wake() and leave once their last chip lands."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+        self.active = []
+
+    def wake(self, board):
+        if board in self.active:
+            return
+        board._accumulator = 0.0
+        board._last_frame = board.clock()
+        self.active.append(board)
+        if not self.timer.isActive():
+            self.timer.start(board.frame_interval_ms())
+
+    def _tick(self):
+        for board in list(self.active):
+            board._on_frame()
+            if not len(board.chips):
+                self.active.remove(board)
+        if not self.active:
+            self.timer.stop()
+
+    def remove(self, board):
+        if board in self.active:
+            self.active.remove(board)
+
+class PhysicsWorker(QObject):
+    """
+    Precomputes trajectories on one background thread for every board in a group. A finished
+    trajectory is cached on the board and its chip starts falling (on the GUI thread); chips
+    whose board has gone are skipped.
+    """
+    _done = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="physics")
+        # Always queued: a future that is already done runs its callback on the GUI thread at once,
+        # and a chip must never start inside launch_chip() on one drop but not another
+        self._done.connect(self._deliver, Qt.QueuedConnection)
+
+    def compute(self, board, chip, player_name, seed, geometry, peg_positions=None, peg_index=None):
+        self.pending += 1
+        job = (weakref.ref(board), chip, player_name, geometry)
+        future = self._executor.submit(compute_trajectory, seed, chip.x(), geometry, peg_positions, peg_index,
+                                       chip.y())
+        future.add_done_callback(lambda future: self._done.emit((job, future)))
+
+    def _deliver(self, done):
+        (board_ref, chip, player_name, geometry), future = done
+        self.pending -= 1
+        board = board_ref()
+        if board is None or future.cancelled():
+            return
+        trajectory = future.result()
+        board.trajectory_cache.store(trajectory, geometry, chip.data(0)[2])
+        if chip.scene() is board.scene:
+            board.start_precomputed_drop(chip, player_name, trajectory)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class BoardGroup(QObject):
+    """
+    Boards sharing one frame clock, physics worker, sound pools and geometry.
+    - create_board() makes a PlinkoBoard already wired into the group; add_board() adopts one
+    - sounds load in the background on the first board's first paint (or load_sounds_async())
+    """
+    def __init__(self, geometry=None, parent=None):
+        super().__init__(parent)
+        self.geometry = geometry or load_geometry()
+        self.frame_clock = FrameClock(self)
+        self.physics_worker = PhysicsWorker(self)
+        # Shared by every board, so the per-frame sound budget is for the whole group
+        self.bounce_sound = SoundPool("assets/bounce.wav", voices=6, pitches=(0.9, 1.0, 1.12),
+                                      max_per_frame=4, parent=self, load=False)
+        self.land_sound = SoundPool("assets/land.wav", voices=4, max_per_frame=3, parent=self, load=False)
+        self.sound_loader = SoundLoader([self.bounce_sound, self.land_sound], parent=self)
+        self._sounds_started = False
+        self.boards = []
+
+    def create_board(self, reward_labels, parent=None):
+        board = PlinkoBoard(reward_labels, parent=parent, geometry=self.geometry, load_sounds=False)
+        self.add_board(board)
+        return board
+
+    def add_board(self, board):
+        board.frame_clock = self.frame_clock
+        board.physics_worker = self.physics_worker
+        board.bounce_sound = self.bounce_sound
+        board.land_sound = self.land_sound
+        # board.load_sounds_async() hands back the group's loader instead of making its own
+        board.sound_loader = self.sound_loader
+        board.first_paint.connect(self.load_sounds_async)
+        if board.anim_timer.isActive():
+            board.anim_timer.stop()
+            board.wake_frame_timer()
+        self.boards.append(board)
+        return board
+
+    def remove_board(self, board):
+        # Back to the board's own timer and synchronous precompute (the shared sounds stay)
+        self.boards.remove(board)
+        board.first_paint.disconnect(self.load_sounds_async)
+        self.frame_clock.remove(board)
+        board.frame_clock = None
+        board.physics_worker = None
+        if len(board.chips):
+            board.wake_frame_timer()
+
+    def load_sounds_async(self):
+        if not self._sounds_started:
+            self._sounds_started = True
+            self.sound_loader.start()
+        return self.sound_loader
+
+    def chips_in_flight(self):
+        return sum(len(board.chips) for board in self.boards)
+
+    def stats(self):
+        return {"boards": len(self.boards), "active_boards": len(self.frame_clock.active),
+                "chips_in_flight": self.chips_in_flight(), "pending_trajectories": self.physics_worker.pending}
+
+    def close(self):
+        # Stops the clock and worker and drops every board <-> group reference
+        self.frame_clock.timer.stop()
+        for board in list(self.boards):
+            self.remove_board(board)
+            board.anim_timer.stop()
+        self.physics_worker.shutdown()
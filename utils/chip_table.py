@@ -0,0 +1,107 @@
+import numpy as np
+from utils.batch_physics import ChipState
+
+class ChipTable:
+    """
+    Every chip in flight on a board, one row per chip:
+    - Physics state for live-stepped chips lives in a ChipState (NumPy arrays).
+    - Replayed chips only need their frame counter plus a precomputed Trajectory; `replayed` marks
+      their rows, so splitting live from replayed chips is a NumPy mask rather than a Python loop.
+    - Positions before and after the latest physics step are kept for render interpolation.
+    - Rows are recycled when chips land, so the arrays stay compact under heavy drop traffic.
+    Items are opaque here (QGraphicsItems on the board), so the table itself is Qt-free.
+    """
+    def __init__(self, capacity=64):
+        self.state = ChipState(capacity)
+        self.state.rngs = [None] * capacity
+        self.active = np.zeros(capacity, dtype=bool)
+        self.replayed = np.zeros(capacity, dtype=bool)
+        self.frame = np.zeros(capacity, dtype=np.int64)
+        self.chip_d = np.zeros(capacity, dtype=np.float64)
+        self.prev_x = np.zeros(capacity, dtype=np.float64)
+        self.prev_y = np.zeros(capacity, dtype=np.float64)
+        self.cur_x = np.zeros(capacity, dtype=np.float64)
+        self.cur_y = np.zeros(capacity, dtype=np.float64)
+        self.items = [None] * capacity
+        self.players = [None] * capacity
+        self.trajectories = [None] * capacity
+        self.seeds = [None] * capacity
+
+    def __len__(self):
+        return int(self.active.sum())
+
+    @property
+    def capacity(self):
+        return len(self.active)
+
+    def _grow(self):
+        old = self.capacity
+        new = old * 2
+        self.state.grow(new)
+        self.active = np.concatenate([self.active, np.zeros(old, dtype=bool)])
+        self.replayed = np.concatenate([self.replayed, np.zeros(old, dtype=bool)])
+        self.frame = np.concatenate([self.frame, np.zeros(old, dtype=np.int64)])
+        for name in ("chip_d", "prev_x", "prev_y", "cur_x", "cur_y"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(old, dtype=np.float64)]))
+        for column in (self.items, self.players, self.trajectories, self.seeds):
+            column.extend([None] * old)
+
+    def add(self, item, player, chip_d, seed, x, y, trajectory=None, physics=None):
+        """
+        Adds a chip starting at (x, y) and returns its row. Pass either a precomputed `trajectory`,
+        or `physics`: a one-chip ChipState (from BatchPlinkoPhysics.reset) to be stepped live.
+        """
+        free = np.flatnonzero(~self.active)
+        if not len(free):
+            self._grow()
+            free = np.flatnonzero(~self.active)
+        row = int(free[0])
+        self.active[row] = True
+        self.replayed[row] = trajectory is not None
+        self.frame[row] = 0
+        self.chip_d[row] = chip_d
+        self.prev_x[row] = self.cur_x[row] = x
+        self.prev_y[row] = self.cur_y[row] = y
+        self.items[row] = item
+        self.players[row] = player
+        self.trajectories[row] = trajectory
+        self.seeds[row] = seed
+        if physics is not None:
+            self.state.put([row], physics)
+        return row
+
+    def advance(self, rows, x, y):
+        # Record a physics step: current positions become previous, (x, y) become current
+        self.prev_x[rows] = self.cur_x[rows]
+        self.prev_y[rows] = self.cur_y[rows]
+        self.cur_x[rows] = x
+        self.cur_y[rows] = y
+
+    def interpolated(self, rows, alpha):
+        # Render positions `alpha` of the way from the previous to the current physics step
+        x = self.prev_x[rows] + (self.cur_x[rows] - self.prev_x[rows]) * alpha
+        y = self.prev_y[rows] + (self.cur_y[rows] - self.prev_y[rows]) * alpha
+        return x, y
+
+    def remove(self, row):
+        self.active[row] = False
+        self.replayed[row] = False
+        self.items[row] = None
+        self.players[row] = None
+        self.trajectories[row] = None
+        self.state.rngs[row] = None
+
+    def rows(self):
+        return np.flatnonzero(self.active)
+
+    def live_rows(self):
+        # Active chips without a precomputed trajectory
+        return np.flatnonzero(self.active & ~self.replayed)
+
+    def replayed_rows(self):
+        # Active chips replaying a precomputed trajectory
+        return np.flatnonzero(self.active & self.replayed)
+
+    def clear(self):
+        for row in self.rows():
+            self.remove(row)
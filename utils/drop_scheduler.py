@@ -0,0 +1,163 @@
+"""
+Drop queue between the UI and a PlinkoBoard.
+
+Drops are queued instead of launched on the spot, so clicks during a drop are never lost and a
+giveaway of hundreds of drops doesn't bury the board in chips:
+
+- Each player has their own FIFO and dispatch goes round-robin over players, so one player's
+  batch of 500 can't hold everyone else back.
+- A per-player token bucket (rate drops/s, bursts of `burst`) limits how fast one player can queue.
+- At most `max_concurrent` scheduled chips fall at once; the rest wait their turn.
+- Turbo: once more than `turbo_threshold` drops are waiting, the whole backlog is resolved at
+  once with headless batch physics (board.resolve_instantly). Seeds are drawn at submit time, so
+  a turbo drop lands where the animated drop would have, and the replay log stays complete.
+
+All methods run on the GUI thread.
+"""
+import time
+from collections import OrderedDict, deque
+import numpy as np
+from PySide6.QtCore import QObject, QTimer, Signal
+from utils.physics import new_seed
+
+class DropRequest:
+    __slots__ = ("id", "player", "color", "release_x", "seed", "submitted", "started")
+
+    def __init__(self, request_id, player, color, release_x, seed, submitted):
+        self.id = request_id
+        self.player = player
+        self.color = color
+        self.release_x = release_x
+        self.seed = seed
+        self.submitted = submitted
+        self.started = None
+
+class DropScheduler(QObject):
+    """
+    Bounded, fair drop queue feeding a PlinkoBoard.
+    - submit() returns the request id, or None (and emits `rejected`) when the queue is full or
+      the player is over their rate limit
+    - `resolved` fires with (request id, result dict) for every scheduled drop, animated or turbo
+    - stats() reports queue depth, in-flight chips and submit-to-start wait times
+    """
+    resolved = Signal(int, dict)
+    rejected = Signal(str, str)  # (player, reason)
+
+    def __init__(self, board, max_queue=1000, max_concurrent=8, rate=None, burst=5, turbo_threshold=None,
+                 clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self.board = board
+        self.max_queue = max_queue
+        self.max_concurrent = max_concurrent
+        self.rate = rate
+        self.burst = burst
+        self.turbo_threshold = turbo_threshold
+        self.clock = clock
+        self.counters = {"submitted": 0, "full": 0, "rate_limited": 0, "animated": 0, "turbo": 0,
+                         "turbo_batches": 0, "resolved": 0}
+        self.waits = deque(maxlen=512)  # Recent submit-to-start waits, in seconds
+        self.max_wait = 0.0
+        self._queues = OrderedDict()  # player -> deque of DropRequest, in round-robin order
+        self._depth = 0
+        self._buckets = {}  # player -> (tokens, last refill)
+        self._in_flight = {}  # id(chip) -> (chip, DropRequest)
+        self._next_id = 0
+        self._pump_pending = False
+        board.result_ready.connect(self._on_result)
+
+    def __len__(self):
+        return self._depth
+
+    def submit(self, player, color="#ff00de", release_x=None, seed=None):
+        if self._depth >= self.max_queue:
+            self.counters["full"] += 1
+            self.rejected.emit(player, "The drop queue is full, try again shortly.")
+            return None
+        now = self.clock()
+        if self.rate is not None and not self._take_token(player, now):
+            self.counters["rate_limited"] += 1
+            self.rejected.emit(player, f"{player} is dropping too fast, slow down.")
+            return None
+        self._next_id += 1
+        request = DropRequest(self._next_id, player, color, release_x, new_seed() if seed is None else seed, now)
+        self._queues.setdefault(player, deque()).append(request)
+        self._depth += 1
+        self.counters["submitted"] += 1
+        # Pump once per event-loop pass, so a burst of submits is scheduled (or turbo'd) together
+        if not self._pump_pending:
+            self._pump_pending = True
+            QTimer.singleShot(0, self, self.pump)
+        return request.id
+
+    def _take_token(self, player, now):
+        tokens, last = self._buckets.get(player, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self._buckets[player] = (tokens, now)
+            return False
+        self._buckets[player] = (tokens - 1, now)
+        return True
+
+    def _take(self):
+        # Next request in round-robin order over players
+        player, queue = next(iter(self._queues.items()))
+        request = queue.popleft()
+        if queue:
+            self._queues.move_to_end(player)
+        else:
+            del self._queues[player]
+        self._depth -= 1
+        request.started = self.clock()
+        wait = request.started - request.submitted
+        self.waits.append(wait)
+        self.max_wait = max(self.max_wait, wait)
+        return request
+
+    def pump(self):
+        self._pump_pending = False
+        if self.turbo_threshold is not None and self._depth > self.turbo_threshold:
+            self._resolve_backlog()
+        while self._depth and len(self._in_flight) < self.max_concurrent:
+            if not self._in_flight and not len(self.board.chips):
+                # Same as drop_chip: a new round clears the previous round's landed chips
+                self.board.reset_chip()
+            request = self._take()
+            chip = self.board.launch_chip(request.player, request.color, request.release_x, request.seed)
+            self._in_flight[id(chip)] = (chip, request)
+            self.counters["animated"] += 1
+
+    def _resolve_backlog(self):
+        requests = [self._take() for _ in range(self._depth)]
+        results = self.board.resolve_instantly([(r.player, r.release_x, r.seed) for r in requests])
+        self.counters["turbo"] += len(requests)
+        self.counters["turbo_batches"] += 1
+        for request, result in zip(requests, results):
+            self._finish(request, result)
+
+    def _on_result(self, chip, result):
+        entry = self._in_flight.pop(id(chip), None) if chip is not None else None
+        if entry is None:
+            return
+        self._finish(entry[1], result)
+        self.pump()
+
+    def _finish(self, request, result):
+        self.counters["resolved"] += 1
+        self.resolved.emit(request.id, result)
+
+    def queued_for(self, player):
+        queue = self._queues.get(player)
+        return len(queue) if queue else 0
+
+    def stats(self):
+        waits = np.array(self.waits) if self.waits else np.zeros(1)
+        return dict(self.counters, queued=self._depth, players_waiting=len(self._queues),
+                    in_flight=len(self._in_flight), wait_p50=float(np.percentile(waits, 50)),
+                    wait_p95=float(np.percentile(waits, 95)), wait_max=self.max_wait)
+
+    def stop(self):
+        # Drops the board -> scheduler connection so the scheduler is freed by refcount
+        self.board.result_ready.disconnect(self._on_result)
+        self._queues.clear()
+        self._depth = 0
+        self._in_flight.clear()
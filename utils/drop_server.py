@@ -0,0 +1,384 @@
+"""
+Local drop-request server so bots can drop chips without driving the UI.
+
+An asyncio loop runs on its own thread and speaks plain HTTP/1.1 and WebSocket (stdlib only):
+
+    POST /drop   {"player": "Ann", "color": "#ff00de", "release_x": 300}
+                 -> 202 {"id": 7, "queued": 3}, or 429 when the queue is full
+    GET  /stats  -> counters (accepted, rejected, batches, in_flight, ...)
+    GET  /metrics -> board frame timings in Prometheus text format (when board metrics are on)
+    GET  /ws     -> WebSocket; every resolved drop is pushed as a JSON text frame, and
+                    drop requests can be sent as text frames too
+
+Requests land in a bounded queue. A batcher wakes at most once per frame (16 ms), takes
+everything queued (up to the number of free in-flight slots) and hands the batch to the GUI
+thread through a queued Qt signal, where each request becomes board.launch_chip(), or a
+DropScheduler.submit() when the server is given the window's scheduler (fair per-player queues,
+rate limits and turbo apply to bots too). The GUI never waits on the network, and the network
+never touches Qt items.
+
+Usage:
+    python main.py serve --port 8765
+    curl -X POST localhost:8765/drop -d '{"player": "Ann"}'
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import threading
+from PySide6.QtCore import QObject, Signal
+from utils.physics import new_seed
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_BODY = 64 * 1024
+STATUS_TEXT = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               429: "Too Many Requests"}
+
+class BadRequest(Exception):
+    """A request that can't be framed; answered with 400 and the connection is closed."""
+
+def parse_drop_request(data):
+    # Returns (player, color, release_x) or raises ValueError with a client-facing message
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    player = data.get("player")
+    if not isinstance(player, str) or not player.strip():
+        raise ValueError("'player' is required")
+    color = data.get("color", "#ff00de")
+    if not isinstance(color, str):
+        raise ValueError("'color' must be a string")
+    release_x = data.get("release_x")
+    if release_x is not None and (isinstance(release_x, bool) or not isinstance(release_x, (int, float))
+                                  or not math.isfinite(release_x)):
+        raise ValueError("'release_x' must be a finite number")
+    return player.strip(), color, release_x
+
+def ws_frame(payload, opcode=0x1):
+    # Single unmasked server frame
+    header = bytearray([0x80 | opcode])
+    n = len(payload)
+    if n < 126:
+        header.append(n)
+    elif n < 65536:
+        header.append(126)
+        header += n.to_bytes(2, "big")
+    else:
+        header.append(127)
+        header += n.to_bytes(8, "big")
+    return bytes(header) + payload
+
+async def read_ws_frame(reader):
+    b1, b2 = await reader.readexactly(2)
+    opcode = b1 & 0x0F
+    n = b2 & 0x7F
+    if n == 126:
+        n = int.from_bytes(await reader.readexactly(2), "big")
+    elif n == 127:
+        n = int.from_bytes(await reader.readexactly(8), "big")
+    if n > MAX_BODY:
+        raise ConnectionError("WebSocket frame too large")
+    mask = await reader.readexactly(4) if b2 & 0x80 else None
+    data = await reader.readexactly(n)
+    if mask:
+        data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+    return opcode, data
+
+class DropServer(QObject):
+    """
+    HTTP/WebSocket front end for a PlinkoBoard.
+    - max_queue: requests waiting to be dropped; beyond this, POST /drop answers 429
+    - max_in_flight: server drops falling at once; the batcher stops pulling from the queue
+      until results come back, so a slow board turns into 429s instead of unbounded backlog
+    - batch_window: how long the batcher lets a burst accumulate before handing it over
+    - scheduler: optional DropScheduler for the board; drops it turns away are pushed to
+      subscribers as {"id", "player", "error"}
+    """
+    drops_ready = Signal(list)
+
+    def __init__(self, board, host="127.0.0.1", port=8765, max_queue=256, max_in_flight=64,
+                 batch_window=0.016, subscriber_queue=256, scheduler=None):
+        super().__init__()
+        self.board = board
+        self.scheduler = scheduler
+        self.host = host
+        self.port = port
+        self.max_queue = max_queue
+        self.max_in_flight = max_in_flight
+        self.batch_window = batch_window
+        self.subscriber_queue = subscriber_queue
+        self.stats = {"accepted": 0, "rejected": 0, "invalid": 0, "batches": 0, "launched": 0, "failed": 0,
+                      "results": 0}
+        self.loop = None
+        self._thread = None
+        self._server = None
+        self._batcher = None
+        self._queue = None
+        self._capacity = None
+        self._subscribers = set()
+        self._connections = set()
+        self._next_id = 0
+        self._in_flight = 0
+        # (seed, player) -> request id, GUI thread only. Seeds are drawn here, so a result is matched
+        # to its request whether the board launched it directly or the scheduler queued it first
+        self._pending = {}
+        self._rejection = None
+        # Emitted from the asyncio thread; the receiver lives on the GUI thread, so Qt queues it
+        self.drops_ready.connect(self._launch_batch)
+        board.result_ready.connect(self._on_result)
+        if scheduler is not None:
+            scheduler.rejected.connect(self._on_rejected)
+
+    # --- lifecycle (GUI thread) ---
+    def start(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="drop-server", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+        return self.port
+
+    def stop(self):
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._stop(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+        self.loop = None
+        # Drop every reference cycle back to this object (asyncio server -> handler, board signal
+        # -> slot) so it is freed by refcount, not by a cyclic GC pass that could run mid-paint
+        self.board.result_ready.disconnect(self._on_result)
+        self.drops_ready.disconnect(self._launch_batch)
+        if self.scheduler is not None:
+            self.scheduler.rejected.disconnect(self._on_rejected)
+        self._server = self._batcher = self._queue = self._capacity = None
+        self._connections.clear()
+        self._subscribers.clear()
+        self._pending.clear()
+
+    async def _start(self):
+        self._queue = asyncio.Queue(self.max_queue)
+        self._capacity = asyncio.Semaphore(self.max_in_flight)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Port 0 picks a free port; report the real one
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def _stop(self):
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    # --- queue and batching (asyncio thread) ---
+    def submit(self, data):
+        try:
+            player, color, release_x = parse_drop_request(data)
+        except ValueError as e:
+            self.stats["invalid"] += 1
+            return 400, {"error": str(e)}
+        if self._queue.full():
+            self.stats["rejected"] += 1
+            return 429, {"error": "drop queue is full, retry shortly"}
+        self._next_id += 1
+        self._queue.put_nowait((self._next_id, player, color, release_x))
+        self.stats["accepted"] += 1
+        return 202, {"id": self._next_id, "queued": self._queue.qsize()}
+
+    async def _batch_loop(self):
+        while True:
+            await self._capacity.acquire()
+            batch = [await self._queue.get()]
+            # Let the rest of a burst arrive, then hand it over as one frame's worth of drops
+            await asyncio.sleep(self.batch_window)
+            while not self._queue.empty() and not self._capacity.locked():
+                await self._capacity.acquire()
+                batch.append(self._queue.get_nowait())
+            self.stats["batches"] += 1
+            self._in_flight += len(batch)
+            self.drops_ready.emit(batch)
+
+    def _publish(self, payload, from_server):
+        if from_server:
+            self._in_flight -= 1
+            self._capacity.release()
+        self.stats["results"] += 1
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Slow subscriber: drop its oldest result rather than stall everyone else
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+    # --- Qt side (GUI thread) ---
+    def _launch_batch(self, batch):
+        for request_id, player, color, release_x in batch:
+            seed = new_seed()
+            try:
+                if self.scheduler is None:
+                    self.board.launch_chip(player, color, release_x=release_x, seed=seed)
+                elif self.scheduler.submit(player, color, release_x, seed) is None:
+                    # Queue full or player over the rate limit
+                    self.stats["rejected"] += 1
+                    self._drop_failed(request_id, player, self._rejection)
+                    continue
+            except Exception as e:
+                # One bad launch mustn't take the rest of the batch (or its in-flight slot) with it
+                self.stats["failed"] += 1
+                self._drop_failed(request_id, player, f"drop could not be launched: {e}")
+                continue
+            self._pending[(seed, player)] = request_id
+            self.stats["launched"] += 1
+
+    def _drop_failed(self, request_id, player, error):
+        # Frees the request's in-flight slot straight away and tells subscribers why
+        payload = {"id": request_id, "player": player, "error": error}
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._publish, payload, True)
+
+    def _on_rejected(self, player, reason):
+        # Emitted synchronously by scheduler.submit(), just before it returns None
+        self._rejection = reason
+
+    def _on_result(self, chip, result):
+        request_id = self._pending.pop((result["seed"], result["player"]), None)
+        payload = dict(result, id=request_id)
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._publish, payload, request_id is not None)
+
+    # --- HTTP / WebSocket (asyncio thread) ---
+    async def _handle(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    await self._serve_websocket(reader, writer, headers)
+                    break
+                status, payload = self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._respond(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except BadRequest as e:
+            self._respond(writer, 400, {"error": str(e)}, keep_alive=False)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise ConnectionError("malformed request line")
+        method, target, _ = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise BadRequest("Content-Length must be a non-negative integer")
+        if length > MAX_BODY:
+            raise ConnectionError("request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    def _route(self, method, path, body):
+        if path == "/drop":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                data = json.loads(body or b"null")
+            except ValueError:
+                self.stats["invalid"] += 1
+                return 400, {"error": "body must be JSON"}
+            return self.submit(data)
+        if path == "/stats":
+            return 200, self.snapshot()
+        if path == "/metrics":
+            metrics = self.board.metrics
+            if metrics is None:
+                return 404, {"error": "board metrics are disabled"}
+            return 200, metrics.prometheus_text()
+        return 404, {"error": "not found"}
+
+    def snapshot(self):
+        return dict(self.stats, queued=self._queue.qsize(), subscribers=len(self._subscribers),
+                    in_flight=self._in_flight)
+
+    def _respond(self, writer, status, payload, keep_alive=True):
+        # Strings go out as plain text (the /metrics exposition format), everything else as JSON
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload).encode(), "application/json"
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+        if status == 429:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode() + b"\r\n" + body)
+
+    async def _serve_websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        await writer.drain()
+        queue = asyncio.Queue(self.subscriber_queue)
+        self._subscribers.add(queue)
+        sender = asyncio.create_task(self._ws_sender(writer, queue))
+        try:
+            while True:
+                opcode, data = await read_ws_frame(reader)
+                if opcode == 0x8:  # close
+                    writer.write(ws_frame(b"", 0x8))
+                    break
+                if opcode == 0x9:  # ping
+                    writer.write(ws_frame(data, 0xA))
+                elif opcode == 0x1:
+                    try:
+                        status, payload = self.submit(json.loads(data))
+                    except ValueError:
+                        status, payload = 400, {"error": "message must be JSON"}
+                    if not queue.full():
+                        queue.put_nowait(dict(payload, status=status))
+        finally:
+            self._subscribers.discard(queue)
+            sender.cancel()
+
+    async def _ws_sender(self, writer, queue):
+        while True:
+            payload = await queue.get()
+            writer.write(ws_frame(json.dumps(payload).encode()))
+            await writer.drain()
+
+def parse_server_args(argv):
+    parser = argparse.ArgumentParser(description="Run the Plinko board with a local drop-request server.")
+    parser.add_argument("--host", default="127.0.0.1", help="Use 0.0.0.0 to accept drops from the LAN")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    parser.add_argument("--metrics-file", help="Also rewrite frame metrics (Prometheus text) to this file every 5 s")
+    return parser.parse_args(argv)
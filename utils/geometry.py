@@ -0,0 +1,143 @@
+"""
+Board geometry shared by the view and the physics: how many peg rows and columns there are,
+how many slots, and where everything sits for a given viewport size.
+
+All spacing is derived from the counts, so the classic 8-row, 10-column, 10-slot board keeps its
+original proportions (pegs w/10 and h/12 apart, slots h/13 tall) and denser boards scale down:
+    column spacing  w / cols
+    row spacing     h / (rows + 4)
+    slot width      w / slots
+    slot height     h / (rows + 5)
+    chip diameter   half a column, at most 30 px
+
+The geometry is loaded from config/board_geometry.json, e.g. {"rows": 40, "cols": 30, "slots": 30}.
+It also picks how the physics finds peg hits ("collision"):
+    "discrete"  overlap tests at each step's end position (the original rule; the default)
+    "swept"     the chip's whole motion each step is swept against the pegs, so fast chips
+                can't skip over small pegs and the odds don't drift with the viewport size
+"""
+import json
+import os
+import numpy as np
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "board_geometry.json")
+MAX_CHIP_D = 30
+COLLISION_MODES = ("discrete", "swept")
+
+class BoardGeometry:
+    """
+    Peg and slot counts for one board design.
+    - Immutable and hashable, so it can be part of cache keys (trajectories, odds maps)
+    - layout(w, h) precomputes every peg and slot position for a viewport, as NumPy arrays
+    - kick_scale / bounce_scale shrink bounces on denser boards (both 1.0 for the classic board)
+    - collision is one of COLLISION_MODES; it changes where chips land, so it is part of equality
+    """
+    def __init__(self, rows=8, cols=10, slots=10, collision="discrete"):
+        for name, value in (("rows", rows), ("cols", cols), ("slots", slots)):
+            if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= 255:
+                raise ValueError(f"{name} must be a whole number from 1 to 255, got {value!r}")
+        if collision not in COLLISION_MODES:
+            raise ValueError(f"collision must be one of {', '.join(COLLISION_MODES)}, got {collision!r}")
+        self.rows = rows
+        self.cols = cols
+        self.slots = slots
+        self.collision = collision
+        self.kick_scale = 10 / cols
+        self.bounce_scale = 12 / (rows + 4)
+        self._layouts = {}
+
+    def key(self):
+        return (self.rows, self.cols, self.slots)
+
+    def __eq__(self, other):
+        return isinstance(other, BoardGeometry) and self.key() == other.key() and self.collision == other.collision
+
+    def __hash__(self):
+        return hash((self.key(), self.collision))
+
+    def __repr__(self):
+        collision = "" if self.collision == "discrete" else f", collision={self.collision!r}"
+        return f"BoardGeometry(rows={self.rows}, cols={self.cols}, slots={self.slots}{collision})"
+
+    def to_dict(self):
+        return {"rows": self.rows, "cols": self.cols, "slots": self.slots, "collision": self.collision}
+
+    @classmethod
+    def from_dict(cls, data):
+        if not isinstance(data, dict):
+            raise ValueError("Board geometry must be a JSON object")
+        unknown = set(data) - {"rows", "cols", "slots", "collision"}
+        if unknown:
+            raise ValueError(f"Unknown board geometry keys: {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+    def row_spacing(self, board_height):
+        # Vertical distance between peg rows; also the row height the collision index buckets by
+        return board_height / (self.rows + 4)
+
+    def slot_width(self, board_width):
+        return board_width / self.slots
+
+    def slot_height(self, board_height):
+        return board_height / (self.rows + 5)
+
+    def landing_y(self, board_height):
+        # Top edge of the reward slots; a chip at or below this has landed
+        return board_height - self.slot_height(board_height) * 1.2
+
+    def chip_diameter(self, board_width):
+        return min(board_width / self.cols / 2, MAX_CHIP_D)
+
+    def layout(self, board_width, board_height):
+        # Layouts are cheap to keep and a resize usually flips between a few sizes
+        layout = self._layouts.get((board_width, board_height))
+        if layout is None:
+            if len(self._layouts) >= 8:
+                self._layouts.clear()
+            layout = BoardLayout(self, board_width, board_height)
+            self._layouts[(board_width, board_height)] = layout
+        return layout
+
+class BoardLayout:
+    """
+    Every position on one board at one viewport size, computed once with NumPy.
+    - peg_x, peg_y, peg_r, peg_row: one element per peg in row-major order
+    - peg_positions: the same pegs as [(x, y, r), ...] for PegIndex and the physics
+    - slot_x: left edge of each slot's frame
+    """
+    def __init__(self, geometry, board_width, board_height):
+        self.geometry = geometry
+        self.width = board_width
+        self.height = board_height
+        self.spacing_x = board_width / geometry.cols
+        self.spacing_y = geometry.row_spacing(board_height)
+        peg_d = min(self.spacing_x, self.spacing_y) / 8
+        row = np.repeat(np.arange(geometry.rows), geometry.cols)
+        col = np.tile(np.arange(geometry.cols), geometry.rows)
+        # Even rows are shifted half a column to stagger the lattice
+        offset_x = np.where(row % 2 == 0, self.spacing_x / 2, 0.0)
+        self.peg_x = col * self.spacing_x + offset_x + self.spacing_x * 0.1 + peg_d / 2
+        self.peg_y = row * self.spacing_y + self.spacing_y * 0.8 + peg_d / 2
+        self.peg_r = np.full(len(row), peg_d / 2)
+        self.peg_row = row
+        self.peg_positions = list(zip(self.peg_x.tolist(), self.peg_y.tolist(), self.peg_r.tolist()))
+        self.slot_width = geometry.slot_width(board_width)
+        self.slot_height = geometry.slot_height(board_height)
+        self.slot_x = np.arange(geometry.slots) * self.slot_width + self.slot_width * 0.1
+        self.slot_y = board_height - self.slot_height * 1.2
+        self.landing_y = self.slot_y
+        self.chip_d = geometry.chip_diameter(board_width)
+
+def load_geometry(path=DEFAULT_CONFIG):
+    """Reads a geometry config; a missing file means the classic board, a malformed one raises ValueError."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return DEFAULT_GEOMETRY
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path}: {e}") from None
+    return BoardGeometry.from_dict(data)
+
+# The classic 8 x 10 board with 10 slots
+DEFAULT_GEOMETRY = BoardGeometry()
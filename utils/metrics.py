@@ -0,0 +1,123 @@
+"""
+Per-frame instrumentation for PlinkoBoard.
+
+Timings are kept in a fixed-size ring buffer (one row per frame), so memory is constant and
+percentiles cover the last `capacity` frames. One-off costs that are not per-frame (board
+rebuilds, trajectory precomputes) are tracked as events with count/total/max.
+
+The board only touches this when metrics are enabled; with board.metrics = None every hook
+is a single attribute check.
+"""
+import os
+import numpy as np
+
+COLUMNS = ("frame", "physics", "sound", "scene", "paint", "jitter", "chips")
+PAINT = COLUMNS.index("paint")
+
+class FrameMetrics:
+    """
+    Ring buffer of per-frame timings in seconds.
+    - frame: time since the previous frame tick
+    - physics: fixed-timestep physics steps run this tick (excluding sound)
+    - sound: QSoundEffect.play() calls made from the tick
+    - scene: moving chip items to their interpolated positions
+    - paint: viewport repaint, attributed to the most recent frame
+    - jitter: frame minus the timer's nominal interval (positive = late)
+    - chips: chips in flight after the tick
+    """
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, len(COLUMNS)))
+        self.count = 0
+        self.current = dict.fromkeys(COLUMNS, 0.0)
+        self.events = {}
+
+    def begin_frame(self, frame_time, nominal):
+        self.current = dict.fromkeys(COLUMNS, 0.0)
+        self.current["frame"] = frame_time
+        self.current["jitter"] = frame_time - nominal
+
+    def add(self, column, seconds):
+        self.current[column] += seconds
+
+    def end_frame(self, chips):
+        self.current["chips"] = chips
+        self.data[self.count % self.capacity] = [self.current[c] for c in COLUMNS]
+        self.count += 1
+
+    def add_paint(self, seconds):
+        # Repaints happen after the tick that moved the items
+        if self.count:
+            self.data[(self.count - 1) % self.capacity, PAINT] += seconds
+
+    def record_event(self, name, seconds):
+        count, total, worst, _ = self.events.get(name, (0, 0.0, 0.0, 0.0))
+        self.events[name] = (count + 1, total + seconds, max(worst, seconds), seconds)
+
+    def window(self):
+        if self.count < self.capacity:
+            return self.data[:self.count]
+        return self.data
+
+    def latest(self, column):
+        if not self.count:
+            return 0.0
+        return float(self.data[(self.count - 1) % self.capacity, COLUMNS.index(column)])
+
+    def percentiles(self, column, qs=(50, 99)):
+        rows = self.window()
+        if not len(rows):
+            return [0.0] * len(qs)
+        return np.percentile(rows[:, COLUMNS.index(column)], qs).tolist()
+
+    def summary(self):
+        rows = self.window()
+        result = {"frames": self.count, "window": len(rows)}
+        for column in COLUMNS:
+            p50, p99 = self.percentiles(column)
+            result[column] = {"p50": p50, "p99": p99, "max": float(rows[:, COLUMNS.index(column)].max()) if len(rows) else 0.0}
+        result["events"] = {name: {"count": c, "total": t, "max": m, "last": l} for name, (c, t, m, l) in self.events.items()}
+        return result
+
+    def overlay_text(self):
+        ms = lambda column: "{:.1f}/{:.1f}".format(*(v * 1000 for v in self.percentiles(column)))
+        chips = int(self.latest("chips"))
+        lines = [
+            f"frame  p50/p99 {ms('frame')} ms",
+            f"physics {ms('physics')}  sound {ms('sound')}",
+            f"scene  {ms('scene')}  paint {ms('paint')}",
+            f"jitter {ms('jitter')}  chips {chips}",
+        ]
+        if "init_board" in self.events:
+            lines.append(f"init_board last {self.events['init_board'][3] * 1000:.1f} ms")
+        return "\n".join(lines)
+
+    def prometheus_text(self, prefix="plinko"):
+        # Prometheus text exposition format (also readable by node_exporter's textfile collector)
+        rows = self.window()
+        out = [f"# HELP {prefix}_frames_total Frames recorded since metrics were enabled.",
+               f"# TYPE {prefix}_frames_total counter",
+               f"{prefix}_frames_total {self.count}"]
+        for column in COLUMNS:
+            if column == "chips":
+                continue
+            name = f"{prefix}_{column}_seconds"
+            out.append(f"# TYPE {name} summary")
+            for q, value in zip(("0.5", "0.99"), self.percentiles(column)):
+                out.append(f'{name}{{quantile="{q}"}} {value:.6f}')
+            values = rows[:, COLUMNS.index(column)]
+            out.append(f"{name}_sum {values.sum():.6f}")
+            out.append(f"{name}_count {len(values)}")
+        out += [f"# TYPE {prefix}_chips_in_flight gauge", f"{prefix}_chips_in_flight {int(self.latest('chips'))}"]
+        for name, (count, total, worst, _) in sorted(self.events.items()):
+            metric = f"{prefix}_{name}_seconds"
+            out += [f"# TYPE {metric} summary", f"{metric}_sum {total:.6f}", f"{metric}_count {count}",
+                    f"# TYPE {metric}_max gauge", f"{metric}_max {worst:.6f}"]
+        return "\n".join(out) + "\n"
+
+    def write(self, path):
+        # Atomic replace so scrapers never read a half-written file
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
@@ -0,0 +1,157 @@
+"""
+Monte Carlo payout analyzer: drops many chips headlessly across a process pool and reports
+how often each reward slot is hit, with confidence intervals and throughput per worker count.
+
+Usage:
+    python -m utils.montecarlo --drops 1000000 --workers 1,2,4 --csv odds.csv
+    python main.py simulate --drops 1000000
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import numpy as np
+from utils.batch_physics import BatchPlinkoPhysics
+from utils.geometry import COLLISION_MODES, DEFAULT_CONFIG, DEFAULT_GEOMETRY, BoardGeometry, load_geometry
+
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "rewards_template.json")
+# Viewport of the default 720x1280 PlinkoBoard
+DEFAULT_WIDTH = 718
+DEFAULT_HEIGHT = 1278
+TASK_SIZE = 50000
+
+def load_reward_labels(path=DEFAULT_TEMPLATE):
+    # Plain label lists and rich templates (colours, payouts) both work; only the labels matter here
+    from utils.reward_template import load_template
+    return load_template(path).labels
+
+def wilson_interval(hits, total, confidence=0.95):
+    # Wilson score interval for a binomial proportion
+    if total == 0:
+        return 0.0, 0.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = hits / total
+    denom = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denom
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denom
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def _run_task(task):
+    # One independent RNG stream per task; returns [missed, slot0, slot1, ...] counts
+    seed_seq, n, width, height, n_slots, release_x, geometry = task
+    chip_d = geometry.chip_diameter(width)
+    engine = BatchPlinkoPhysics(geometry.layout(width, height).peg_positions, height, width, n_slots=n_slots,
+                                geometry=geometry)
+    generator = np.random.default_rng(seed_seq)
+    if release_x is None:
+        release = generator.uniform(0, width - chip_d, n)
+    else:
+        release = release_x
+    slots = engine.simulate(n, release, chip_d, seed=generator)
+    return np.bincount(slots + 1, minlength=n_slots + 1)
+
+def run_simulation(drops, workers, reward_labels, seed=0, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT,
+                   release_x=None, task_size=TASK_SIZE, geometry=DEFAULT_GEOMETRY):
+    """
+    Simulates `drops` chips using `workers` processes and returns (counts, elapsed_seconds).
+    Drops are split into fixed-size tasks, each seeded from its own SeedSequence child, so the
+    histogram for a given seed is identical whatever the worker count.
+    """
+    n_tasks = max(1, math.ceil(drops / task_size))
+    children = np.random.SeedSequence(seed).spawn(n_tasks)
+    tasks = []
+    for i, child in enumerate(children):
+        n = min(task_size, drops - i * task_size)
+        tasks.append((child, n, width, height, len(reward_labels), release_x, geometry))
+    start = time.perf_counter()
+    if workers <= 1:
+        results = [_run_task(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_task, tasks))
+    elapsed = time.perf_counter() - start
+    return np.sum(results, axis=0), elapsed
+
+def _odds(hits, total, confidence):
+    low, high = wilson_interval(hits, total, confidence)
+    return {"count": hits, "probability": hits / total if total else 0.0, "ci_low": low, "ci_high": high}
+
+def build_report(counts, reward_labels, confidence=0.95):
+    total = int(counts.sum())
+    slots = []
+    rewards = {}
+    for i, label in enumerate(reward_labels):
+        hits = int(counts[i + 1])
+        slots.append({"slot": i, "label": label, **_odds(hits, total, confidence)})
+        # Labels can repeat across slots; the per-reward view sums them
+        rewards[label] = rewards.get(label, 0) + hits
+    return {
+        "drops": total,
+        "confidence": confidence,
+        "missed": int(counts[0]),
+        "slots": slots,
+        "rewards": {label: _odds(hits, total, confidence) for label, hits in rewards.items()},
+    }
+
+def write_csv(report, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["slot", "label", "count", "probability", "ci_low", "ci_high"])
+        for s in report["slots"]:
+            writer.writerow([s["slot"], s["label"], s["count"], s["probability"], s["ci_low"], s["ci_high"]])
+    root, ext = os.path.splitext(path)
+    with open(f"{root}_throughput{ext or '.csv'}", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["workers", "drops", "seconds", "drops_per_sec"])
+        for run in report["throughput"]:
+            writer.writerow([run["workers"], run["drops"], run["seconds"], run["drops_per_sec"]])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo payout odds for the Plinko board.")
+    parser.add_argument("--drops", type=int, default=1000000)
+    parser.add_argument("--workers", default=str(os.cpu_count() or 1),
+                        help="Worker count, or a comma-separated list to compare throughput (e.g. 1,2,4)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE)
+    parser.add_argument("--geometry", default=DEFAULT_CONFIG, help="Board geometry config (rows, cols, slots)")
+    parser.add_argument("--collision", choices=COLLISION_MODES, help="Override the geometry's collision mode")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH)
+    parser.add_argument("--height", type=int, default=DEFAULT_HEIGHT)
+    parser.add_argument("--release-x", type=float, default=None,
+                        help="Fixed release x; default is uniform across the top of the board")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--csv", help="Also write the slot histogram (and <name>_throughput) as CSV")
+    args = parser.parse_args(argv)
+
+    reward_labels = load_reward_labels(args.template)
+    geometry = load_geometry(args.geometry)
+    if args.collision:
+        geometry = BoardGeometry(geometry.rows, geometry.cols, geometry.slots, args.collision)
+    throughput = []
+    counts = None
+    for workers in [int(w) for w in args.workers.split(",")]:
+        counts, elapsed = run_simulation(args.drops, workers, reward_labels, seed=args.seed, width=args.width,
+                                         height=args.height, release_x=args.release_x, geometry=geometry)
+        throughput.append({"workers": workers, "drops": args.drops, "seconds": elapsed,
+                           "drops_per_sec": args.drops / elapsed if elapsed else 0.0})
+    report = build_report(counts, reward_labels, args.confidence)
+    report.update({"seed": args.seed, "width": args.width, "height": args.height, "geometry": geometry.to_dict(),
+                   "release_x": args.release_x, "throughput": throughput})
+    if args.csv:
+        write_csv(report, args.csv)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,154 @@
+import math
 import random
+from utils.geometry import DEFAULT_GEOMETRY, BoardGeometry
+
+_entropy = random.SystemRandom()
+# Bounces one swept step may resolve; any motion left after that is not tested again this step
+MAX_HITS_PER_STEP = 4
+
+def new_seed():
+    # Fresh 32-bit drop seed from OS entropy (never from shared global random state)
+    return _entropy.getrandbits(32)
+
+def board_peg_positions(board_width, board_height, rows=8, cols=10):
+    # Peg centers and radii for the staggered lattice PlinkoBoard draws: [(x, y, r), ...]
+    return BoardGeometry(rows, cols).layout(board_width, board_height).peg_positions
+
+def landing_y(board_height, geometry=DEFAULT_GEOMETRY):
+    # Top edge of the reward slots; a chip at or below this has landed
+    return geometry.landing_y(board_height)
+
+def landing_slot(chip_x, chip_d, board_width, n_slots, geometry=DEFAULT_GEOMETRY):
+    # Slot index under the chip center (same rule as PlinkoBoard.resolve_chip), or -1 if it missed
+    slot_width = geometry.slot_width(board_width)
+    slot_index = int((chip_x + chip_d / 2 - slot_width * 0.1) // slot_width)
+    return slot_index if 0 <= slot_index < min(n_slots, geometry.slots) else -1
+
+def simulate_drop(physics, release_x, chip_d, n_slots=10, max_steps=None, chip_y=0, path=None):
+    """
+    Runs one drop to completion without any GUI, stepping exactly like the board's timer loop.
+    If max_steps is None it is drawn from the physics RNG (3-10 seconds at 60 FPS).
+    If `path` is a list, (x, y, hit_peg) is appended to it for every step.
+    Returns (slot_index, final_x, final_y).
+    """
+    if max_steps is None:
+        max_steps = physics.rng.randint(180, 600)
+    floor_y = landing_y(physics.board_height, physics.geometry)
+    chip_x = release_x
+    step = 0
+    while True:
+        step += 1
+        chip_x, chip_y, hit_peg, _ = physics.next_bounce(chip_x, chip_y, chip_d, step, max_steps)
+        if path is not None:
+            path.append((chip_x, chip_y, hit_peg))
+        if chip_y >= floor_y or step >= max_steps:
+            break
+    return landing_slot(chip_x, chip_d, physics.board_width, n_slots, physics.geometry), chip_x, chip_y
+
+def contact_time(sx, sy, dx, dy, px, py, reach):
+    """
+    Fraction of the move (sx, sy) -> (sx + dx, sy + dy) at which a chip center first comes within
+    `reach` of (px, py). 0.0 if it starts that close and is moving closer; None if it never gets there.
+    BatchPlinkoPhysics does the same arithmetic in the same order, so both engines agree exactly.
+    """
+    fx = sx - px
+    fy = sy - py
+    b = fx * dx + fy * dy
+    if b >= 0:
+        return None
+    c = fx * fx + fy * fy - reach * reach
+    if c <= 0:
+        return 0.0
+    disc = b * b - (dx * dx + dy * dy) * c
+    if disc < 0:
+        return None
+    # Smaller root of the circle/segment quadratic, in the form that doesn't lose precision
+    t = c / (math.sqrt(disc) - b)
+    return t if t <= 1 else None
+
+class PegIndex:
+    """
+    Uniform-grid bucketing of peg positions for fast collision lookup:
+    - Built once per board layout (pegs never move between drops).
+    - For each chip size, every grid cell lists the pegs that could touch a chip centered in it,
+      so a lookup is one dict access instead of a scan over every peg.
+    - Candidate lists keep the original peg order, so hits match a full scan exactly.
+    """
+    def __init__(self, peg_positions, row_height, cell_size=None):
+        self.peg_positions = list(peg_positions)
+        self.row_height = row_height
+        self.rows = [int(py // row_height) for _, py, _ in self.peg_positions]
+        max_r = max((pr for _, _, pr in self.peg_positions), default=1)
+        self.cell_size = cell_size or max(4 * max_r, 1.0)
+        self._cells_by_radius = {}
+
+    def cells(self, chip_r):
+        # {(col, row): [peg indices]} for chips of radius chip_r, built lazily and cached
+        cells = self._cells_by_radius.get(chip_r)
+        if cells is None:
+            cells = {}
+            cs = self.cell_size
+            for idx, (px, py, pr) in enumerate(self.peg_positions):
+                reach = pr + chip_r
+                for i in range(math.floor((px - reach) / cs), math.floor((px + reach) / cs) + 1):
+                    for j in range(math.floor((py - reach) / cs), math.floor((py + reach) / cs) + 1):
+                        cells.setdefault((i, j), []).append(idx)
+            self._cells_by_radius[chip_r] = cells
+        return cells
+
+    def candidates(self, cx, cy, chip_r):
+        cs = self.cell_size
+        return self.cells(chip_r).get((math.floor(cx / cs), math.floor(cy / cs)), ())
+
+    def first_hit(self, cx, cy, chip_r, skip_row=None):
+        # Index of the first peg (in layout order) overlapping the chip and not in skip_row, or -1
+        positions = self.peg_positions
+        rows = self.rows
+        for idx in self.candidates(cx, cy, chip_r):
+            if rows[idx] == skip_row:
+                continue
+            px, py, pr = positions[idx]
+            dx = cx - px
+            dy = cy - py
+            reach = pr + chip_r
+            if dx * dx + dy * dy >= reach * reach * 1.000001:
+                continue
+            # Confirm near-boundary contacts with the original sqrt test so replays stay identical
+            if (dx ** 2 + dy ** 2) ** 0.5 < reach:
+                return idx
+        return -1
+
+    def swept_candidates(self, sx, sy, ex, ey, chip_r):
+        """
+        Pegs that could touch a chip whose center moves from (sx, sy) to (ex, ey).
+        The segment is sampled at most one cell apart and looked up with a half-cell wider reach,
+        so every point on it is covered and the cost grows with its length, not its area.
+        """
+        cs = self.cell_size
+        cells = self.cells(chip_r + cs / 2)
+        n = max(1, math.ceil(math.hypot(ex - sx, ey - sy) / cs))
+        found = set()
+        for i in range(n + 1):
+            x = sx + (ex - sx) * i / n
+            y = sy + (ey - sy) * i / n
+            found.update(cells.get((math.floor(x / cs), math.floor(y / cs)), ()))
+        return found
+
+    def first_contact(self, sx, sy, ex, ey, chip_r, skip=-1):
+        # (index, t) of the first peg other than `skip` the moving chip reaches, t being the fraction of
+        # the move; ties go to the earlier peg in layout order. (-1, None) if it reaches none
+        positions = self.peg_positions
+        dx = ex - sx
+        dy = ey - sy
+        best, best_t = -1, None
+        for idx in self.swept_candidates(sx, sy, ex, ey, chip_r):
+            if idx == skip:
+                continue
+            px, py, pr = positions[idx]
+            t = contact_time(sx, sy, dx, dy, px, py, pr + chip_r)
+            if t is not None and (best < 0 or t < best_t or (t == best_t and idx < best)):
+                best, best_t = idx, t
+        return best, best_t
 
 class PlinkoPhysics:
     """
@@ -7,65 +157,116 @@ class PlinkoPhysics:
     - The chip's fall time is randomized (3-10 seconds) based on bounces and peg hits.
     - Spin and angle bias add human-like unpredictability.
     - Chip is always clamped within board bounds and nudged toward center if near edge.
+    - Peg lookups go through a PegIndex, so each step only tests pegs near the chip.
+    - `geometry` (a BoardGeometry) sets the row height and scales bounces down on dense boards.
+    - With geometry.collision == "swept" each step's motion is swept against the pegs instead of
+      testing only where the chip ends up (see next_bounce_swept).
+    - Each instance owns its generator: `rng` if given, else random.Random(seed). Without a seed
+      one is drawn from OS entropy and kept in `self.seed`, so any run can be reproduced.
     """
-    def __init__(self, pegs, peg_positions, board_height, board_width=None):
+    def __init__(self, pegs, peg_positions, board_height, board_width=None, peg_index=None, rng=None, seed=None,
+                 geometry=DEFAULT_GEOMETRY):
         self.pegs = pegs
         self.peg_positions = peg_positions
         self.board_height = board_height
         self.board_width = board_width or 720  # Default width if not provided
+        self.geometry = geometry
+        self.peg_index = peg_index or PegIndex(peg_positions, geometry.row_spacing(board_height))
+        if rng is None:
+            if seed is None:
+                seed = new_seed()
+            rng = random.Random(seed)
+        self.seed = seed
+        self.rng = rng
         self.reset()
 
     def reset(self):
         self.vy = 0
-        self.target_steps = random.randint(180, 600)  # 3-10 seconds at 60 FPS
+        self.target_steps = self.rng.randint(180, 600)  # 3-10 seconds at 60 FPS
         # Gravity is set so that sum(gravity * n for n in 1..target_steps) ~= board_height
         # Use formula for sum of arithmetic series: S = n/2 * (first + last)
         # Approximate: gravity * (target_steps^2 / 2) = board_height
         gravity = (2 * self.board_height) / (self.target_steps ** 2)
         self.gravity = min(max(gravity, 0.15), 1.5)  # Cap gravity between 0.15 and 1.5
-        self.bounce_energy = random.uniform(0.5, 1.2)  # Higher up-bounce energy
-        self.spin = random.uniform(-2, 2)
-        self.angle_bias = random.uniform(-3, 3)
+        self.bounce_energy = self.rng.uniform(0.5, 1.2)  # Higher up-bounce energy
+        self.spin = self.rng.uniform(-2, 2)
+        self.angle_bias = self.rng.uniform(-3, 3)
         self.last_hit_row = -1
 
     def next_bounce(self, chip_x, chip_y, chip_d, step, max_steps):
         # Returns (new_x, new_y, hit_peg, vy)
+        if self.geometry.collision == "swept":
+            return self.next_bounce_swept(chip_x, chip_y, chip_d, step, max_steps)
         hit_peg = False
-        up_bounce = 0
-        for idx, (px, py, pr) in enumerate(self.peg_positions):
-            dist = ((chip_x + chip_d/2 - px)**2 + (chip_y + chip_d/2 - py)**2)**0.5
-            if dist < pr + chip_d/2:
-                # Only bounce if not the same row as last hit (prevents multi-bounce on same peg)
-                row = int(py // (self.board_height / 12))
-                if row != self.last_hit_row:
-                    direction = random.choice([-1, 1])
-                    bias = self.angle_bias + self.spin * random.uniform(-0.5, 0.5)
-                    dx = direction * random.uniform(18, 32) + bias
-                    chip_x += dx
-                    # Clamp chip_x within board bounds after bounce
-                    chip_x = max(0, min(chip_x, self.board_width - chip_d))
-                    # Nudge toward center if near edge
-                    if chip_x < chip_d:
-                        chip_x += chip_d * 0.5
-                    elif chip_x > self.board_width - 2 * chip_d:
-                        chip_x -= chip_d * 0.5
-                    # Strong up bounce, energy decays with each hit
-                    up_bounce = -random.uniform(18, 40) * self.bounce_energy
-                    self.vy = up_bounce
-                    self.last_hit_row = row
-                    hit_peg = True
-                    break
+        # Only bounce if not the same row as last hit (prevents multi-bounce on same peg)
+        idx = self.peg_index.first_hit(chip_x + chip_d/2, chip_y + chip_d/2, chip_d/2, self.last_hit_row)
+        if idx >= 0:
+            dx, up_bounce = self.bounce_draws()
+            chip_x = self.clamp_x(chip_x + dx, chip_d)
+            self.vy = up_bounce
+            self.last_hit_row = self.peg_index.rows[idx]
+            hit_peg = True
         # Gravity always pulls down
         self.vy += self.gravity
         chip_y += self.vy
-        # Clamp chip_x within board bounds after gravity
+        chip_x = self.clamp_x(chip_x, chip_d)
+        # Slow down as chip nears the bottom (simulate air resistance)
+        if step > max_steps * 0.7:
+            self.vy *= 0.98
+        return chip_x, chip_y, hit_peg, self.vy
+
+    def next_bounce_swept(self, chip_x, chip_y, chip_d, step, max_steps):
+        """
+        Continuous-collision step: the chip center is swept along this step's motion and bounces off
+        the first peg it reaches, wherever along the way that is. The rest of the step continues from
+        the contact point on the new heading, so one step can bounce off several pegs (at most
+        MAX_HITS_PER_STEP). A peg is hit when the chip moves into it, so no last_hit_row is needed.
+        """
+        r = chip_d / 2
+        self.vy += self.gravity
+        sx = chip_x + r
+        sy = chip_y + r
+        ex = sx
+        ey = sy + self.vy
+        rest = 1.0
+        hits = 0
+        idx = -1
+        while hits < MAX_HITS_PER_STEP:
+            idx, t = self.peg_index.first_contact(sx, sy, ex, ey, r, idx)
+            if idx < 0:
+                break
+            dx, up_bounce = self.bounce_draws()
+            sx += (ex - sx) * t
+            sy += (ey - sy) * t
+            # Bounce away from the peg: up off its top half, down off its underside
+            self.vy = up_bounce if sy <= self.peg_index.peg_positions[idx][1] else -up_bounce
+            rest *= 1 - t
+            ex = self.clamp_x(sx - r + dx, chip_d) + r
+            ey = sy + self.vy * rest
+            hits += 1
+        if hits:
+            chip_x = ex - r
+            chip_y = ey - r
+        else:
+            chip_y += self.vy
+        chip_x = self.clamp_x(chip_x, chip_d)
+        if step > max_steps * 0.7:
+            self.vy *= 0.98
+        return chip_x, chip_y, hits > 0, self.vy
+
+    def bounce_draws(self):
+        # (sideways kick, up-bounce velocity) for one peg hit; the RNG order is part of every replay
+        direction = self.rng.choice([-1, 1])
+        bias = self.angle_bias + self.spin * self.rng.uniform(-0.5, 0.5)
+        dx = direction * (self.rng.uniform(18, 32) * self.geometry.kick_scale) + bias
+        # Strong up bounce, energy decays with each hit
+        return dx, -(self.rng.uniform(18, 40) * self.geometry.bounce_scale) * self.bounce_energy
+
+    def clamp_x(self, chip_x, chip_d):
+        # Clamp chip_x within board bounds, then nudge toward center if near an edge
         chip_x = max(0, min(chip_x, self.board_width - chip_d))
-        # Nudge toward center if near edge
         if chip_x < chip_d:
             chip_x += chip_d * 0.5
         elif chip_x > self.board_width - 2 * chip_d:
             chip_x -= chip_d * 0.5
-        # Slow down as chip nears the bottom (simulate air resistance)
-        if step > max_steps * 0.7:
-            self.vy *= 0.98
-        return chip_x, chip_y, hit_peg, self.vy 
\ No newline at end of file
+        return chip_x
@@ -0,0 +1,139 @@
+"""
+Landing odds per release position: "where should I drop to hit Vault Key?"
+
+The top row is split into equal release-x buckets and a batch of chips is simulated from each,
+giving a (buckets x slots) probability table for one board geometry. Tables are saved to disk
+under a hash of the geometry, so each board size is only simulated once; reading one is a
+single index computation.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+from utils.batch_physics import BatchPlinkoPhysics
+from utils.geometry import DEFAULT_GEOMETRY
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "plinko_odds")
+# Bump whenever the physics changes, so maps saved by older code are recomputed
+PHYSICS_VERSION = 2
+
+def geometry_key(width, height, chip_d, n_slots, buckets, drops_per_bucket, geometry=DEFAULT_GEOMETRY):
+    # Whole geometry, collision mode included: swept and discrete boards land chips differently
+    text = json.dumps([PHYSICS_VERSION, width, height, round(chip_d, 4), n_slots, buckets, drops_per_bucket,
+                       geometry.to_dict()])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+class ProbabilityMap:
+    """
+    Slot distribution for chips released in each top-row bucket.
+    - probabilities[b, s + 1]: chance a chip released in bucket b lands in slot s (column 0 = missed)
+    - release x runs from 0 to max_x (chip left edge, as in PlinkoBoard), split into equal buckets
+    """
+    def __init__(self, key, probabilities, max_x, drops_per_bucket):
+        self.key = key
+        self.probabilities = probabilities
+        self.max_x = max_x
+        self.drops_per_bucket = drops_per_bucket
+        self.buckets = len(probabilities)
+        self.n_slots = probabilities.shape[1] - 1
+        self.bucket_width = max_x / self.buckets
+
+    def bucket(self, release_x):
+        return min(max(int(release_x / self.bucket_width), 0), self.buckets - 1) if self.bucket_width > 0 else 0
+
+    def lookup(self, release_x):
+        # Slot probabilities (index 0 = missed) for a release at release_x
+        return self.probabilities[self.bucket(release_x)]
+
+    def slot_chance(self, release_x, slot):
+        return float(self.probabilities[self.bucket(release_x), slot + 1])
+
+    def bucket_center(self, bucket):
+        return (bucket + 0.5) * self.bucket_width
+
+    def best_release(self, slot):
+        # (release x, probability) of the bucket most likely to land in `slot`
+        b = int(np.argmax(self.probabilities[:, slot + 1]))
+        return self.bucket_center(b), float(self.probabilities[b, slot + 1])
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, probabilities=self.probabilities, max_x=self.max_x, drops_per_bucket=self.drops_per_bucket)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, key, path):
+        with np.load(path) as data:
+            return cls(key, data["probabilities"], float(data["max_x"]), int(data["drops_per_bucket"]))
+
+def compute_probability_map(width, height, chip_d, n_slots, buckets=64, drops_per_bucket=2000, seed=0,
+                            geometry=DEFAULT_GEOMETRY):
+    """Simulates drops_per_bucket chips from random points inside every bucket."""
+    peg_positions = geometry.layout(width, height).peg_positions
+    engine = BatchPlinkoPhysics(peg_positions, height, width, n_slots, geometry=geometry)
+    max_x = width - chip_d
+    generator = np.random.default_rng(seed)
+    bucket = np.repeat(np.arange(buckets), drops_per_bucket)
+    release = (bucket + generator.random(bucket.size)) * (max_x / buckets)
+    slots = engine.simulate(bucket.size, release, chip_d, seed=generator)
+    counts = np.bincount(bucket * (n_slots + 1) + slots + 1, minlength=buckets * (n_slots + 1))
+    probabilities = counts.reshape(buckets, n_slots + 1) / drops_per_bucket
+    key = geometry_key(width, height, chip_d, n_slots, buckets, drops_per_bucket, geometry)
+    return ProbabilityMap(key, probabilities, max_x, drops_per_bucket)
+
+def load_or_compute(width, height, chip_d, n_slots, buckets=64, drops_per_bucket=2000, cache_dir=CACHE_DIR,
+                    geometry=DEFAULT_GEOMETRY):
+    key = geometry_key(width, height, chip_d, n_slots, buckets, drops_per_bucket, geometry)
+    path = os.path.join(cache_dir, f"odds_{key}.npz")
+    try:
+        pmap = ProbabilityMap.load(key, path)
+        if pmap.probabilities.shape == (buckets, n_slots + 1):
+            return pmap
+    except (OSError, ValueError, KeyError):
+        pass
+    pmap = compute_probability_map(width, height, chip_d, n_slots, buckets, drops_per_bucket, geometry=geometry)
+    try:
+        pmap.save(path)
+    except OSError:
+        pass  # Still usable this session, just recomputed next time
+    return pmap
+
+class ProbabilityMapLoader(QObject):
+    """
+    Loads or computes maps on one background thread and hands them back through `ready`
+    (queued onto the GUI thread). Results for a geometry that was replaced meanwhile are dropped.
+    """
+    ready = Signal(object)
+
+    def __init__(self, buckets=64, drops_per_bucket=2000, cache_dir=CACHE_DIR, parent=None):
+        super().__init__(parent)
+        self.buckets = buckets
+        self.drops_per_bucket = drops_per_bucket
+        self.cache_dir = cache_dir
+        self.pending_key = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="odds")
+
+    def request(self, width, height, chip_d, n_slots, geometry=DEFAULT_GEOMETRY):
+        key = geometry_key(width, height, chip_d, n_slots, self.buckets, self.drops_per_bucket, geometry)
+        if key == self.pending_key:
+            return key
+        self.pending_key = key
+        future = self._executor.submit(load_or_compute, width, height, chip_d, n_slots,
+                                       self.buckets, self.drops_per_bucket, self.cache_dir, geometry)
+        future.add_done_callback(self._done)
+        return key
+
+    def _done(self, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        pmap = future.result()
+        if pmap.key == self.pending_key:
+            self.ready.emit(pmap)
+
+    def shutdown(self):
+        self.pending_key = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,204 @@
+"""
+Append-only binary log of every drop, for settling disputed giveaways.
+
+Each drop is one fixed 64-byte little-endian record holding everything needed to re-run it
+(seed, release point, board geometry), plus a hash of the reward template and the slot it
+landed in. Fixed-size records mean the file is a flat array: it is memory-mapped and filtered
+with NumPy, so searching millions of drops never parses text.
+
+    offset  field          type
+    0       drop_id        u64   sequential, so records can be binary-searched by id
+    8       timestamp      f64   unix seconds
+    16      seed           u64
+    24      release_x      f64
+    32      release_y      f32
+    36      chip_d         f32
+    40      width, height  u16 x2   viewport size the drop ran at
+    44      n_slots        u16
+    46      slot           i16   -1 = missed
+    48      template_hash  u64   see template_hash()
+    56      peg_rows       u8
+    57      peg_cols       u8
+    58      slot_columns   u8    0 in logs written before boards were configurable = 10
+    59      collision      u8    index into COLLISION_MODES; 0 ("discrete") in older logs
+    60      (padding to 64)
+
+Usage:
+    python -m utils.replay_log logs/drops.replay --last 20
+    python -m utils.replay_log logs/drops.replay --seed 1234 --verify
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import numpy as np
+from utils.geometry import COLLISION_MODES, DEFAULT_GEOMETRY, BoardGeometry
+
+MAGIC = b"PLNKRPL\0"
+VERSION = 1
+HEADER = struct.Struct("<8sHH4x")
+RECORD = struct.Struct("<QdQdffHHHhQBBBB4x")
+RECORD_DTYPE = np.dtype({
+    "names": ["drop_id", "timestamp", "seed", "release_x", "release_y", "chip_d", "width", "height",
+              "n_slots", "slot", "template_hash", "peg_rows", "peg_cols", "slot_columns",
+              "collision"],
+    "formats": ["<u8", "<f8", "<u8", "<f8", "<f4", "<f4", "<u2", "<u2", "<u2", "<i2", "<u8", "u1", "u1", "u1", "u1"],
+    "offsets": [0, 8, 16, 24, 32, 36, 40, 42, 44, 46, 48, 56, 57, 58, 59],
+    "itemsize": RECORD.size,
+})
+
+def template_hash(reward_labels):
+    # First 8 bytes of SHA-256 over the canonical JSON of the labels, as an unsigned int
+    text = json.dumps(list(reward_labels), ensure_ascii=False, separators=(",", ":"))
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+
+class ReplayLog:
+    """
+    Append-only replay log file.
+    - append() writes one record and flushes, so a crash loses at most the drop in progress
+    - records() memory-maps the file read-only; a torn trailing record is ignored
+    - opening for append truncates a torn trailing record, so later records stay aligned
+    - find() filters with vectorized NumPy masks; get() binary-searches by drop_id
+    """
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            self._file.flush()
+        else:
+            check_header(path)
+        self._count = record_count(path)
+        # Drop a partial record left by a crash mid-write; appending after it would misalign the rest
+        self._file.truncate(HEADER.size + self._count * RECORD.size)
+        self._map = None
+        self._map_count = -1
+
+    def append(self, seed, release_x, release_y, width, height, chip_d, n_slots, slot, template,
+               geometry=DEFAULT_GEOMETRY, timestamp=None):
+        drop_id = self._count
+        self._file.write(RECORD.pack(drop_id, time.time() if timestamp is None else timestamp, seed, release_x,
+                                     release_y, chip_d, width, height, n_slots, slot, template,
+                                     geometry.rows, geometry.cols, geometry.slots,
+                                     COLLISION_MODES.index(geometry.collision)))
+        self._file.flush()
+        self._count += 1
+        return drop_id
+
+    def __len__(self):
+        return self._count
+
+    def records(self):
+        # Remapped only when records were added since the last call
+        if self._map_count != self._count:
+            self._map = open_records(self.path)
+            self._map_count = self._count
+        return self._map
+
+    def find(self, **filters):
+        return find(self.records(), **filters)
+
+    def get(self, drop_id):
+        records = self.records()
+        i = np.searchsorted(records["drop_id"], drop_id)
+        if i < len(records) and records["drop_id"][i] == drop_id:
+            return records[i]
+        return None
+
+    def close(self):
+        self._file.close()
+        self._map = None
+
+def check_header(path):
+    with open(path, "rb") as f:
+        magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or record_size != RECORD.size:
+        raise ValueError(f"{path} is not a version {VERSION} Plinko replay log")
+    return version
+
+def record_count(path):
+    # Whole records only; a partly written last record (e.g. after a crash) doesn't count
+    return max(0, (os.path.getsize(path) - HEADER.size) // RECORD.size)
+
+def open_records(path):
+    check_header(path)
+    n = record_count(path)
+    if n == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(n,))
+
+def find(records, seed=None, slot=None, template=None, since=None, until=None):
+    """
+    Records matching every given filter (since/until are unix timestamps). The result is a
+    view for a single full match, otherwise a compact copy of just the hits.
+    """
+    mask = np.ones(len(records), dtype=bool)
+    if seed is not None:
+        mask &= records["seed"] == seed
+    if slot is not None:
+        mask &= records["slot"] == slot
+    if template is not None:
+        mask &= records["template_hash"] == template
+    if since is not None:
+        mask &= records["timestamp"] >= since
+    if until is not None:
+        mask &= records["timestamp"] < until
+    return records[mask]
+
+def replay_slot(record):
+    """Re-runs a logged drop headlessly and returns the slot it lands in."""
+    from utils.trajectory import board_geometry, compute_trajectory
+    width, height = int(record["width"]), int(record["height"])
+    shape = BoardGeometry(int(record["peg_rows"]), int(record["peg_cols"]), int(record["slot_columns"]) or 10,
+                          COLLISION_MODES[int(record["collision"])])
+    geometry = board_geometry(width, height, float(record["chip_d"]), int(record["n_slots"]), shape)
+    trajectory = compute_trajectory(int(record["seed"]), float(record["release_x"]), geometry,
+                                    chip_y=float(record["release_y"]))
+    return trajectory.slot
+
+def format_record(record):
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(float(record["timestamp"])))
+    return (f"#{int(record['drop_id'])} {stamp} seed={int(record['seed'])} x={float(record['release_x']):.2f} "
+            f"board={int(record['width'])}x{int(record['height'])} slots={int(record['n_slots'])} "
+            f"template={int(record['template_hash']):016x} slot={int(record['slot'])}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search and verify a Plinko drop replay log.")
+    parser.add_argument("log")
+    parser.add_argument("--id", type=int, help="Show one drop by id")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--slot", type=int)
+    parser.add_argument("--template", help="Reward template JSON; only drops made with these labels")
+    parser.add_argument("--last", type=int, default=20, help="Show at most this many of the newest matches")
+    parser.add_argument("--verify", action="store_true", help="Re-run each shown drop and check its slot")
+    args = parser.parse_args(argv)
+
+    records = open_records(args.log)
+    if args.id is not None:
+        i = np.searchsorted(records["drop_id"], args.id)
+        matches = records[i:i + 1] if i < len(records) and records["drop_id"][i] == args.id else records[:0]
+    else:
+        template = None
+        if args.template:
+            from utils.reward_template import load_template
+            template = template_hash(load_template(args.template).labels)
+        matches = find(records, seed=args.seed, slot=args.slot, template=template)
+    print(f"{len(matches)} of {len(records)} drops match", file=sys.stderr)
+    mismatches = 0
+    for record in matches[-args.last:]:
+        line = format_record(record)
+        if args.verify:
+            replayed = replay_slot(record)
+            mismatches += replayed != record["slot"]
+            line += " verified" if replayed == record["slot"] else f" MISMATCH (replay lands in {replayed})"
+        print(line)
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
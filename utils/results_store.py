@@ -0,0 +1,306 @@
+"""
+Persistent history of drop results in SQLite, for "what did Ann win this month?" and
+end-of-stream payout reconciliation.
+
+- The database runs in WAL mode, so queries never wait on the writer and the writer never
+  waits on queries.
+- record() only queues a row. A writer thread commits queued rows in batches (one transaction
+  per batch), so the GUI thread never touches the disk.
+- Indexes on (player, time), (label, time), (template, time) and time keep lookups
+  sub-millisecond. daily_tallies keeps per-day counts per reward, so tallies over any run of
+  days read a few rows whatever the history size.
+- Player names compare case-insensitively ("ann" finds "Ann").
+- export_csv / export_json stream matching rows without loading them all.
+
+Usage:
+    python main.py results --player Ann --since 2026-10-01
+    python main.py results --tallies --since 2026-10-01
+    python main.py results --since 2026-10-17 --export payouts.csv
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from utils.replay_log import template_hash
+
+COLUMNS = ("id", "timestamp", "player", "slot", "label", "seed", "template", "drop_id")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    player TEXT NOT NULL COLLATE NOCASE,
+    slot INTEGER NOT NULL,
+    label TEXT,
+    seed INTEGER,
+    template TEXT NOT NULL,
+    drop_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS results_player ON results (player, timestamp);
+CREATE INDEX IF NOT EXISTS results_label ON results (label, timestamp);
+CREATE INDEX IF NOT EXISTS results_template ON results (template, timestamp);
+CREATE INDEX IF NOT EXISTS results_time ON results (timestamp);
+CREATE TABLE IF NOT EXISTS daily_tallies (
+    day TEXT NOT NULL,
+    template TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    label TEXT,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, template, slot)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS templates (
+    template TEXT PRIMARY KEY,
+    labels TEXT NOT NULL
+);
+"""
+
+def template_key(reward_labels):
+    # Same hash as the replay log, as the hex text format_record prints
+    return f"{template_hash(reward_labels):016x}"
+
+def local_day(timestamp):
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+def parse_time(text):
+    # "YYYY-MM-DD" (local midnight), "YYYY-MM-DDTHH:MM[:SS]" or unix seconds
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.datetime.fromisoformat(text).timestamp()
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL: commits survive an app crash; only an OS crash can lose the last batch
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class ResultsStore:
+    """
+    Drop results database at `path`.
+    - record(result, reward_labels) queues one board result dict (see PlinkoBoard.result_ready)
+    - flush() waits until everything queued so far is committed
+    - results(), player_results(), tallies() and count() query what has been committed
+    """
+    def __init__(self, path, batch_size=500, batch_window=0.2):
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = connect(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+        self._templates = {}  # labels tuple -> template_key
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="results-store", daemon=True)
+        self._writer.start()
+
+    # --- writes ---
+    def record(self, result, reward_labels, timestamp=None):
+        labels = tuple(reward_labels)
+        template = self._templates.get(labels)
+        if template is None:
+            # First result with these labels: hash them once and store the template alongside
+            template = self._templates[labels] = template_key(labels)
+            self._queue.put(("template", template, json.dumps(labels, ensure_ascii=False)))
+        self._queue.put(("result", time.time() if timestamp is None else timestamp, result["player"],
+                         result["slot"], result.get("label"), result.get("seed"), template, result.get("drop_id")))
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            # Let a burst (e.g. a turbo batch) gather into one transaction
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            stop = any(item is None for item in batch)
+            items = [item for item in batch if item is not None]
+            try:
+                self._write(conn, items)
+            except sqlite3.Error as e:
+                # Keep the writer alive (and flush() returning) even if one batch can't be stored
+                print(f"Results store: could not write {len(items)} rows: {e}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def _write(self, conn, items):
+        rows = [item[1:] for item in items if item[0] == "result"]
+        tallies = {}
+        for timestamp, _, slot, label, _, template, _ in rows:
+            key = (local_day(timestamp), template, slot)
+            tallies[key] = (label, tallies.get(key, (label, 0))[1] + 1)
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO templates (template, labels) VALUES (?, ?)",
+                             [item[1:] for item in items if item[0] == "template"])
+            conn.executemany("INSERT INTO results (timestamp, player, slot, label, seed, template, drop_id) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("INSERT INTO daily_tallies (day, template, slot, label, count) VALUES (?, ?, ?, ?, ?) "
+                             "ON CONFLICT (day, template, slot) DO UPDATE SET count = count + excluded.count",
+                             [(day, template, slot, label, n) for (day, template, slot), (label, n) in tallies.items()])
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # --- queries (any thread; each gets its own read connection) ---
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def _where(self, player=None, label=None, template=None, since=None, until=None):
+        clauses, params = [], []
+        for column, value in (("player", player), ("label", label), ("template", template)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _select(self, **filters):
+        where, params = self._where(**filters)
+        return self._reader().execute(f"SELECT {', '.join(COLUMNS)} FROM results{where} ORDER BY timestamp, id", params)
+
+    def results(self, limit=None, **filters):
+        """
+        Matching results as dicts, oldest first; `limit` keeps only the newest that many.
+        Filters: player, label, template (template_key), since / until (unix seconds, until exclusive).
+        """
+        if limit is None:
+            rows = self._select(**filters).fetchall()
+        else:
+            where, params = self._where(**filters)
+            rows = self._reader().execute(f"SELECT {', '.join(COLUMNS)} FROM results{where} "
+                                          "ORDER BY timestamp DESC, id DESC LIMIT ?", params + [limit]).fetchall()
+            rows.reverse()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def player_results(self, player, since=None, until=None):
+        return self.results(player=player, since=since, until=until)
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        return self._reader().execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+
+    def tallies(self, first_day=None, last_day=None, template=None):
+        """
+        {label: count} over whole local days (dates or "YYYY-MM-DD", inclusive); missed drops
+        count under None. Served from daily_tallies, so the cost doesn't grow with history.
+        """
+        clauses, params = [], []
+        if first_day is not None:
+            clauses.append("day >= ?")
+            params.append(str(first_day))
+        if last_day is not None:
+            clauses.append("day <= ?")
+            params.append(str(last_day))
+        if template is not None:
+            clauses.append("template = ?")
+            params.append(template)
+        sql = "SELECT label, SUM(count) FROM daily_tallies"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " GROUP BY label ORDER BY SUM(count) DESC"
+        return dict(self._reader().execute(sql, params).fetchall())
+
+    def template_labels(self, template):
+        row = self._reader().execute("SELECT labels FROM templates WHERE template = ?", (template,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # --- export ---
+    def export_csv(self, stream, **filters):
+        writer = csv.writer(stream)
+        writer.writerow(COLUMNS)
+        n = 0
+        for row in self._select(**filters):
+            writer.writerow(row)
+            n += 1
+        return n
+
+    def export_json(self, stream, **filters):
+        # A JSON array written row by row
+        stream.write("[")
+        n = 0
+        for row in self._select(**filters):
+            stream.write(("," if n else "") + "\n" + json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False))
+            n += 1
+        stream.write("\n]\n" if n else "]\n")
+        return n
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query and export the Plinko results history.")
+    parser.add_argument("db")
+    parser.add_argument("--player")
+    parser.add_argument("--label", help="Reward label")
+    parser.add_argument("--template", help="Reward template JSON; only drops made with these labels")
+    parser.add_argument("--since", help="YYYY-MM-DD[THH:MM] (local) or unix seconds")
+    parser.add_argument("--until", help="Exclusive; same formats as --since")
+    parser.add_argument("--tallies", action="store_true", help="Per-reward counts over the days in range")
+    parser.add_argument("--export", metavar="FILE", help="Write matching rows to FILE (.csv or .json; '-' = CSV to stdout)")
+    parser.add_argument("--last", type=int, default=20, help="Show at most this many of the newest matches")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.db)
+    template = None
+    if args.template:
+        from utils.reward_template import load_template
+        template = template_key(load_template(args.template).labels)
+    since = parse_time(args.since) if args.since else None
+    until = parse_time(args.until) if args.until else None
+    try:
+        if args.tallies:
+            first = local_day(since) if since is not None else None
+            last = local_day(until - 1) if until is not None else None
+            for label, count in store.tallies(first, last, template).items():
+                print(f"{count:8d}  {label if label is not None else '(missed)'}")
+            return 0
+        filters = dict(player=args.player, label=args.label, template=template, since=since, until=until)
+        if args.export:
+            if args.export == "-":
+                n = store.export_csv(sys.stdout, **filters)
+            else:
+                with open(args.export, "w", newline="", encoding="utf-8") as f:
+                    export = store.export_json if args.export.endswith(".json") else store.export_csv
+                    n = export(f, **filters)
+            print(f"Exported {n} results", file=sys.stderr)
+            return 0
+        print(f"{store.count(**filters)} results match", file=sys.stderr)
+        for row in store.results(limit=args.last, **filters):
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["timestamp"]))
+            print(f"{stamp} {row['player']}: {row['label'] if row['label'] is not None else '(missed)'}")
+        return 0
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
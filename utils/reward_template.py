@@ -0,0 +1,187 @@
+"""
+Reward templates and live reloading.
+
+A template is either the classic list of labels:
+
+    ["+5 POGs", "+10 POGs", "Vault Key", ...]
+
+or an object whose slots can also carry a colour, a weight and a payout:
+
+    {"slots": [{"label": "Vault Key", "color": "#ffe600", "weight": 5, "payout": "1x Vault Key"},
+               "+5 POGs", ...]}
+
+- color: label colour on the board (any Qt colour name, e.g. "#39ff14" or "gold")
+- weight: relative value of the slot (non-negative number, default 1)
+- payout: free text handed out with the result, e.g. what a moderator should actually pay
+
+TemplateWatcher watches one template file and re-reads it whenever it changes. Reading and
+validating run on a worker thread; the parsed template comes back on the GUI thread, where
+PlinkoBoard.apply_template only touches the slots that changed.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+from PySide6.QtGui import QColor
+
+DEFAULT_COLOR = "#ffe600"
+
+class SlotReward:
+    __slots__ = ("label", "color", "weight", "payout")
+
+    def __init__(self, label, color=DEFAULT_COLOR, weight=1.0, payout=None):
+        self.label = label
+        self.color = color
+        self.weight = weight
+        self.payout = payout
+
+    def __eq__(self, other):
+        return isinstance(other, SlotReward) and self.to_dict() == other.to_dict()
+
+    def to_dict(self):
+        return {"label": self.label, "color": self.color, "weight": self.weight, "payout": self.payout}
+
+class RewardTemplate:
+    """Validated template: one SlotReward per slot, left to right."""
+    def __init__(self, slots):
+        self.slots = list(slots)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __eq__(self, other):
+        return isinstance(other, RewardTemplate) and self.slots == other.slots
+
+    @property
+    def labels(self):
+        return [slot.label for slot in self.slots]
+
+    def to_json(self):
+        return {"slots": [slot.to_dict() for slot in self.slots]}
+
+def parse_slot(i, entry):
+    if isinstance(entry, str):
+        entry = {"label": entry}
+    if not isinstance(entry, dict):
+        raise ValueError(f"slot {i + 1}: expected a label or an object")
+    unknown = set(entry) - set(SlotReward.__slots__)
+    if unknown:
+        raise ValueError(f"slot {i + 1}: unknown field(s) {', '.join(sorted(unknown))}")
+    label = entry.get("label")
+    if not isinstance(label, str) or not label.strip():
+        raise ValueError(f"slot {i + 1}: 'label' must be a non-empty string")
+    color = entry.get("color", DEFAULT_COLOR)
+    if not isinstance(color, str) or not QColor.isValidColorName(color):
+        raise ValueError(f"slot {i + 1}: {color!r} is not a colour")
+    weight = entry.get("weight", 1.0)
+    if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not weight >= 0:
+        raise ValueError(f"slot {i + 1}: 'weight' must be a non-negative number")
+    payout = entry.get("payout")
+    if payout is not None and not isinstance(payout, str):
+        raise ValueError(f"slot {i + 1}: 'payout' must be a string")
+    return SlotReward(label, color, float(weight), payout)
+
+def parse_template(data, slots=None):
+    """
+    RewardTemplate from decoded JSON, or ValueError naming the first problem.
+    If `slots` is given the template must have exactly that many slots.
+    """
+    if isinstance(data, dict):
+        unknown = set(data) - {"slots"}
+        if unknown:
+            raise ValueError(f"unknown template field(s) {', '.join(sorted(unknown))}")
+        data = data.get("slots")
+    if not isinstance(data, list) or not data:
+        raise ValueError("a template is a non-empty list of slots")
+    template = RewardTemplate(parse_slot(i, entry) for i, entry in enumerate(data))
+    if slots is not None and len(template) != slots:
+        raise ValueError(f"template has {len(template)} slots but the board has {slots}")
+    return template
+
+def load_template(path, slots=None):
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{os.path.basename(path)} is not valid JSON: {e}") from None
+    return parse_template(data, slots)
+
+class TemplateWatcher(QObject):
+    """
+    Re-reads `path` whenever it changes and emits `loaded(RewardTemplate)` or `failed(message)`.
+    - Bursts of change notifications (an editor's save, a script's rewrite) are coalesced for
+      `debounce_ms`, and a file whose content hasn't changed is not re-emitted.
+    - Editors that save by replacing the file drop it from the watch list; the parent directory
+      is watched too, so the new file is picked up again.
+    - A read still running when a newer change arrives has its result dropped.
+    """
+    loaded = Signal(object)
+    failed = Signal(str)
+    _parsed = Signal(int, object, object)  # (generation, template or None, error or None)
+
+    def __init__(self, path, slots=None, debounce_ms=100, parent=None):
+        super().__init__(parent)
+        self.path = os.path.abspath(path)
+        self.slots = slots
+        self.generation = 0
+        self._last_text = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="template")
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self.reload)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._changed)
+        self._watcher.directoryChanged.connect(self._changed)
+        self._watch()
+        # Emitted from the worker thread; queued onto this object's (GUI) thread
+        self._parsed.connect(self._deliver)
+
+    def _watch(self):
+        if os.path.exists(self.path) and self.path not in self._watcher.files():
+            self._watcher.addPath(self.path)
+        directory = os.path.dirname(self.path)
+        if directory not in self._watcher.directories():
+            self._watcher.addPath(directory)
+
+    def _changed(self, _path):
+        self._watch()
+        self._debounce.start()
+
+    def reload(self):
+        # Reads and validates the file in the background
+        self.generation += 1
+        generation = self.generation
+        self._executor.submit(self._read, generation)
+        return generation
+
+    def _read(self, generation):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+            if text == self._last_text:
+                return
+            self._last_text = text
+            try:
+                data = json.loads(text)
+            except ValueError as e:
+                raise ValueError(f"{os.path.basename(self.path)} is not valid JSON: {e}") from None
+            self._parsed.emit(generation, parse_template(data, self.slots), None)
+        except (OSError, ValueError) as e:
+            # A half-written file fails here; its final write triggers another read
+            self._last_text = None
+            self._parsed.emit(generation, None, str(e))
+
+    def _deliver(self, generation, template, error):
+        if generation != self.generation:
+            return
+        if template is not None:
+            self.loaded.emit(template)
+        else:
+            self.failed.emit(error)
+
+    def stop(self):
+        self._debounce.stop()
+        self._watcher.removePaths(self._watcher.files() + self._watcher.directories())
+        self.generation += 1
+        self._executor.shutdown(wait=False, cancel_futures=True)
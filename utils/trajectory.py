@@ -0,0 +1,82 @@
+import random
+from collections import OrderedDict
+import numpy as np
+from utils.physics import PlinkoPhysics, simulate_drop
+from utils.geometry import DEFAULT_GEOMETRY
+
+class Trajectory:
+    """
+    A whole drop computed up front: one (x, y, hit_peg) entry per animation frame plus the landing slot.
+    Replaying it costs no physics, and the same (seed, release_x, geometry) always gives the same path.
+    """
+    def __init__(self, seed, release_x, xs, ys, hits, slot):
+        self.seed = seed
+        self.release_x = release_x
+        self.xs = xs
+        self.ys = ys
+        self.hits = hits
+        self.slot = slot
+
+    def __len__(self):
+        return len(self.xs)
+
+    def point(self, step):
+        return float(self.xs[step]), float(self.ys[step]), bool(self.hits[step])
+
+def board_geometry(board_width, board_height, chip_d, n_slots, shape=DEFAULT_GEOMETRY):
+    # Everything besides the seed and release x that shapes a drop (`shape` is a BoardGeometry)
+    return (board_width, board_height, chip_d, n_slots, shape)
+
+def compute_trajectory(seed, release_x, geometry, peg_positions=None, peg_index=None, chip_y=0):
+    board_width, board_height, chip_d, n_slots, shape = geometry
+    if peg_positions is None:
+        peg_positions = shape.layout(board_width, board_height).peg_positions
+    physics = PlinkoPhysics([], peg_positions, board_height, board_width,
+                            peg_index=peg_index, rng=random.Random(seed), geometry=shape)
+    path = []
+    slot, _, _ = simulate_drop(physics, release_x, chip_d, n_slots, chip_y=chip_y, path=path)
+    xs, ys, hits = zip(*path)
+    return Trajectory(seed, release_x, np.array(xs), np.array(ys), np.array(hits, dtype=bool), slot)
+
+class TrajectoryCache:
+    """
+    LRU cache of recent trajectories keyed by (seed, release_x, board geometry),
+    so replays and rebroadcasts of a drop skip the physics entirely.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, seed, release_x, geometry, peg_positions=None, peg_index=None, chip_y=0):
+        trajectory = self.lookup(seed, release_x, geometry, chip_y)
+        if trajectory is None:
+            trajectory = compute_trajectory(seed, release_x, geometry, peg_positions, peg_index, chip_y)
+            self.store(trajectory, geometry, chip_y)
+        return trajectory
+
+    def lookup(self, seed, release_x, geometry, chip_y=0):
+        # Cached trajectory or None (counted as a miss); pair with store() when computing elsewhere
+        key = (seed, release_x, geometry, chip_y)
+        trajectory = self._items.get(key)
+        if trajectory is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return trajectory
+        self.misses += 1
+        return None
+
+    def store(self, trajectory, geometry, chip_y=0):
+        self._items[(trajectory.seed, trajectory.release_x, geometry, chip_y)] = trajectory
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+# Shared by every board in the process
+default_cache = TrajectoryCache()
@@ -0,0 +1,46 @@
+"""
+Optional OpenGL viewport for PlinkoBoard.
+
+QOpenGLWidget needs a working OpenGL context. Machines without a GPU driver (CI, headless
+capture boxes) can still get one from a software rasterizer: Mesa's llvmpipe on Linux
+(LIBGL_ALWAYS_SOFTWARE=1), or Qt's bundled opengl32sw on Windows (Qt.AA_UseSoftwareOpenGL).
+Both must be chosen before the QApplication exists; see use_software_opengl().
+When no context can be created at all, callers keep the default raster viewport.
+"""
+import os
+from PySide6.QtCore import QCoreApplication, Qt
+
+def use_software_opengl():
+    # Call before creating the QApplication
+    os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+    QCoreApplication.setAttribute(Qt.AA_UseSoftwareOpenGL)
+
+def opengl_available():
+    """True if an OpenGL context can be created and made current on this platform."""
+    try:
+        from PySide6.QtGui import QOffscreenSurface, QOpenGLContext
+        from PySide6.QtOpenGLWidgets import QOpenGLWidget  # noqa: F401 (module may be missing)
+    except ImportError:
+        return False
+    context = QOpenGLContext()
+    if not context.create():
+        return False
+    surface = QOffscreenSurface()
+    surface.setFormat(context.format())
+    surface.create()
+    if not surface.isValid() or not context.makeCurrent(surface):
+        return False
+    context.doneCurrent()
+    return True
+
+def make_opengl_viewport(samples=4):
+    """A multisampled QOpenGLWidget for QGraphicsView.setViewport, or None if OpenGL is unusable."""
+    if not opengl_available():
+        return None
+    from PySide6.QtGui import QSurfaceFormat
+    from PySide6.QtOpenGLWidgets import QOpenGLWidget
+    widget = QOpenGLWidget()
+    surface_format = QSurfaceFormat()
+    surface_format.setSamples(samples)
+    widget.setFormat(surface_format)
+    return widget